@@ -0,0 +1,231 @@
+"""Baseline schema (tables previously created by seed.py with create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+Databases created before migrations existed already have these tables:
+seed.py stamps them at this revision instead of running it.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _tenant_fk(nullable: bool = False, unique: bool = False) -> sa.Column:
+    return sa.Column(
+        "tenant_id",
+        postgresql.UUID(as_uuid=True),
+        sa.ForeignKey("tenants.id", ondelete="CASCADE"),
+        nullable=nullable,
+        unique=unique,
+    )
+
+
+def _id() -> sa.Column:
+    return sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True)
+
+
+def _now(name: str) -> sa.Column:
+    return sa.Column(name, sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenants",
+        _id(),
+        sa.Column("name", sa.String(255), nullable=False, unique=True),
+        sa.Column("display_name", sa.String(255), nullable=True),
+        sa.Column("plan", sa.String(50), nullable=False),
+        sa.Column("agent_enabled", sa.Boolean(), nullable=False),
+        _now("created_at"),
+    )
+    op.create_table(
+        "users",
+        _id(),
+        _tenant_fk(),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("password_hash", sa.Text(), nullable=False),
+        sa.Column("role", sa.String(20), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        _now("created_at"),
+        sa.UniqueConstraint("tenant_id", "email", name="uq_user_email_per_tenant"),
+    )
+    op.create_table(
+        "user_agent_assignments",
+        _id(),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("agent_external_id", sa.String(255), nullable=False),
+        _now("assigned_at"),
+        sa.Column("assigned_by", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.UniqueConstraint("user_id", "agent_external_id", name="uq_user_agent_assignment"),
+    )
+    op.create_table(
+        "agents_cache",
+        _id(),
+        _tenant_fk(),
+        sa.Column("external_id", sa.String(255), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        _now("synced_at"),
+        sa.UniqueConstraint("tenant_id", "external_id", name="uq_agent_external_id_per_tenant"),
+    )
+    op.create_table(
+        "calls_cache",
+        _id(),
+        _tenant_fk(),
+        sa.Column("agent_external_id", sa.String(255), nullable=True),
+        sa.Column("external_call_id", sa.String(255), nullable=False),
+        sa.Column("caller_number", sa.String(50), nullable=True),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("transcription", sa.Text(), nullable=True),
+        sa.Column("recording_url", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=True),
+        _now("synced_at"),
+    )
+    op.create_table(
+        "phone_numbers_cache",
+        _id(),
+        _tenant_fk(),
+        sa.Column("external_id", sa.String(255), nullable=False),
+        sa.Column("agent_external_id", sa.String(255), nullable=True),
+        sa.Column("number", sa.String(50), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        _now("synced_at"),
+    )
+    op.create_table(
+        "knowledge_bases_cache",
+        _id(),
+        _tenant_fk(),
+        sa.Column("external_id", sa.String(255), nullable=False),
+        sa.Column("agent_external_id", sa.String(255), nullable=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("source_count", sa.Integer(), nullable=False),
+        _now("synced_at"),
+    )
+    op.create_table(
+        "agent_templates",
+        _id(),
+        _tenant_fk(nullable=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(50), nullable=False),
+        sa.Column("icon", sa.String(50), nullable=False),
+        sa.Column("is_preset", sa.Boolean(), nullable=False),
+        sa.Column("greeting", sa.Text(), nullable=False),
+        sa.Column("system_prompt", sa.Text(), nullable=False),
+        sa.Column("voice", sa.String(50), nullable=False),
+        sa.Column("language", sa.String(10), nullable=False),
+        sa.Column("created_by", postgresql.UUID(as_uuid=True), nullable=True),
+        _now("created_at"),
+        _now("updated_at"),
+        sa.Column("usage_count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "weekly_reports",
+        _id(),
+        _tenant_fk(),
+        sa.Column("week_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("week_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("total_calls", sa.Integer(), nullable=False),
+        sa.Column("completed_calls", sa.Integer(), nullable=False),
+        sa.Column("missed_calls", sa.Integer(), nullable=False),
+        sa.Column("avg_duration", sa.Float(), nullable=False),
+        sa.Column("total_cost", sa.Float(), nullable=False),
+        sa.Column("calls_change_pct", sa.Float(), nullable=True),
+        sa.Column("completed_change_pct", sa.Float(), nullable=True),
+        _now("generated_at"),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("sent_to", sa.Text(), nullable=True),
+    )
+    op.create_table(
+        "alert_rules",
+        _id(),
+        _tenant_fk(),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("rule_type", sa.String(50), nullable=False),
+        sa.Column("conditions", sa.Text(), nullable=False),
+        sa.Column("notify_email", sa.Boolean(), nullable=False),
+        sa.Column("notify_webhook", sa.Boolean(), nullable=False),
+        sa.Column("webhook_url", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("last_triggered", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("trigger_count", sa.Integer(), nullable=False),
+        sa.Column("cooldown_minutes", sa.Integer(), nullable=False),
+        sa.Column("created_by", postgresql.UUID(as_uuid=True), nullable=True),
+        _now("created_at"),
+    )
+    op.create_table(
+        "alert_events",
+        _id(),
+        _tenant_fk(),
+        sa.Column("rule_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("alert_rules.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("severity", sa.String(20), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("context", sa.Text(), nullable=True),
+        sa.Column("notified_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("notification_channels", sa.String(255), nullable=True),
+        sa.Column("acknowledged_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("acknowledged_by", postgresql.UUID(as_uuid=True), nullable=True),
+        _now("created_at"),
+    )
+    op.create_table(
+        "calendar_integrations",
+        _id(),
+        _tenant_fk(unique=True),
+        sa.Column("access_token", sa.Text(), nullable=False),
+        sa.Column("refresh_token", sa.Text(), nullable=True),
+        sa.Column("token_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("google_email", sa.String(255), nullable=True),
+        sa.Column("calendar_id", sa.String(255), nullable=False),
+        sa.Column("last_sync", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("events_synced", sa.Integer(), nullable=False),
+        sa.Column("connected_by", postgresql.UUID(as_uuid=True), nullable=True),
+        _now("created_at"),
+    )
+    op.create_table(
+        "weekly_report_configs",
+        _id(),
+        _tenant_fk(unique=True),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.Column("recipients", sa.Text(), nullable=True),
+        sa.Column("schedule_day", sa.String(20), nullable=False),
+        sa.Column("schedule_time", sa.String(5), nullable=False),
+        sa.Column("include_call_summary", sa.Boolean(), nullable=False),
+        sa.Column("include_analytics", sa.Boolean(), nullable=False),
+        sa.Column("include_alerts", sa.Boolean(), nullable=False),
+        sa.Column("include_recommendations", sa.Boolean(), nullable=False),
+        sa.Column("last_sent_at", sa.DateTime(timezone=True), nullable=True),
+        _now("created_at"),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "weekly_report_configs",
+        "calendar_integrations",
+        "alert_events",
+        "alert_rules",
+        "weekly_reports",
+        "agent_templates",
+        "knowledge_bases_cache",
+        "phone_numbers_cache",
+        "calls_cache",
+        "agents_cache",
+        "user_agent_assignments",
+        "users",
+        "tenants",
+    ):
+        op.drop_table(table)
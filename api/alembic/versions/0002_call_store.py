@@ -0,0 +1,118 @@
+"""Local call store, rollups, shared agent cache and notification outbox
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # calls_cache becomes the local copy of CallRounded calls (services/call_store.py)
+    op.add_column("calls_cache", sa.Column("to_number", sa.String(50), nullable=True))
+    op.add_column("calls_cache", sa.Column("direction", sa.String(20), nullable=True))
+    op.add_column("calls_cache", sa.Column("cost", sa.Float(), nullable=True))
+    op.add_column("calls_cache", sa.Column("payload", postgresql.JSONB(), nullable=True))
+    op.add_column(
+        "calls_cache",
+        sa.Column(
+            "transcription_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('french', coalesce(transcription, ''))", persisted=True),
+            nullable=True,
+        ),
+    )
+    # Upserts are keyed on (tenant_id, external_call_id): drop older duplicates first,
+    # keeping exactly one row per call (id breaks synced_at ties, NULL counts as oldest)
+    op.execute(
+        """
+        DELETE FROM calls_cache a USING calls_cache b
+        WHERE a.tenant_id = b.tenant_id
+          AND a.external_call_id = b.external_call_id
+          AND (coalesce(a.synced_at, '-infinity'), a.id) < (coalesce(b.synced_at, '-infinity'), b.id)
+        """
+    )
+    op.create_unique_constraint("uq_call_external_id_per_tenant", "calls_cache", ["tenant_id", "external_call_id"])
+    op.create_index(
+        "ix_calls_cache_tenant_agent_started",
+        "calls_cache",
+        ["tenant_id", "agent_external_id", sa.text("started_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index("ix_calls_cache_transcription_tsv", "calls_cache", ["transcription_tsv"], postgresql_using="gin")
+
+    op.create_table(
+        "call_rollups",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("agent_external_id", sa.String(255), nullable=False),
+        sa.Column("granularity", sa.String(10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("total_calls", sa.Integer(), nullable=False),
+        sa.Column("completed_calls", sa.Integer(), nullable=False),
+        sa.Column("missed_calls", sa.Integer(), nullable=False),
+        sa.Column("failed_calls", sa.Integer(), nullable=False),
+        sa.Column("duration_sum", sa.Float(), nullable=False),
+        sa.Column("duration_count", sa.Integer(), nullable=False),
+        sa.Column("cost_sum", sa.Float(), nullable=False),
+        sa.Column("first_call_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_call_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.UniqueConstraint("tenant_id", "granularity", "bucket_start", "agent_external_id", name="uq_call_rollup_bucket"),
+    )
+
+    op.create_table(
+        "agent_metadata_cache",
+        sa.Column("external_id", sa.String(255), primary_key=True),
+        sa.Column("payload", postgresql.JSONB(), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("channel", sa.String(20), nullable=False),
+        sa.Column("destination", sa.Text(), nullable=False),
+        sa.Column("alert_event_ids", postgresql.JSONB(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_notification_outbox_due",
+        "notification_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status IN ('pending', 'sending')"),
+    )
+
+    op.create_index(
+        "ix_alert_events_unacknowledged",
+        "alert_events",
+        ["tenant_id"],
+        postgresql_where=sa.text("acknowledged_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alert_events_unacknowledged", table_name="alert_events")
+    op.drop_index("ix_notification_outbox_due", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
+    op.drop_table("agent_metadata_cache")
+    op.drop_table("call_rollups")
+    op.drop_index("ix_calls_cache_transcription_tsv", table_name="calls_cache")
+    op.drop_index("ix_calls_cache_tenant_agent_started", table_name="calls_cache")
+    op.drop_constraint("uq_call_external_id_per_tenant", "calls_cache", type_="unique")
+    for column in ("transcription_tsv", "payload", "cost", "direction", "to_number"):
+        op.drop_column("calls_cache", column)
@@ -0,0 +1,49 @@
+"""Tenant-scoped composite indexes for the hot queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:20:00.000000
+
+Each index matches the WHERE + ORDER BY of a route (see the comments next to
+the ``Index`` definitions in app/models.py). They are built CONCURRENTLY so
+that the migration does not block writes on large tables; that cannot run in
+a transaction, hence the autocommit block.
+
+Not added on purpose:
+- user_agent_assignments(user_id): uq_user_agent_assignment already starts
+  with user_id and serves those lookups.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # name, table, columns
+    ("ix_calls_cache_tenant_started", "calls_cache", ["tenant_id", sa.text("started_at DESC"), sa.text("id DESC")]),
+    ("ix_alert_events_tenant_created", "alert_events", ["tenant_id", sa.text("created_at DESC")]),
+    ("ix_alert_rules_tenant_active", "alert_rules", ["tenant_id", "is_active"]),
+    ("ix_agent_templates_tenant_name", "agent_templates", ["tenant_id", "name"]),
+    ("ix_agent_templates_preset_category", "agent_templates", ["is_preset", "category"]),
+    ("ix_weekly_reports_tenant_week", "weekly_reports", ["tenant_id", sa.text("week_start DESC")]),
+    ("ix_agents_cache_tenant_name", "agents_cache", ["tenant_id", "name"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    # Fresh statistics so that the planner picks the new indexes right away
+    for table in sorted({table for _, table, _ in INDEXES}):
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
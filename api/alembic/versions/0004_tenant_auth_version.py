@@ -0,0 +1,23 @@
+"""tenants.auth_version for the authenticated principal cache
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tenants", sa.Column("auth_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("tenants", "auth_version")
@@ -0,0 +1,27 @@
+"""sync_checkpoints: where the call reconciliation resumes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_checkpoints",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("synced_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sync_checkpoints")
@@ -1,4 +1,6 @@
+import asyncio
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from jose import JWTError, jwt
@@ -6,7 +8,28 @@ from passlib.context import CryptContext
 
 from .config import settings
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Hashes made with other parameters still verify, and are flagged for rehash
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# argon2 takes tens of milliseconds of CPU and releases the GIL: run it on a
+# few threads so that it neither blocks the event loop nor starves it at login storms
+_hash_executor: ThreadPoolExecutor | None = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_CONCURRENCY,
+            thread_name_prefix="argon2",
+        )
+    return _hash_executor
 
 
 def hash_password(password: str) -> str:
@@ -17,6 +40,23 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+async def hash_password_async(password: str) -> str:
+    """:func:`hash_password` off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_executor(), hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Verify off the event loop; also returns a new hash if ``hashed`` uses outdated parameters."""
+    return await asyncio.get_running_loop().run_in_executor(_executor(), pwd_context.verify_and_update, plain, hashed)
+
+
+def shutdown_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
 def create_token(data: dict, expires_delta: timedelta) -> str:
     to_encode = data.copy()
     to_encode["exp"] = datetime.now(timezone.utc) + expires_delta
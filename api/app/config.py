@@ -11,11 +11,104 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Password hashing (argon2id; changing a parameter rehashes passwords at next login)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_CONCURRENCY: int = 2  # hashing threads per worker
+
+    # Rate limiting (token bucket per user, or per IP when not logged in, shared through Postgres)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_MINUTE: int = 120  # refill rate, in tokens
+    RATE_LIMIT_BURST: int = 120  # bucket size
+    RATE_LIMIT_TRUSTED_PROXIES: str = "127.0.0.1/32,::1/128,172.16.0.0/12,10.0.0.0/8"  # X-Forwarded-For is trusted from these
+
+    # Response compression (brotli if installed and accepted, else gzip; never on SSE)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; streamed bodies are always compressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_TYPES: str = "application/json,text/plain,text/csv,application/x-ndjson"
+
+    # Metrics (GET /metrics, Prometheus text format; Server-Timing header on every response)
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # if set, /metrics requires "Authorization: Bearer <token>"
+
+    # Request profiling (pyinstrument; collapsed stacks on disk, listed under /api/admin/system/profiles)
+    PROFILER_ENABLED: bool = False
+    PROFILER_SAMPLE_RATE: float = 0.01  # fraction of requests profiled and kept
+    PROFILER_SLOW_MS: int = 0  # 0: off; else EVERY request under PROFILER_SLOW_PATHS is profiled, kept from this duration
+    PROFILER_SLOW_PATHS: str = "/api/analytics/,/api/dashboard/"
+    PROFILER_INTERVAL_MS: float = 1.0  # sampling interval
+    PROFILER_MAX_CONCURRENT: int = 2  # profiled requests at a time, per worker
+    PROFILER_DIR: str = "/tmp/callrounded-profiles"
+    PROFILER_MAX_FILES: int = 200  # the oldest profiles are removed beyond
+
+    # Authenticated principal cache (per worker, invalidated through tenants.auth_version)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Response cache of the opt-in GET routes (per worker; TTLs are set per route)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+
     # CallRounded API
     CALLROUNDED_API_URL: str = "https://api.callrounded.com/v1"
     CALLROUNDED_API_KEY: str = "demo"
     CALLROUNDED_AGENT_ID: str = ""
 
+    # CallRounded HTTP pool (one shared client per worker)
+    CALLROUNDED_MAX_CONNECTIONS: int = 20
+    CALLROUNDED_MAX_KEEPALIVE: int = 10
+    CALLROUNDED_KEEPALIVE_EXPIRY: float = 30.0
+    CALLROUNDED_POOL_TIMEOUT: float = 5.0
+    CALLROUNDED_HTTP2: bool = True
+
+    # Call sync (CallRounded → calls_cache)
+    CALLROUNDED_TENANT_ID: str = ""  # Tenant owning the API key (empty = every tenant)
+    CALL_SYNC_ENABLED: bool = True
+    CALL_SYNC_INTERVAL_SECONDS: int = 60
+    CALL_SYNC_PAGE_SIZE: int = 100
+    CALL_SYNC_OVERLAP_MINUTES: int = 60
+
+    # CallRounded webhook (push ingestion; empty secret = endpoint disabled)
+    CALLROUNDED_WEBHOOK_SECRET: str = ""
+    CALLROUNDED_WEBHOOK_TOLERANCE_SECONDS: int = 300
+
+    # Agent metadata cache ("memory" = per worker, "postgres" = shared by all workers)
+    AGENT_CACHE_BACKEND: str = "memory"
+    AGENT_CACHE_TTL_SECONDS: int = 300
+    AGENT_CACHE_STALE_SECONDS: int = 3600
+    AGENT_CACHE_MAX_SIZE: int = 1024
+    AGENT_CACHE_FETCH_CONCURRENCY: int = 8
+
+    # Alert engine (rules evaluated on in-memory sliding windows)
+    ALERT_ENGINE_ENABLED: bool = True
+    ALERT_EVAL_INTERVAL_SECONDS: int = 60
+    ALERT_MAX_WINDOW_HOURS: int = 168
+    ALERT_STATS_CACHE_TTL_SECONDS: int = 10  # 0 = no cache
+
+    # Alert notifications (outbox workers per process)
+    NOTIFY_ENABLED: bool = True
+    NOTIFY_WORKERS: int = 4
+    NOTIFY_BATCH_SIZE: int = 10
+    NOTIFY_POLL_SECONDS: float = 2.0
+    NOTIFY_DIGEST_SECONDS: int = 30
+    NOTIFY_MAX_ATTEMPTS: int = 8
+    NOTIFY_BACKOFF_BASE_SECONDS: int = 30
+    NOTIFY_BACKOFF_MAX_SECONDS: int = 3600
+    NOTIFY_PER_DESTINATION_CONCURRENCY: int = 2
+    NOTIFY_MAX_CONNECTIONS: int = 20
+    NOTIFY_HTTP_TIMEOUT: float = 10.0
+
+    # SMTP (alert emails; empty host = emails disabled)
+    SMTP_HOST: str = ""
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_FROM: str = "alertes@callrounded-manager.local"
+    SMTP_STARTTLS: bool = True
+
     # LLM (Agent Builder)
     ANTHROPIC_API_KEY: str = ""
 
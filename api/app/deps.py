@@ -6,13 +6,13 @@ import uuid
 from typing import Annotated
 
 from fastapi import Cookie, Depends, HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from .auth import decode_token
 from .database import async_session
-from .models import Role, User, UserAgentAssignment
+from .models import Role
+from .services import principals
+from .services.principals import AgentScope, Principal
 
 
 # ============================================================================
@@ -34,8 +34,11 @@ DBSession = Annotated[AsyncSession, Depends(get_db)]
 async def get_current_user(
     db: DBSession,
     access_token: str | None = Cookie(default=None),
-) -> User:
-    """Get current authenticated user with agent assignments preloaded."""
+) -> Principal:
+    """Get current authenticated user, with its agent assignments and tenant flags.
+
+    Served from the principal cache (services/principals.py) when possible.
+    """
     if not access_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Non authentifié")
     
@@ -47,12 +50,7 @@ async def get_current_user(
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalide")
     
-    result = await db.execute(
-        select(User)
-        .options(selectinload(User.agent_assignments))
-        .where(User.id == uuid.UUID(user_id), User.is_active.is_(True))
-    )
-    user = result.scalar_one_or_none()
+    user = await principals.get(db, uuid.UUID(user_id), payload.get("jti", ""), payload.get("exp"))
     
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Utilisateur introuvable")
@@ -60,14 +58,14 @@ async def get_current_user(
     return user
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
 # ============================================================================
 # AUTHORIZATION
 # ============================================================================
 
-async def require_admin(current_user: CurrentUser) -> User:
+async def require_admin(current_user: CurrentUser) -> Principal:
     """Require user to be TENANT_ADMIN or SUPER_ADMIN."""
     if not current_user.is_admin():
         raise HTTPException(
@@ -77,10 +75,10 @@ async def require_admin(current_user: CurrentUser) -> User:
     return current_user
 
 
-AdminUser = Annotated[User, Depends(require_admin)]
+AdminUser = Annotated[Principal, Depends(require_admin)]
 
 
-async def require_super_admin(current_user: CurrentUser) -> User:
+async def require_super_admin(current_user: CurrentUser) -> Principal:
     """Require user to be SUPER_ADMIN."""
     if current_user.role != Role.SUPER_ADMIN.value:
         raise HTTPException(
@@ -90,7 +88,7 @@ async def require_super_admin(current_user: CurrentUser) -> User:
     return current_user
 
 
-SuperAdminUser = Annotated[User, Depends(require_super_admin)]
+SuperAdminUser = Annotated[Principal, Depends(require_super_admin)]
 
 
 # ============================================================================
@@ -111,27 +109,21 @@ TenantId = Annotated[uuid.UUID, Depends(tenant_guard)]
 
 async def get_accessible_agent_ids(
     current_user: CurrentUser,
-    db: DBSession,
-) -> list[str] | None:
+) -> AgentScope:
     """
-    Get list of agent external IDs accessible by current user.
-    Returns None if user is admin (can access all agents).
-    Returns list of assigned agent IDs otherwise.
+    Get the agents accessible by current user.
+    Unrestricted for admins (can access all agents), the assigned agents otherwise.
+    Test membership with ``agent_id in scope``, filter SQL with ``scope.clause(column)``.
     """
-    if current_user.is_admin():
-        return None  # Admin can access all
-    
-    return [a.agent_external_id for a in current_user.agent_assignments]
+    return current_user.scope
 
 
-AccessibleAgentIds = Annotated[list[str] | None, Depends(get_accessible_agent_ids)]
+AccessibleAgentIds = Annotated[AgentScope, Depends(get_accessible_agent_ids)]
 
 
 def filter_by_accessible_agents(
-    agent_ids: list[str] | None,
+    agent_ids: AgentScope,
     agent_external_id: str,
 ) -> bool:
     """Check if an agent is accessible."""
-    if agent_ids is None:
-        return True  # Admin can access all
     return agent_external_id in agent_ids
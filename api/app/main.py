@@ -1,31 +1,69 @@
+import hmac
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from . import auth
 from .config import settings
+from .database import engine
+from .middleware.compression import CompressionMiddleware
+from .middleware.metrics import MetricsMiddleware
+from .middleware.profiler import ProfilerMiddleware
+from .middleware.rate_limit import RateLimitMiddleware
 from .routes import api_router
+from .services import alert_engine, call_sync, event_hub, metrics, notifier
+from .services import callrounded as cr
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["120/minute"])
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
 
-app = FastAPI(title="CallRounded Manager API", version="0.1.0", docs_url="/docs", redoc_url=None)
 
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await cr.startup()
+    event_hub.start()
+    alert_engine.start()
+    notifier.start()
+    call_sync.start()
+    try:
+        yield
+    finally:
+        await call_sync.stop()
+        await notifier.stop()
+        await alert_engine.stop()
+        await event_hub.stop()
+        await cr.shutdown()
+        auth.shutdown_executor()
 
+
+app = FastAPI(
+    title="CallRounded Manager API",
+    version="0.1.0",
+    docs_url="/docs",
+    redoc_url=None,
+    lifespan=lifespan,
+)
+
+# Innermost first: profiles hold the app's work only, compression sees the app's responses,
+# CORS headers are also set on 429 responses
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[settings.FRONTEND_URL],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router, prefix="/api")
 
@@ -33,3 +71,14 @@ app.include_router(api_router, prefix="/api")
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("Metrics are disabled", status_code=404)
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied.encode(), settings.METRICS_TOKEN.encode()):
+            return PlainTextResponse("Unauthorized", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,176 @@
+"""Response compression — brotli when the client accepts it, else gzip.
+
+Only bodies of an allowed content type (``COMPRESSION_TYPES``) are
+compressed: complete bodies from ``COMPRESSION_MIN_SIZE`` bytes, streamed
+bodies (``JSONArrayStream``, exports) chunk by chunk, each chunk flushed so
+that the client receives it at once. Server-sent events and responses that
+already have a ``Content-Encoding`` pass through untouched.
+
+A compressed response is another representation of the resource, so its
+ETag gets a suffix (``"abc"`` → ``"abc-br"``); the suffix is removed from
+``If-None-Match`` before the request reaches the app, which keeps the
+response cache's 304s working.
+
+brotli is optional: without the module, only gzip is offered.
+"""
+
+import gzip
+import zlib
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Preferred encoding among ``ENCODINGS`` accepted by the client (q > 0), if any."""
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _compressor(encoding: str) -> tuple[Callable[[bytes], bytes], Callable[[], bytes], Callable[[], bytes]]:
+    """``(compress, flush, finish)`` of a streaming compressor."""
+    if encoding == "br":
+        c = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return c.process, c.flush, c.finish
+    c = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    return c.compress, lambda: c.flush(zlib.Z_SYNC_FLUSH), c.flush
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _strip_suffixes(if_none_match: str) -> tuple[str, str | None]:
+    """``If-None-Match`` without our ETag suffixes, and the suffix that was found."""
+    found = None
+    tags = []
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        for encoding in ("br", "gzip"):
+            suffix = f'-{encoding}"'
+            if tag.endswith(suffix):
+                tag = tag[: -len(suffix)] + '"'
+                found = encoding
+                break
+        tags.append(tag)
+    return ", ".join(tags), found
+
+
+def _suffixed(etag: str, encoding: str) -> str:
+    return etag[:-1] + f'-{encoding}"' if etag.endswith('"') else etag
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware: complete bodies are compressed at once, streams chunk by chunk."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.types = {t.strip() for t in settings.COMPRESSION_TYPES.split(",") if t.strip()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        revalidated_as = None
+        if "if-none-match" in headers:
+            value, revalidated_as = _strip_suffixes(headers["if-none-match"])
+            scope = dict(scope)
+            scope["headers"] = [(k, v) for k, v in scope["headers"] if k != b"if-none-match"]
+            scope["headers"].append((b"if-none-match", value.encode("latin-1")))
+
+        encoding = negotiate(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        stream: tuple[Callable, Callable, Callable] | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] == "http.response.body" and stream is not None:
+                # Rest of a compressed stream
+                compress_chunk, flush, finish = stream
+                data = compress_chunk(message.get("body", b""))
+                more = message.get("more_body", False)
+                data += flush() if more else finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more})
+                return
+            if message["type"] != "http.response.body" or start is None:
+                # Rest of an uncompressed response (SSE…)
+                await send(message)
+                return
+
+            response_start, start = start, None
+            response_headers = MutableHeaders(raw=response_start["headers"])
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+
+            if response_start["status"] == 304:
+                if revalidated_as and "etag" in response_headers:
+                    response_headers["ETag"] = _suffixed(response_headers["etag"], revalidated_as)
+                    response_start["headers"] = response_headers.raw
+                await send(response_start)
+                await send(message)
+                return
+            if not self._compressible(response_start["status"], response_headers) or (
+                not more and len(body) < settings.COMPRESSION_MIN_SIZE
+            ):
+                await send(response_start)
+                await send(message)
+                return
+
+            response_headers["Content-Encoding"] = encoding
+            response_headers.add_vary_header("Accept-Encoding")
+            if "etag" in response_headers:
+                response_headers["ETag"] = _suffixed(response_headers["etag"], encoding)
+            if more:
+                del response_headers["Content-Length"]
+                stream = _compressor(encoding)
+                compress_chunk, flush, _ = stream
+                data = compress_chunk(body) + flush()
+            else:
+                data = compress(body, encoding)
+                response_headers["Content-Length"] = str(len(data))
+            response_start["headers"] = response_headers.raw
+            await send(response_start)
+            await send({"type": "http.response.body", "body": data, "more_body": more})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compressible(self, status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 206) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type != "text/event-stream" and content_type in self.types
@@ -0,0 +1,60 @@
+"""Request timing — feeds :mod:`app.services.metrics` and sets ``Server-Timing``.
+
+Outermost middleware, so that the time measured includes the rate limiter
+and compression. Requests are labelled by route template; paths that match
+no route share the ``unmatched`` label, which keeps scanners from creating
+a series per URL. Server-sent event streams get their header but are not
+observed: their duration is the length of the session, not a latency.
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+from ..services import metrics
+
+
+def route_label(scope: Scope) -> str:
+    """Route template of the request (``/api/calls/{call_id}``), or ``unmatched``."""
+    route = scope.get("route")
+    if route is None:
+        # The scope was copied below us (compression rewrites If-None-Match): match again
+        for candidate in scope["app"].router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: the body is never buffered."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = metrics.begin()
+        status = 500
+        streaming = False
+
+        async def send_timed(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                streaming = headers.get("content-type", "").startswith("text/event-stream")
+                headers.append("Server-Timing", stats.server_timing())
+                message["headers"] = headers.raw
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            metrics.end(token)
+            if not streaming:
+                metrics.observe_request(scope["method"], route_label(scope), status, stats)
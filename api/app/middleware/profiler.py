@@ -0,0 +1,53 @@
+"""Opt-in request profiling (``PROFILER_ENABLED``) — see :mod:`app.services.profiler`.
+
+Innermost middleware, so that a profile holds the route's own work and not
+compression or rate limiting. Event streams, health checks and metrics
+scrapes are never profiled.
+"""
+
+import random
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..config import settings
+from ..services import profiler
+from .metrics import route_label
+
+SKIPPED_PREFIXES = ("/health", "/metrics", "/api/events/", "/api/webhooks/")
+
+
+class ProfilerMiddleware:
+    """Pure ASGI middleware; a request that is not drawn costs one ``random()``."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.slow_paths = tuple(p.strip() for p in settings.PROFILER_SLOW_PATHS.split(",") if p.strip())
+
+    def _reason(self, path: str) -> str | None:
+        if random.random() < settings.PROFILER_SAMPLE_RATE:
+            return "sampled"
+        if settings.PROFILER_SLOW_MS > 0 and path.startswith(self.slow_paths):
+            return "slow"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.PROFILER_ENABLED or not profiler.available():
+            await self.app(scope, receive, send)
+            return
+        reason = None if scope["path"].startswith(SKIPPED_PREFIXES) else self._reason(scope["path"])
+        running = profiler.start() if reason else None
+        if running is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session = profiler.stop(running)
+            elapsed = time.perf_counter() - started
+            if reason == "sampled" or elapsed * 1000 >= settings.PROFILER_SLOW_MS:
+                await profiler.save(session, scope["method"], route_label(scope), reason, elapsed)
+            else:
+                profiler.discard()
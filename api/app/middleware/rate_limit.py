@@ -0,0 +1,181 @@
+"""Rate limiting shared by every gunicorn worker — a token bucket per client in Postgres.
+
+Each client has a bucket of ``RATE_LIMIT_BURST`` tokens refilled at
+``RATE_LIMIT_PER_MINUTE`` tokens per minute; a request takes the cost of its
+route (:data:`ROUTE_COSTS`, 1 by default). The refill and the withdrawal are
+one atomic ``INSERT … ON CONFLICT DO UPDATE … WHERE`` on the (unlogged)
+``rate_limit_buckets`` table: when the bucket is short, the ``WHERE`` skips
+the update, no row comes back and the request gets a 429.
+
+Clients are identified by tenant and user from the access token; requests
+without a valid token by IP address, taken from ``X-Forwarded-For`` when the
+connection comes from a trusted proxy (``RATE_LIMIT_TRUSTED_PROXIES``).
+
+The limiter fails open: if Postgres is unavailable, requests go through and
+the limiter stays off for ``_FAILURE_BACKOFF`` seconds.
+"""
+
+import ipaddress
+import logging
+import time
+
+from sqlalchemy import text
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..auth import decode_token
+from ..config import settings
+from ..database import engine
+
+logger = logging.getLogger(__name__)
+
+# Path prefix → tokens per request; the longest matching prefix wins
+ROUTE_COSTS: dict[str, float] = {
+    "/api/auth/login": 5,
+    "/api/analytics/": 5,
+    "/api/calls/search": 5,
+    "/api/calls/export": 10,
+    "/api/reports/": 5,
+    "/api/admin/llm/": 10,
+    "/api/dashboard/": 2,
+    "/api/calls/": 2,
+}
+
+# Never limited: health checks, metrics scrapes, CallRounded's signed webhooks, CORS preflights
+EXEMPT_PREFIXES = ("/health", "/metrics", "/api/webhooks/")
+
+_FAILURE_BACKOFF = 30.0
+_CLEANUP_INTERVAL = 600.0
+
+_TAKE = text(
+    """
+    INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+    VALUES (:key, :capacity - :cost, clock_timestamp())
+    ON CONFLICT (key) DO UPDATE
+    SET tokens = LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate) - :cost,
+        updated_at = clock_timestamp()
+    WHERE LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate) >= :cost
+    RETURNING tokens
+    """
+)
+_LEVEL = text(
+    """
+    SELECT LEAST(:capacity, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * :rate)
+    FROM rate_limit_buckets WHERE key = :key
+    """
+)
+# A bucket idle long enough to be full again is the same as no bucket
+_CLEANUP = text(
+    "DELETE FROM rate_limit_buckets WHERE updated_at < clock_timestamp() - make_interval(secs => :idle)"
+)
+
+
+def route_cost(path: str) -> float:
+    best, cost = -1, 1.0
+    for prefix, value in ROUTE_COSTS.items():
+        if path.startswith(prefix) and len(prefix) > best:
+            best, cost = len(prefix), value
+    return cost
+
+
+def _trusted_networks() -> list[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    return [
+        ipaddress.ip_network(item.strip(), strict=False)
+        for item in settings.RATE_LIMIT_TRUSTED_PROXIES.split(",")
+        if item.strip()
+    ]
+
+
+def _is_trusted(address: str, networks) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(scope: Scope, networks) -> str:
+    """Address of the client: the last hop of X-Forwarded-For that is not one of our proxies."""
+    peer = scope["client"][0] if scope.get("client") else ""
+    if not _is_trusted(peer, networks):
+        return peer
+    headers = dict(scope["headers"])
+    forwarded = headers.get(b"x-forwarded-for", b"").decode("latin-1")
+    for hop in reversed([h.strip() for h in forwarded.split(",") if h.strip()]):
+        if not _is_trusted(hop, networks):
+            return hop
+    return peer
+
+
+def _token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            for part in value.decode("latin-1").split(";"):
+                key, _, token = part.strip().partition("=")
+                if key == "access_token":
+                    return token
+    return None
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware: no body buffering, SSE streams pass through untouched."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.networks = _trusted_networks()
+        self.capacity = float(settings.RATE_LIMIT_BURST)
+        self.rate = settings.RATE_LIMIT_PER_MINUTE / 60.0
+        self._disabled_until = 0.0
+        self._next_cleanup = 0.0
+
+    def key(self, scope: Scope) -> str:
+        token = _token(scope)
+        payload = decode_token(token) if token else None
+        if payload and payload.get("sub") and payload.get("type") != "refresh":
+            return f"user:{payload.get('tenant_id')}:{payload['sub']}"
+        return f"ip:{client_ip(scope, self.networks)}"
+
+    async def take(self, key: str, cost: float) -> float | None:
+        """Withdraw ``cost`` tokens; None if allowed, else the seconds to wait."""
+        params = {"key": key, "cost": cost, "capacity": self.capacity, "rate": self.rate}
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            if (await conn.execute(_TAKE, params)).first() is not None:
+                allowed = True
+            else:
+                allowed = False
+                level = (await conn.execute(_LEVEL, params)).scalar() or 0.0
+            if time.monotonic() >= self._next_cleanup:
+                self._next_cleanup = time.monotonic() + _CLEANUP_INTERVAL
+                await conn.execute(_CLEANUP, {"idle": self.capacity / self.rate})
+        return None if allowed else max((cost - level) / self.rate, 1.0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or path.startswith(EXEMPT_PREFIXES)
+            or time.monotonic() < self._disabled_until
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            retry_after = await self.take(self.key(scope), min(route_cost(path), self.capacity))
+        except Exception as exc:
+            logger.warning("Rate limiter unavailable, disabled for %ss: %s", _FAILURE_BACKOFF, exc)
+            self._disabled_until = time.monotonic() + _FAILURE_BACKOFF
+            retry_after = None
+
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            {"detail": "Trop de requêtes, réessayez plus tard"},
+            status_code=429,
+            headers={"Retry-After": str(int(retry_after + 0.999))},
+        )
+        await response(scope, receive, send)
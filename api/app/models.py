@@ -6,8 +6,8 @@ import uuid
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, Computed, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -38,6 +38,8 @@ class Tenant(Base):
     display_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
     plan: Mapped[str] = mapped_column(String(50), nullable=False, default="free")
     agent_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # Bumped whenever users, assignments or settings change (services/principals.py)
+    auth_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -98,6 +100,10 @@ class UserAgentAssignment(Base):
     )
 
 
+# Lookups by user_id (a user's assignments) use uq_user_agent_assignment, whose
+# leading column is user_id: a separate index on user_id would be redundant
+
+
 # ============================================================================
 # CACHE MODELS (synced from CallRounded API)
 # ============================================================================
@@ -118,7 +124,21 @@ class AgentCache(Base):
     )
 
 
+# Agent picker of the admin screen: a tenant's agents sorted by name
+Index("ix_agents_cache_tenant_name", AgentCache.tenant_id, AgentCache.name)
+
+
+class AgentMetadataCache(Base):
+    """CallRounded agent objects shared by all workers (services/agent_cache.py, postgres backend)."""
+    __tablename__ = "agent_metadata_cache"
+
+    external_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    payload: Mapped[dict | None] = mapped_column(JSONB, nullable=True)  # NULL = agent not found upstream
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class CallCache(Base):
+    """Local copy of CallRounded calls, filled by services/call_sync.py."""
     __tablename__ = "calls_cache"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -126,14 +146,83 @@ class CallCache(Base):
     agent_external_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     external_call_id: Mapped[str] = mapped_column(String(255), nullable=False)
     caller_number: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    to_number: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    direction: Mapped[str | None] = mapped_column(String(20), nullable=True)
     duration: Mapped[float | None] = mapped_column(Float, nullable=True)
+    cost: Mapped[float | None] = mapped_column(Float, nullable=True)
     status: Mapped[str] = mapped_column(String(50), nullable=False, default="unknown")
-    transcription: Mapped[str | None] = mapped_column(Text, nullable=True)
+    transcription: Mapped[str | None] = mapped_column(Text, nullable=True)  # Filtered transcript text
+    transcription_tsv: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('french', coalesce(transcription, ''))", persisted=True),
+        nullable=True,
+        deferred=True,
+    )
     recording_url: Mapped[str | None] = mapped_column(Text, nullable=True)
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    payload: Mapped[dict | None] = mapped_column(JSONB, nullable=True)  # Raw CallRounded call object
     synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "external_call_id", name="uq_call_external_id_per_tenant"),
+    )
+
+
+# Keyset pagination of the call list: newest first, id breaks ties between equal timestamps
+Index("ix_calls_cache_tenant_started", CallCache.tenant_id, CallCache.started_at.desc(), CallCache.id.desc())
+Index(
+    "ix_calls_cache_tenant_agent_started",
+    CallCache.tenant_id,
+    CallCache.agent_external_id,
+    CallCache.started_at.desc(),
+    CallCache.id.desc(),
+)
+
+# Transcript full-text search (GET /api/calls/search)
+Index("ix_calls_cache_transcription_tsv", CallCache.transcription_tsv, postgresql_using="gin")
+
+
+class CallRollup(Base):
+    """Call counters pre-aggregated per tenant, agent and hour/day bucket (UTC).
+
+    Maintained by services/rollups.py from calls_cache; any range can be rebuilt.
+    """
+    __tablename__ = "call_rollups"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    agent_external_id: Mapped[str] = mapped_column(String(255), nullable=False, default="")  # "" = no agent
+    granularity: Mapped[str] = mapped_column(String(10), nullable=False)  # "hour" or "day"
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    total_calls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_calls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    missed_calls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_calls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    duration_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cost_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    first_call_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_call_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "granularity", "bucket_start", "agent_external_id", name="uq_call_rollup_bucket"),
+    )
+
+
+class SyncCheckpoint(Base):
+    """Progress of a background sync (services/call_sync.py), shared by the workers.
+
+    ``synced_at`` is the start of the last run that completed: every call
+    started before it was listed by CallRounded at that time.
+    """
+    __tablename__ = "sync_checkpoints"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)  # "calls"
+    synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
 
 class PhoneNumberCache(Base):
     __tablename__ = "phone_numbers_cache"
@@ -192,6 +281,11 @@ class AgentTemplate(Base):
     usage_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
+# Template list: a tenant's templates by name, global presets by category
+Index("ix_agent_templates_tenant_name", AgentTemplate.tenant_id, AgentTemplate.name)
+Index("ix_agent_templates_preset_category", AgentTemplate.is_preset, AgentTemplate.category)
+
+
 class WeeklyReport(Base):
     """Weekly analytics reports."""
     __tablename__ = "weekly_reports"
@@ -220,6 +314,10 @@ class WeeklyReport(Base):
     sent_to: Mapped[str | None] = mapped_column(Text, nullable=True)
 
 
+# Report history: latest weeks of a tenant first
+Index("ix_weekly_reports_tenant_week", WeeklyReport.tenant_id, WeeklyReport.week_start.desc())
+
+
 # ============================================================================
 # SPRINT 4 - ALERTS
 # ============================================================================
@@ -249,6 +347,10 @@ class AlertRule(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+# Rule lists and the alert badge: a tenant's (active) rules
+Index("ix_alert_rules_tenant_active", AlertRule.tenant_id, AlertRule.is_active)
+
+
 class AlertEvent(Base):
     """Alert events history."""
     __tablename__ = "alert_events"
@@ -271,6 +373,60 @@ class AlertEvent(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+# Alert badge (/api/alerts/stats) and event list: open alerts of a tenant, its latest alerts first
+Index("ix_alert_events_unacknowledged", AlertEvent.tenant_id, postgresql_where=AlertEvent.acknowledged_at.is_(None))
+Index("ix_alert_events_tenant_created", AlertEvent.tenant_id, AlertEvent.created_at.desc())
+
+
+class NotificationOutbox(Base):
+    """Outgoing alert notifications (webhook / email), delivered by services/notifier.py.
+
+    One row is one delivery to one destination; alerts raised for the same
+    destination while a row is still waiting are appended to it (digest).
+    """
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    channel: Mapped[str] = mapped_column(String(20), nullable=False)  # webhook, email
+    destination: Mapped[str] = mapped_column(Text, nullable=False)  # URL or comma-separated emails
+    alert_event_ids: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # pending, sending, sent, dead
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+# Workers claim due rows: only pending/sending rows are ever scanned
+Index(
+    "ix_notification_outbox_due",
+    NotificationOutbox.next_attempt_at,
+    postgresql_where=NotificationOutbox.status.in_(["pending", "sending"]),
+)
+
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+class RateLimitBucket(Base):
+    """Token bucket of one client (app/middleware/rate_limit.py).
+
+    Unlogged: a crash only resets the buckets, and writes skip the WAL.
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)  # user:<tenant>:<user> or ip:<address>
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+
 # ============================================================================
 # SPRINT 5 - CALENDAR INTEGRATION
 # ============================================================================
@@ -0,0 +1,104 @@
+"""Fast JSON responses (orjson) for the large payloads.
+
+FastAPI turns whatever an endpoint returns into JSON-safe values with
+``jsonable_encoder`` (re-validating it first when the route has a
+``response_model``), then ``json.dumps`` it. For pages of calls with full
+transcripts that walk costs more than the queries. An endpoint opts out by
+returning one of these responses itself:
+
+- :class:`FastJSONResponse` — ``orjson.dumps`` of the content as is.
+  Pydantic models are dumped without being validated again; datetimes,
+  UUIDs, enums and dataclasses are handled natively by orjson.
+- :class:`JSONArrayStream` — an envelope plus one large array, streamed
+  item by item: items are produced and serialized while the response is
+  sent, and the whole document is never held in memory.
+
+The output is the same JSON as FastAPI's (UTF-8, no escaping of accents,
+ISO 8601 datetimes), in compact form.
+"""
+
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Mapping
+
+import orjson
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.responses import Response, StreamingResponse
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+_CHUNK_SIZE = 64 * 1024  # bytes buffered before a streamed chunk is sent
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()  # already validated when it was built
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+async def _aiter(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class JSONArrayStream(StreamingResponse):
+    """``{**envelope, key: [*items]}``, sent as the items are produced.
+
+    ``items`` may be a plain or an async iterable; an error raised while
+    iterating cuts the response short, so produce them from data already
+    loaded.
+    """
+
+    def __init__(
+        self,
+        envelope: Mapping[str, Any],
+        key: str,
+        items: Iterable[Any] | AsyncIterable[Any],
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        super().__init__(
+            self._chunks(envelope, key, items),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+            background=background,
+        )
+
+    @staticmethod
+    async def _chunks(envelope: Mapping[str, Any], key: str, items) -> AsyncIterator[bytes]:
+        head = dumps({k: v for k, v in envelope.items() if k != key})
+        buffer = bytearray(head[:-1])
+        if len(head) > 2:
+            buffer += b","
+        buffer += dumps(key) + b":["
+
+        if not hasattr(items, "__aiter__"):
+            items = _aiter(items)
+        first = True
+        async for item in items:
+            if not first:
+                buffer += b","
+            buffer += dumps(item)
+            first = False
+            if len(buffer) >= _CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+
+        buffer += b"]}"
+        yield bytes(buffer)
@@ -1,12 +1,13 @@
 from fastapi import APIRouter
 
-from . import admin, agents, alerts, analytics, auth, calendar, calls, dashboard, knowledge_bases, llm, phone_numbers, reports, templates
+from . import admin, agents, alerts, analytics, auth, calendar, calls, dashboard, events, knowledge_bases, llm, phone_numbers, reports, templates, webhooks
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(agents.router, prefix="/agents", tags=["agents"])
 api_router.include_router(calls.router, prefix="/calls", tags=["calls"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
 api_router.include_router(phone_numbers.router, prefix="/phone-numbers", tags=["phone-numbers"])
 api_router.include_router(knowledge_bases.router, prefix="/knowledge-bases", tags=["knowledge-bases"])
 api_router.include_router(admin.router, tags=["admin"])
@@ -16,3 +17,4 @@ api_router.include_router(analytics.router, tags=["analytics"])
 api_router.include_router(alerts.router, tags=["alerts"])
 api_router.include_router(calendar.router, tags=["calendar"])  # Sprint 5
 api_router.include_router(reports.router, tags=["reports"])  # Sprint 7
+api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
@@ -2,19 +2,23 @@
 CallRounded Manager - Admin Routes
 🐺 Created by Kuro - User management and agent assignments
 """
+import asyncio
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 import logging
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from sqlalchemy import select, delete
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import selectinload
 
-from ..auth import hash_password
+from ..auth import hash_password_async
 from ..deps import AdminUser, CurrentUser, DBSession, TenantId
-from ..models import Role, Tenant, User, UserAgentAssignment, AgentCache
+from ..models import Role, Tenant, User, UserAgentAssignment, AgentCache, CallCache
 from ..schemas import TenantPatch
+from ..services import agent_cache, alert_engine, call_details, call_sync, event_hub, notifier, principals, profiler, response_cache, rollups
+from ..services import callrounded as cr
 
 logger = logging.getLogger(__name__)
 
@@ -76,7 +80,7 @@ async def list_users(
     db: DBSession,
 ):
     """List all users in the tenant."""
-    logger.info("admin.list_users", admin_id=str(admin.id), tenant_id=str(tenant_id))
+    logger.info("admin.list_users admin_id=%s tenant_id=%s", admin.id, tenant_id)
     
     result = await db.execute(
         select(User)
@@ -107,7 +111,7 @@ async def create_user(
     db: DBSession,
 ):
     """Create a new user in the tenant."""
-    logger.info("admin.create_user", admin_id=str(admin.id), email=body.email, role=body.role)
+    logger.info("admin.create_user admin_id=%s email=%s role=%s", admin.id, body.email, body.role)
     
     # Validate role
     if body.role not in [r.value for r in Role]:
@@ -130,14 +134,14 @@ async def create_user(
     user = User(
         tenant_id=tenant_id,
         email=body.email,
-        password_hash=hash_password(body.password),
+        password_hash=await hash_password_async(body.password),
         role=body.role,
     )
     db.add(user)
     await db.commit()
     await db.refresh(user)
     
-    logger.info("admin.user_created", user_id=str(user.id), email=user.email)
+    logger.info("admin.user_created user_id=%s email=%s", user.id, user.email)
     
     return UserOut(
         id=user.id,
@@ -186,7 +190,7 @@ async def update_user(
     db: DBSession,
 ):
     """Update a user."""
-    logger.info("admin.update_user", admin_id=str(admin.id), user_id=str(user_id))
+    logger.info("admin.update_user admin_id=%s user_id=%s", admin.id, user_id)
     
     result = await db.execute(
         select(User)
@@ -220,10 +224,11 @@ async def update_user(
     if body.is_active is not None:
         user.is_active = body.is_active
     
+    await principals.bump(db, tenant_id)
     await db.commit()
     await db.refresh(user)
     
-    logger.info("admin.user_updated", user_id=str(user.id))
+    logger.info("admin.user_updated user_id=%s", user.id)
     
     return UserOut(
         id=user.id,
@@ -243,7 +248,7 @@ async def delete_user(
     db: DBSession,
 ):
     """Delete a user."""
-    logger.info("admin.delete_user", admin_id=str(admin.id), user_id=str(user_id))
+    logger.info("admin.delete_user admin_id=%s user_id=%s", admin.id, user_id)
     
     # Prevent self-deletion
     if user_id == admin.id:
@@ -261,9 +266,10 @@ async def delete_user(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Utilisateur non trouvé")
     
     await db.delete(user)
+    await principals.bump(db, tenant_id)
     await db.commit()
     
-    logger.info("admin.user_deleted", user_id=str(user_id))
+    logger.info("admin.user_deleted user_id=%s", user_id)
 
 
 # ============================================================================
@@ -303,10 +309,7 @@ async def assign_agent(
 ):
     """Assign an agent to a user."""
     logger.info(
-        "admin.assign_agent",
-        admin_id=str(admin.id),
-        user_id=str(user_id),
-        agent_id=body.agent_external_id,
+        "admin.assign_agent admin_id=%s user_id=%s agent_id=%s", admin.id, user_id, body.agent_external_id
     )
     
     # Verify user exists in tenant
@@ -346,10 +349,11 @@ async def assign_agent(
         assigned_by=admin.id,
     )
     db.add(assignment)
+    await principals.bump(db, tenant_id)
     await db.commit()
     await db.refresh(assignment)
     
-    logger.info("admin.agent_assigned", assignment_id=str(assignment.id))
+    logger.info("admin.agent_assigned assignment_id=%s", assignment.id)
     
     return assignment
 
@@ -364,10 +368,7 @@ async def assign_agents_bulk(
 ):
     """Assign multiple agents to a user at once."""
     logger.info(
-        "admin.assign_agents_bulk",
-        admin_id=str(admin.id),
-        user_id=str(user_id),
-        count=len(body.agent_external_ids),
+        "admin.assign_agents_bulk admin_id=%s user_id=%s count=%d", admin.id, user_id, len(body.agent_external_ids)
     )
     
     # Verify user exists in tenant
@@ -396,13 +397,14 @@ async def assign_agents_bulk(
             db.add(assignment)
             assignments.append(assignment)
     
+    await principals.bump(db, tenant_id)
     await db.commit()
     
     # Refresh all
     for a in assignments:
         await db.refresh(a)
     
-    logger.info("admin.agents_assigned_bulk", count=len(assignments))
+    logger.info("admin.agents_assigned_bulk count=%d", len(assignments))
     
     return assignments
 
@@ -417,10 +419,7 @@ async def unassign_agent(
 ):
     """Remove an agent assignment from a user."""
     logger.info(
-        "admin.unassign_agent",
-        admin_id=str(admin.id),
-        user_id=str(user_id),
-        agent_id=agent_external_id,
+        "admin.unassign_agent admin_id=%s user_id=%s agent_id=%s", admin.id, user_id, agent_external_id
     )
     
     result = await db.execute(
@@ -435,6 +434,7 @@ async def unassign_agent(
     if not result.fetchone():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignation non trouvée")
     
+    await principals.bump(db, tenant_id)
     await db.commit()
     logger.info("admin.agent_unassigned")
 
@@ -496,6 +496,7 @@ async def update_tenant(body: TenantPatch, db: DBSession, tenant_id: TenantId, a
     if body.display_name is not None:
         tenant.display_name = body.display_name
 
+    await principals.bump(db, tenant_id)
     await db.commit()
     await db.refresh(tenant)
 
@@ -523,6 +524,7 @@ async def toggle_agent(
         raise HTTPException(status_code=404, detail="Tenant non trouvé")
     
     tenant.agent_enabled = not tenant.agent_enabled
+    await principals.bump(db, tenant_id)
     await db.commit()
     await db.refresh(tenant)
     
@@ -545,3 +547,125 @@ async def get_agent_status(
         raise HTTPException(status_code=404, detail="Tenant non trouvé")
     
     return {"agent_enabled": tenant.agent_enabled}
+
+
+# ── System ────────────────────────────────────────────────────────────
+
+@router.get("/system/http-pool")
+async def get_http_pool_stats(admin: AdminUser):
+    """CallRounded HTTP pool usage for the worker serving this request."""
+    return cr.pool_stats()
+
+
+@router.get("/system/agent-cache")
+async def get_agent_cache_stats(admin: AdminUser):
+    """Agent metadata cache counters for the worker serving this request."""
+    return agent_cache.cache.stats()
+
+
+@router.get("/system/principal-cache")
+async def get_principal_cache_stats(admin: AdminUser):
+    """Authenticated principal cache counters for the worker serving this request."""
+    return principals.stats()
+
+
+@router.get("/system/response-cache")
+async def get_response_cache_stats(admin: AdminUser):
+    """GET response cache counters for the worker serving this request."""
+    return response_cache.stats()
+
+
+@router.get("/system/call-details")
+async def get_call_detail_stats(admin: AdminUser):
+    """Stored-call hits and context lookup counters for the worker serving this request."""
+    return call_details.stats()
+
+
+@router.get("/system/event-hub")
+async def get_event_hub_stats(admin: AdminUser):
+    """Live event subscribers connected to the worker serving this request."""
+    return event_hub.stats()
+
+
+@router.get("/system/alert-engine")
+async def get_alert_engine_stats(admin: AdminUser):
+    """Alert engine windows and counters for the worker serving this request."""
+    return alert_engine.stats()
+
+
+@router.get("/system/profiles")
+async def list_profiles(admin: AdminUser):
+    """Saved request profiles (every worker's), newest first, and this worker's profiler counters."""
+    return {"profiler": profiler.stats(), "profiles": await asyncio.to_thread(profiler.list_profiles)}
+
+
+@router.get("/system/profiles/{name}")
+async def download_profile(name: str, admin: AdminUser):
+    """One profile as collapsed stacks, for flamegraph.pl or speedscope."""
+    path = await asyncio.to_thread(profiler.profile_path, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
+@router.post("/alerts/evaluate")
+async def evaluate_alerts(admin: AdminUser):
+    """Run one alert evaluation now instead of waiting for the next tick."""
+    return await alert_engine.tick()
+
+
+@router.get("/notifications/outbox")
+async def get_notification_outbox_stats(admin: AdminUser, db: DBSession):
+    """Outbox rows per status and delivery counters of this worker."""
+    return await notifier.outbox_stats(db)
+
+
+@router.post("/notifications/retry-dead")
+async def retry_dead_notifications(admin: AdminUser, db: DBSession, outbox_id: uuid.UUID | None = None):
+    """Re-queue dead-lettered notifications (all of them, or one)."""
+    count = await notifier.retry_dead(db, outbox_id)
+    await db.commit()
+    return {"requeued": count}
+
+
+@router.post("/sync/calls")
+async def trigger_call_sync(admin: AdminUser, full: bool = False):
+    """Run a call sync now (full=true re-walks every CallRounded page)."""
+    logger.info("admin.sync_calls admin_id=%s full=%s", admin.id, full)
+    return await call_sync.sync_calls(full=full)
+
+
+@router.post("/rollups/rebuild")
+async def rebuild_rollups(
+    admin: AdminUser,
+    tenant_id: TenantId,
+    db: DBSession,
+    from_date: str | None = None,
+    to_date: str | None = None,
+):
+    """Recompute call rollups of the tenant from calls_cache (YYYY-MM-DD, defaults to every stored call)."""
+    try:
+        start = datetime.strptime(from_date, "%Y-%m-%d").replace(tzinfo=timezone.utc) if from_date else None
+        end = datetime.strptime(to_date, "%Y-%m-%d").replace(tzinfo=timezone.utc) if to_date else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Format de date invalide (YYYY-MM-DD)")
+
+    if start is None or end is None:
+        bounds = await db.execute(
+            select(func.min(CallCache.started_at), func.max(CallCache.started_at))
+            .where(CallCache.tenant_id == tenant_id)
+        )
+        first, last = bounds.one()
+        if first is None:
+            return {"rebuilt": False, "from_date": None, "to_date": None}
+        start = start or first
+        end = end or last
+
+    logger.info("admin.rebuild_rollups admin_id=%s from=%s to=%s", admin.id, start, end)
+    await rollups.rebuild(db, tenant_id, start, end)
+    await db.commit()
+    return {
+        "rebuilt": True,
+        "from_date": start.date().isoformat(),
+        "to_date": end.date().isoformat(),
+    }
@@ -5,6 +5,7 @@ CallRounded Manager - Agent Routes
 from fastapi import APIRouter, HTTPException, status
 
 from ..deps import AccessibleAgentIds, CurrentUser, DBSession, TenantId
+from ..services import agent_cache
 from ..services import callrounded as cr
 
 router = APIRouter()
@@ -21,8 +22,7 @@ async def list_agents(
     agents = await cr.list_agents()
     
     # Filter by accessible agents if user is not admin
-    if accessible_agents is not None:
-        agents = [a for a in agents if a.get("id") in accessible_agents]
+    agents = accessible_agents.filter(agents, key=lambda a: a.get("id"))
     
     return agents
 
@@ -37,7 +37,7 @@ async def get_agent(
 ):
     """Get agent details. Users can only access assigned agents."""
     # Check access
-    if accessible_agents is not None and agent_id not in accessible_agents:
+    if agent_id not in accessible_agents:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Vous n'avez pas accès à cet agent"
@@ -57,10 +57,13 @@ async def update_agent(
 ):
     """Update agent. Users can only modify assigned agents."""
     # Check access
-    if accessible_agents is not None and agent_id not in accessible_agents:
+    if agent_id not in accessible_agents:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Vous n'avez pas accès à cet agent"
         )
     
-    return await cr.update_agent(agent_id, payload)
+    updated = await cr.update_agent(agent_id, payload)
+    await agent_cache.invalidate(db, tenant_id, agent_id)
+    await db.commit()
+    return updated
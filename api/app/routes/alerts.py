@@ -5,7 +5,7 @@ CallRounded Manager - Alerts Routes
 import json
 import logging
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel
@@ -13,6 +13,7 @@ from sqlalchemy import select, update
 
 from ..deps import AdminUser, CurrentUser, DBSession, TenantId
 from ..models import AlertRule, AlertEvent
+from ..services import alert_stats, event_hub
 
 logger = logging.getLogger(__name__)
 
@@ -213,6 +214,7 @@ async def create_rule(
     
     db.add(rule)
     await db.commit()
+    alert_stats.invalidate(tenant_id)  # active_rules
     await db.refresh(rule)
     
     logger.info(f"Alert rule created: {rule.id}")
@@ -263,6 +265,7 @@ async def create_rule_from_preset(
     
     db.add(rule)
     await db.commit()
+    alert_stats.invalidate(tenant_id)  # active_rules
     await db.refresh(rule)
     
     return AlertRuleOut(
@@ -310,6 +313,7 @@ async def update_rule(
             setattr(rule, field, value)
     
     await db.commit()
+    alert_stats.invalidate(tenant_id)  # active_rules
     await db.refresh(rule)
     
     return AlertRuleOut(
@@ -350,6 +354,7 @@ async def delete_rule(
     
     await db.delete(rule)
     await db.commit()
+    alert_stats.invalidate(tenant_id)  # active_rules
 
 
 # ============================================================================
@@ -420,7 +425,9 @@ async def acknowledge_event(
     event.acknowledged_at = datetime.now(timezone.utc)
     event.acknowledged_by = current_user.id
     
+    await event_hub.publish(db, tenant_id, "alert_ack", {"ids": [str(event.id)]})
     await db.commit()
+    alert_stats.invalidate(tenant_id)
     await db.refresh(event)
     
     return AlertEventOut(
@@ -459,7 +466,9 @@ async def acknowledge_all_events(
     )
     
     count = len(result.fetchall())
+    await event_hub.publish(db, tenant_id, "alert_ack", {"count": count})
     await db.commit()
+    alert_stats.invalidate(tenant_id)
     
     return {"acknowledged": count}
 
@@ -470,43 +479,5 @@ async def get_alert_stats(
     tenant_id: TenantId,
     db: DBSession,
 ):
-    """Get alert statistics."""
-    # Count unacknowledged
-    unack_result = await db.execute(
-        select(AlertEvent).where(
-            AlertEvent.tenant_id == tenant_id,
-            AlertEvent.acknowledged_at.is_(None),
-        )
-    )
-    unacknowledged = len(unack_result.scalars().all())
-    
-    # Count by severity (last 24h)
-    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
-    recent_result = await db.execute(
-        select(AlertEvent).where(
-            AlertEvent.tenant_id == tenant_id,
-            AlertEvent.created_at >= yesterday,
-        )
-    )
-    recent_events = recent_result.scalars().all()
-    
-    by_severity = {"info": 0, "warning": 0, "critical": 0}
-    for e in recent_events:
-        if e.severity in by_severity:
-            by_severity[e.severity] += 1
-    
-    # Active rules
-    rules_result = await db.execute(
-        select(AlertRule).where(
-            AlertRule.tenant_id == tenant_id,
-            AlertRule.is_active == True,
-        )
-    )
-    active_rules = len(rules_result.scalars().all())
-    
-    return {
-        "unacknowledged": unacknowledged,
-        "last_24h": len(recent_events),
-        "by_severity": by_severity,
-        "active_rules": active_rules,
-    }
+    """Get alert statistics (one aggregate query, briefly cached per tenant)."""
+    return await alert_stats.get(db, tenant_id)
@@ -8,16 +8,18 @@ from typing import Optional
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from ..deps import AccessibleAgentIds, CurrentUser, DBSession, TenantId
-from ..services import callrounded as cr_service
-from ..models import WeeklyReport
-from ..services import callrounded as cr
+from ..services import agent_cache
+from ..services import rollups
+from ..models import CallRollup, WeeklyReport
+from ..responses import FastJSONResponse
+from ..services.response_cache import CachedRoute, cached
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/analytics", tags=["Analytics"])
+router = APIRouter(prefix="/analytics", tags=["Analytics"], route_class=CachedRoute)
 
 
 # ============================================================================
@@ -118,6 +120,7 @@ def get_period_dates(period: str) -> tuple[datetime, datetime]:
 # ============================================================================
 
 @router.get("/overview", response_model=AnalyticsOverview)
+@cached(ttl=60, tags=("calls",))
 async def get_analytics_overview(
     current_user: CurrentUser,
     tenant_id: TenantId,
@@ -139,91 +142,58 @@ async def get_analytics_overview(
     else:
         start_dt, end_dt = get_period_dates(period)
     
-    # Fetch calls from API
-    try:
-        raw = await cr.list_calls(limit=1000)
-        all_calls = raw.get("data", []) if isinstance(raw, dict) else raw
-    except Exception as e:
-        logger.error(f"Error fetching calls: {e}")
-        all_calls = []
+    days = rollups.scope(tenant_id, accessible_agents, "day", start_dt, end_dt)
     
-    # Filter by date and accessible agents
-    calls = []
-    for c in all_calls:
-        # Parse start time
-        start_str = c.get("start_time")
-        if not start_str:
-            continue
-        
-        try:
-            call_dt = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
-            if call_dt.tzinfo is None:
-                call_dt = call_dt.replace(tzinfo=timezone.utc)
-        except (ValueError, AttributeError):
-            continue
-        
-        # Filter by date
-        if call_dt < start_dt or call_dt > end_dt:
-            continue
-        
-        # Filter by accessible agents
-        agent_id = str(c.get("agent_id", "")) if c.get("agent_id") else None
-        if accessible_agents is not None and agent_id not in accessible_agents:
-            continue
-        
-        calls.append({**c, "_parsed_dt": call_dt, "_agent_id": agent_id})
-    
-    # Compute stats
-    total_calls = len(calls)
-    completed_calls = sum(1 for c in calls if c.get("status") == "completed")
-    missed_calls = sum(1 for c in calls if c.get("status") == "missed")
-    failed_calls = sum(1 for c in calls if c.get("status") == "failed")
-    
-    durations = [c.get("duration_seconds", 0) for c in calls if c.get("duration_seconds")]
-    avg_duration = sum(durations) / len(durations) if durations else 0.0
-    
-    total_cost = sum(c.get("cost", 0) or 0 for c in calls)
-    
-    completion_rate = (completed_calls / total_calls * 100) if total_calls > 0 else 0.0
-    
-    # Daily breakdown
-    daily_map = {}
-    for c in calls:
-        date_key = c["_parsed_dt"].strftime("%Y-%m-%d")
-        if date_key not in daily_map:
-            daily_map[date_key] = {
-                "total": 0, "completed": 0, "missed": 0, 
-                "durations": [], "cost": 0
-            }
-        
-        daily_map[date_key]["total"] += 1
-        if c.get("status") == "completed":
-            daily_map[date_key]["completed"] += 1
-        elif c.get("status") == "missed":
-            daily_map[date_key]["missed"] += 1
-        
-        if c.get("duration_seconds"):
-            daily_map[date_key]["durations"].append(c["duration_seconds"])
-        if c.get("cost"):
-            daily_map[date_key]["cost"] += c["cost"]
+    # Daily breakdown (totals are summed from it)
+    daily_rows = (await db.execute(
+        select(
+            CallRollup.bucket_start,
+            func.sum(CallRollup.total_calls),
+            func.sum(CallRollup.completed_calls),
+            func.sum(CallRollup.missed_calls),
+            func.sum(CallRollup.failed_calls),
+            func.sum(CallRollup.duration_sum),
+            func.sum(CallRollup.duration_count),
+            func.sum(CallRollup.cost_sum),
+        )
+        .where(*days)
+        .group_by(CallRollup.bucket_start)
+        .order_by(CallRollup.bucket_start)
+    )).all()
     
     daily_stats = [
         DailyStats(
-            date=date,
-            total_calls=data["total"],
-            completed_calls=data["completed"],
-            missed_calls=data["missed"],
-            avg_duration=sum(data["durations"]) / len(data["durations"]) if data["durations"] else 0,
-            total_cost=round(data["cost"], 2),
+            date=d.strftime("%Y-%m-%d"),
+            total_calls=total,
+            completed_calls=completed,
+            missed_calls=missed,
+            avg_duration=dur_sum / dur_count if dur_count else 0,
+            total_cost=round(cost, 2),
         )
-        for date, data in sorted(daily_map.items())
+        for d, total, completed, missed, _failed, dur_sum, dur_count, cost in daily_rows
     ]
     
+    total_calls = sum(r[1] for r in daily_rows)
+    completed_calls = sum(r[2] for r in daily_rows)
+    missed_calls = sum(r[3] for r in daily_rows)
+    failed_calls = sum(r[4] for r in daily_rows)
+    duration_sum = sum(r[5] for r in daily_rows)
+    duration_count = sum(r[6] for r in daily_rows)
+    total_cost = sum(r[7] for r in daily_rows)
+    
+    avg_duration = duration_sum / duration_count if duration_count else 0.0
+    completion_rate = (completed_calls / total_calls * 100) if total_calls > 0 else 0.0
+    
     # Hourly distribution
+    hour = func.extract("hour", func.timezone("UTC", CallRollup.bucket_start)).label("hour")
     hourly_map = {h: 0 for h in range(24)}
-    for c in calls:
-        hour = c["_parsed_dt"].hour
-        hourly_map[hour] += 1
+    hourly_rows = await db.execute(
+        select(hour, func.sum(CallRollup.total_calls))
+        .where(*rollups.scope(tenant_id, accessible_agents, "hour", start_dt, end_dt))
+        .group_by(hour)
+    )
+    for h, count in hourly_rows.all():
+        hourly_map[int(h)] = count
     
     hourly_distribution = [
         HourlyDistribution(hour=h, call_count=count)
@@ -231,32 +201,28 @@ async def get_analytics_overview(
     ]
     
     # Agent performance
-    agent_map = {}
-    for c in calls:
-        agent_id = c["_agent_id"] or "unknown"
-        if agent_id not in agent_map:
-            agent_map[agent_id] = {
-                "total": 0, "completed": 0, "durations": []
-            }
-        
-        agent_map[agent_id]["total"] += 1
-        if c.get("status") == "completed":
-            agent_map[agent_id]["completed"] += 1
-        if c.get("duration_seconds"):
-            agent_map[agent_id]["durations"].append(c["duration_seconds"])
+    agent_rows = (await db.execute(
+        select(
+            CallRollup.agent_external_id,
+            func.sum(CallRollup.total_calls),
+            func.sum(CallRollup.completed_calls),
+            func.sum(CallRollup.duration_sum),
+            func.sum(CallRollup.duration_count),
+        )
+        .where(*days)
+        .group_by(CallRollup.agent_external_id)
+    )).all()
+    agent_map = {
+        (agent_id or "unknown"): {
+            "total": total, "completed": completed,
+            "duration_sum": dur_sum, "duration_count": dur_count,
+        }
+        for agent_id, total, completed, dur_sum, dur_count in agent_rows
+    }
     
-    # Resolve agent names from API
-    agent_names = {}
-    for aid in agent_map.keys():
-        if aid != "unknown":
-            try:
-                agent_data = await cr_service.get_agent(aid)
-                if agent_data:
-                    agent_names[aid] = agent_data.get("name", f"Agent {aid[:8]}...")
-                else:
-                    agent_names[aid] = f"Agent {aid[:8]}..."
-            except Exception:
-                agent_names[aid] = f"Agent {aid[:8]}..."
+    # Resolve agent names (shared agent cache, misses fetched concurrently)
+    resolved = await agent_cache.get_agent_names((aid for aid in agent_map if aid != "unknown"), default="")
+    agent_names = {aid: name or f"Agent {aid[:8]}..." for aid, name in resolved.items()}
 
     agent_performance = [
         AgentPerformance(
@@ -265,12 +231,13 @@ async def get_analytics_overview(
             total_calls=data["total"],
             completed_calls=data["completed"],
             completion_rate=round(data["completed"] / data["total"] * 100, 1) if data["total"] > 0 else 0,
-            avg_duration=round(sum(data["durations"]) / len(data["durations"]), 1) if data["durations"] else 0,
+            avg_duration=round(data["duration_sum"] / data["duration_count"], 1) if data["duration_count"] else 0,
         )
         for agent_id, data in sorted(agent_map.items(), key=lambda x: x[1]["total"], reverse=True)
     ]
     
-    return AnalyticsOverview(
+    # Built and validated above: sent as is, without FastAPI's response_model pass
+    return FastJSONResponse(AnalyticsOverview(
         period=period,
         total_calls=total_calls,
         completed_calls=completed_calls,
@@ -282,10 +249,11 @@ async def get_analytics_overview(
         daily_stats=daily_stats,
         hourly_distribution=hourly_distribution,
         agent_performance=agent_performance,
-    )
+    ))
 
 
 @router.get("/trends")
+@cached(ttl=60, tags=("calls",))
 async def get_trends(
     current_user: CurrentUser,
     tenant_id: TenantId,
@@ -295,44 +263,24 @@ async def get_trends(
 ):
     """Get call volume trends over time."""
     end_dt = datetime.now(timezone.utc)
-    start_dt = end_dt - timedelta(days=days)
+    start_dt = rollups.day_start(end_dt - timedelta(days=days))
     
-    try:
-        raw = await cr.list_calls(limit=1000)
-        all_calls = raw.get("data", []) if isinstance(raw, dict) else raw
-    except Exception:
-        all_calls = []
+    rows = (await db.execute(
+        select(
+            CallRollup.bucket_start,
+            func.sum(CallRollup.total_calls),
+            func.sum(CallRollup.completed_calls),
+            func.sum(CallRollup.cost_sum),
+        )
+        .where(*rollups.scope(tenant_id, accessible_agents, "day", start_dt, end_dt))
+        .group_by(CallRollup.bucket_start)
+    )).all()
     
     # Group by date
-    trend_data = {}
-    for c in all_calls:
-        start_str = c.get("start_time")
-        if not start_str:
-            continue
-        
-        try:
-            call_dt = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
-            if call_dt.tzinfo is None:
-                call_dt = call_dt.replace(tzinfo=timezone.utc)
-        except (ValueError, AttributeError):
-            continue
-        
-        if call_dt < start_dt or call_dt > end_dt:
-            continue
-        
-        agent_id = str(c.get("agent_id", "")) if c.get("agent_id") else None
-        if accessible_agents is not None and agent_id not in accessible_agents:
-            continue
-        
-        date_key = call_dt.strftime("%Y-%m-%d")
-        if date_key not in trend_data:
-            trend_data[date_key] = {"calls": 0, "completed": 0, "cost": 0}
-        
-        trend_data[date_key]["calls"] += 1
-        if c.get("status") == "completed":
-            trend_data[date_key]["completed"] += 1
-        if c.get("cost"):
-            trend_data[date_key]["cost"] += c["cost"]
+    trend_data = {
+        d.strftime("%Y-%m-%d"): {"calls": total, "completed": completed, "cost": cost}
+        for d, total, completed, cost in rows
+    }
     
     # Fill missing dates
     result = []
@@ -369,6 +317,7 @@ async def list_weekly_reports(
 
 
 @router.get("/peak-hours")
+@cached(ttl=60, tags=("calls",))
 async def get_peak_hours(
     current_user: CurrentUser,
     tenant_id: TenantId,
@@ -378,39 +327,24 @@ async def get_peak_hours(
 ):
     """Analyze peak call hours."""
     end_dt = datetime.now(timezone.utc)
-    start_dt = end_dt - timedelta(days=days)
+    start_dt = (end_dt - timedelta(days=days)).replace(minute=0, second=0, microsecond=0)
     
-    try:
-        raw = await cr.list_calls(limit=1000)
-        all_calls = raw.get("data", []) if isinstance(raw, dict) else raw
-    except Exception:
-        all_calls = []
+    bucket_utc = func.timezone("UTC", CallRollup.bucket_start)
+    hour = func.extract("hour", bucket_utc).label("hour")
+    isodow = func.extract("isodow", bucket_utc).label("isodow")  # 1=Monday
+    rows = (await db.execute(
+        select(hour, isodow, func.sum(CallRollup.total_calls))
+        .where(*rollups.scope(tenant_id, accessible_agents, "hour", start_dt, end_dt))
+        .group_by(hour, isodow)
+    )).all()
     
     # Group by hour and day of week
     hourly = {h: 0 for h in range(24)}
     daily = {d: 0 for d in range(7)}  # 0=Monday
     
-    for c in all_calls:
-        start_str = c.get("start_time")
-        if not start_str:
-            continue
-        
-        try:
-            call_dt = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
-            if call_dt.tzinfo is None:
-                call_dt = call_dt.replace(tzinfo=timezone.utc)
-        except (ValueError, AttributeError):
-            continue
-        
-        if call_dt < start_dt or call_dt > end_dt:
-            continue
-        
-        agent_id = str(c.get("agent_id", "")) if c.get("agent_id") else None
-        if accessible_agents is not None and agent_id not in accessible_agents:
-            continue
-        
-        hourly[call_dt.hour] += 1
-        daily[call_dt.weekday()] += 1
+    for h, dow, count in rows:
+        hourly[int(h)] += count
+        daily[int(dow) - 1] += count
     
     # Find peaks
     peak_hour = max(hourly, key=hourly.get)
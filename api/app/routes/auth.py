@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Response, status
 from sqlalchemy import select
 
-from ..auth import create_access_token, create_refresh_token, verify_password, decode_token
+from ..auth import create_access_token, create_refresh_token, verify_password_async, decode_token
 from ..deps import CurrentUser, DBSession
 from ..models import User, Tenant
 from ..schemas import LoginRequest, UserResponse
@@ -12,10 +12,21 @@ router = APIRouter()
 
 @router.post("/login")
 async def login(body: LoginRequest, response: Response, db: DBSession):
-    result = await db.execute(select(User).where(User.email == body.email, User.is_active.is_(True)))
-    user = result.scalar_one_or_none()
-    if not user or not verify_password(body.password, user.password_hash):
+    result = await db.execute(
+        select(User, Tenant)
+        .outerjoin(Tenant, Tenant.id == User.tenant_id)
+        .where(User.email == body.email, User.is_active.is_(True))
+    )
+    user, tenant = result.first() or (None, None)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Identifiants invalides")
+    valid, new_hash = await verify_password_async(body.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Identifiants invalides")
+    if new_hash:
+        # Hashed with older argon2 parameters: upgrade it while we have the password
+        user.password_hash = new_hash
+        await db.commit()
 
     access = create_access_token(str(user.id), str(user.tenant_id), user.role)
     refresh = create_refresh_token(str(user.id), str(user.tenant_id), user.role)
@@ -23,10 +34,6 @@ async def login(body: LoginRequest, response: Response, db: DBSession):
     response.set_cookie("access_token", access, httponly=True, samesite="lax", secure=True, max_age=900)
     response.set_cookie("refresh_token", refresh, httponly=True, samesite="lax", secure=True, max_age=7 * 86400)
 
-    # Fetch tenant name
-    t = await db.execute(select(Tenant).where(Tenant.id == user.tenant_id))
-    tenant = t.scalar_one_or_none()
-
     return UserResponse(
         id=user.id,
         email=user.email,
@@ -46,17 +53,15 @@ async def logout(response: Response):
 
 
 @router.get("/me")
-async def me(current_user: CurrentUser, db: DBSession):
-    t = await db.execute(select(Tenant).where(Tenant.id == current_user.tenant_id))
-    tenant = t.scalar_one_or_none()
+async def me(current_user: CurrentUser):
     return UserResponse(
         id=current_user.id,
         email=current_user.email,
         role=current_user.role,
         tenant_id=current_user.tenant_id,
-        tenant_name=tenant.display_name or tenant.name if tenant else None,
-        tenant_display_name=tenant.display_name if tenant else None,
-        agent_enabled=tenant.agent_enabled if tenant else True,
+        tenant_name=current_user.tenant_display_name or current_user.tenant_name,
+        tenant_display_name=current_user.tenant_display_name,
+        agent_enabled=current_user.agent_enabled,
     )
 
 
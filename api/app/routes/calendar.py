@@ -15,8 +15,10 @@ from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 
 from ..config import settings
+from ..database import async_session
 from ..deps import AdminUser, CurrentUser, DBSession, TenantId
 from ..models import CalendarIntegration
+from ..services import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,9 @@ SCOPES = [
     "https://www.googleapis.com/auth/calendar.readonly",
 ]
 
+# Appointments booked during a call are looked for up to this far after it
+BOOKING_HORIZON = timedelta(days=180)
+
 
 # ============================================================================
 # SCHEMAS
@@ -107,7 +112,7 @@ async def refresh_access_token(integration: "CalendarIntegration", db: DBSession
             detail="Refresh token not available, please reconnect"
         )
     
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.transport("google")) as client:
         response = await client.post(
             GOOGLE_TOKEN_URL,
             data={
@@ -135,6 +140,83 @@ async def refresh_access_token(integration: "CalendarIntegration", db: DBSession
         return integration.access_token
 
 
+def _event_out(item: dict) -> CalendarEventOut | None:
+    """Google Calendar event → CalendarEventOut (None without start/end)."""
+    start = item.get("start", {})
+    end = item.get("end", {})
+    
+    # Parse datetime
+    start_dt = start.get("dateTime") or start.get("date")
+    end_dt = end.get("dateTime") or end.get("date")
+    
+    if not (start_dt and end_dt):
+        return None
+    return CalendarEventOut(
+        id=item.get("id"),
+        summary=item.get("summary", "Sans titre"),
+        description=item.get("description"),
+        start=datetime.fromisoformat(start_dt.replace("Z", "+00:00")),
+        end=datetime.fromisoformat(end_dt.replace("Z", "+00:00")),
+        location=item.get("location"),
+        status=item.get("status", "confirmed"),
+        html_link=item.get("htmlLink"),
+    )
+
+
+async def events_booked_between(tenant_id: uuid.UUID, start: datetime, end: datetime) -> list[CalendarEventOut] | None:
+    """Events created on the tenant's calendar in ``[start, end]`` — the appointments booked
+    during a call. None when no calendar is connected. Uses its own session: it runs
+    alongside the other lookups of the call detail."""
+    from sqlalchemy import select
+    async with async_session() as db:
+        result = await db.execute(
+            select(CalendarIntegration).where(CalendarIntegration.tenant_id == tenant_id)
+        )
+        integration = result.scalar_one_or_none()
+        if not integration:
+            return None
+        access_token = await refresh_access_token(integration, db)
+        calendar_id = integration.calendar_id
+    
+    # Google cannot filter on creation time: the events taking place between
+    # the call and BOOKING_HORIZON after it are listed, over as many pages as
+    # needed (the caller's timeout bounds the whole lookup), and the creation
+    # time is checked here
+    events = []
+    params = {
+        "timeMin": start.isoformat(),
+        "timeMax": (end + BOOKING_HORIZON).isoformat(),
+        "showDeleted": "false",
+        "singleEvents": "true",
+        "maxResults": 2500,
+    }
+    async with httpx.AsyncClient(transport=metrics.transport("google")) as client:
+        while True:
+            response = await client.get(
+                f"{GOOGLE_CALENDAR_API}/calendars/{calendar_id}/events",
+                headers={"Authorization": f"Bearer {access_token}"},
+                params=params,
+                timeout=10.0,
+            )
+            if response.status_code == 410:
+                # Google no longer has what was asked (expired sync window): no data
+                logger.info("Calendar events of tenant %s gone (410), none shown", tenant_id)
+                return []
+            response.raise_for_status()
+            data = response.json()
+            for item in data.get("items", []):
+                created = item.get("created")
+                if created and start <= datetime.fromisoformat(created.replace("Z", "+00:00")) <= end:
+                    event = _event_out(item)
+                    if event:
+                        events.append(event)
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                break
+            params = {**params, "pageToken": page_token}
+    return events
+
+
 # ============================================================================
 # ENDPOINTS - OAUTH
 # ============================================================================
@@ -184,7 +266,7 @@ async def oauth_callback(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid state")
     
     # Exchange code for tokens
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.transport("google")) as client:
         response = await client.post(
             GOOGLE_TOKEN_URL,
             data={
@@ -206,7 +288,7 @@ async def oauth_callback(
         token_data = response.json()
     
     # Get user info
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.transport("google")) as client:
         user_response = await client.get(
             "https://www.googleapis.com/oauth2/v2/userinfo",
             headers={"Authorization": f"Bearer {token_data['access_token']}"},
@@ -323,7 +405,7 @@ async def list_events(
     time_min = now.isoformat()
     time_max = (now + timedelta(days=days)).isoformat()
     
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.transport("google")) as client:
         response = await client.get(
             f"{GOOGLE_CALENDAR_API}/calendars/{integration.calendar_id}/events",
             headers={"Authorization": f"Bearer {access_token}"},
@@ -345,28 +427,7 @@ async def list_events(
         
         data = response.json()
     
-    events = []
-    for item in data.get("items", []):
-        start = item.get("start", {})
-        end = item.get("end", {})
-        
-        # Parse datetime
-        start_dt = start.get("dateTime") or start.get("date")
-        end_dt = end.get("dateTime") or end.get("date")
-        
-        if start_dt and end_dt:
-            events.append(CalendarEventOut(
-                id=item.get("id"),
-                summary=item.get("summary", "Sans titre"),
-                description=item.get("description"),
-                start=datetime.fromisoformat(start_dt.replace("Z", "+00:00")),
-                end=datetime.fromisoformat(end_dt.replace("Z", "+00:00")),
-                location=item.get("location"),
-                status=item.get("status", "confirmed"),
-                html_link=item.get("htmlLink"),
-            ))
-    
-    return events
+    return [event for event in map(_event_out, data.get("items", [])) if event]
 
 
 @router.post("/events", response_model=CalendarEventOut)
@@ -402,7 +463,7 @@ async def create_event(
     if body.attendees:
         event_body["attendees"] = [{"email": email} for email in body.attendees]
     
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.transport("google")) as client:
         response = await client.post(
             f"{GOOGLE_CALENDAR_API}/calendars/{integration.calendar_id}/events",
             headers={
@@ -505,7 +566,7 @@ async def get_available_slots(
     time_min = target_date.replace(hour=0, minute=0, second=0).isoformat()
     time_max = target_date.replace(hour=23, minute=59, second=59).isoformat()
     
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.transport("google")) as client:
         response = await client.get(
             f"{GOOGLE_CALENDAR_API}/calendars/{integration.calendar_id}/events",
             headers={"Authorization": f"Bearer {access_token}"},
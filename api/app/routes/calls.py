@@ -1,67 +1,71 @@
 """
 CallRounded Manager - Calls Routes
 """
-import time
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
 from ..deps import AccessibleAgentIds, CurrentUser, DBSession, TenantId
-from ..services import callrounded as cr
+from ..models import CallCache
+from ..responses import FastJSONResponse, JSONArrayStream
+from ..services import agent_cache, call_details, call_export, call_store, rollups
+from ..services.transcripts import transform_transcript
+from .calendar import events_booked_between
 
 router = APIRouter()
 
-# === Bug #2 fix: agent name cache instead of hardcoded ===
-_agent_name_cache: dict[str, tuple[str, float]] = {}
-_CACHE_TTL = 300  # 5 minutes
+async def get_agent_name(agent_id: str | None) -> str:
+    """Agent name through the shared agent metadata cache (Bug #2)."""
+    return await agent_cache.get_agent_name(agent_id)
 
 
-async def get_agent_name(agent_id: str | None) -> str:
-    """Fetch agent name from CallRounded API with caching."""
-    if not agent_id:
-        return "Agent inconnu"
-    now = time.time()
-    if agent_id in _agent_name_cache:
-        name, cached_at = _agent_name_cache[agent_id]
-        if now - cached_at < _CACHE_TTL:
-            return name
-    agent = await cr.get_agent(agent_id)
-    name = agent.get("name", "Agent inconnu") if agent else "Agent inconnu"
-    _agent_name_cache[agent_id] = (name, now)
-    return name
+def _date_range(from_date: str | None, to_date: str | None) -> tuple[datetime | None, datetime | None]:
+    """``[start, end)`` covering the given YYYY-MM-DD days (Bug #4); bad dates are ignored."""
+    filter_from = None
+    filter_to = None
+    if from_date:
+        try:
+            filter_from = datetime.strptime(from_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    if to_date:
+        try:
+            filter_to = datetime.strptime(to_date, "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1)
+        except ValueError:
+            pass
+    return filter_from, filter_to
+
+
+async def _calls_page(
+    db,
+    tenant_id,
+    accessible_agents,
+    limit: int,
+    page: int,
+    cursor: str | None,
+    call_status: str | None,
+    agent_id: str | None,
+    from_date: str | None,
+    to_date: str | None,
+):
+    """One page of stored calls (newest first), the next cursor and the exact total."""
+    filter_from, filter_to = _date_range(from_date, to_date)
+    query = call_store.filtered_calls(tenant_id, accessible_agents, filter_from, filter_to)
+    if call_status:
+        query = query.where(CallCache.status == call_status)
+    if agent_id:
+        query = query.where(CallCache.agent_external_id == agent_id)
 
+    try:
+        rows, next_cursor = await call_store.fetch_page(db, query, limit, cursor=cursor, offset=(page - 1) * limit)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Curseur de pagination invalide")
 
-def transform_transcript(raw_transcript):
-    """Transform CallRounded transcript to frontend format.
-    Filters out system messages and knowledge base content."""
-    if not raw_transcript:
-        return []
-    # Roles/patterns to exclude (system, KB injection, task switches)
-    EXCLUDED_ROLES = {"system", "tool", "function"}
-    KB_PREFIXES = (
-        "[Knowledge Base", "[KB]", "[Context]", "[System]",
-        "Base de connaissances", "knowledge_base",
+    total_items = await rollups.count_calls(
+        db, tenant_id, accessible_agents, filter_from, filter_to, status=call_status or None, agent_id=agent_id or None
     )
-    result = []
-    for i, entry in enumerate(raw_transcript):
-        role = entry.get("role", "agent")
-        content = entry.get("content", "") or ""
-        # Skip system/tool roles
-        if role.lower() in EXCLUDED_ROLES:
-            continue
-        # Skip KB-injected content
-        if any(content.strip().startswith(prefix) for prefix in KB_PREFIXES):
-            continue
-        # Skip empty messages
-        if not content.strip():
-            continue
-        speaker = "agent" if role == "agent" else "caller"
-        result.append({
-            "speaker": speaker,
-            "text": content,
-            "timestamp": i * 5,
-        })
-    return result
+    return [call_store.to_api_dict(r) for r in rows], next_cursor, total_items
 
 
 @router.get("")
@@ -72,79 +76,45 @@ async def list_calls(
     accessible_agents: AccessibleAgentIds,
     limit: int = Query(50, ge=1, le=200),
     page: int = Query(1, ge=1),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
     call_status: str | None = Query(None, alias="status"),
     agent_id: str | None = Query(None),
     from_date: str | None = Query(None),
     to_date: str | None = Query(None),
 ):
-    """List calls with basic info."""
-    raw = await cr.list_calls(limit=limit, page=page)
-    calls = raw.get("data", []) if isinstance(raw, dict) else raw
-    results = []
-
-    # Parse date filters (Bug #4)
-    filter_from = None
-    filter_to = None
-    if from_date:
-        try:
-            filter_from = datetime.strptime(from_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-        except ValueError:
-            pass
-    if to_date:
-        try:
-            filter_to = datetime.strptime(to_date, "%Y-%m-%d").replace(
-                hour=23, minute=59, second=59, tzinfo=timezone.utc
-            )
-        except ValueError:
-            pass
-
-    for c in calls:
-        agent_ext = c.get("agent_id")
-        agent_str = str(agent_ext) if agent_ext else None
-        c_status = c.get("status", "unknown")
-
-        if call_status and c_status != call_status:
-            continue
-        if agent_id and agent_str != agent_id:
-            continue
-        if accessible_agents is not None and agent_str not in accessible_agents:
-            continue
+    """List calls with basic info (local call store, keyset-paginated)."""
+    calls, next_cursor, total_items = await _calls_page(
+        db, tenant_id, accessible_agents, limit, page, cursor, call_status, agent_id, from_date, to_date
+    )
 
-        # Date filtering
-        if filter_from or filter_to:
-            start_str = c.get("start_time")
-            if start_str:
-                try:
-                    start_dt = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
-                    if start_dt.tzinfo is None:
-                        start_dt = start_dt.replace(tzinfo=timezone.utc)
-                    if filter_from and start_dt < filter_from:
-                        continue
-                    if filter_to and start_dt > filter_to:
-                        continue
-                except (ValueError, AttributeError):
-                    pass
+    def results():
+        for c in calls:
+            agent_ext = c.get("agent_id")
+            yield {
+                "id": str(c.get("id", "")),
+                "agent_id": str(agent_ext) if agent_ext else None,
+                "from_number": c.get("from_number"),
+                "to_number": c.get("to_number"),
+                "duration_seconds": c.get("duration_seconds"),
+                "status": c.get("status", "unknown"),
+                "transcript_string": c.get("transcript_string"),
+                "transcript": c.get("transcript"),
+                "cost": c.get("cost"),
+                "start_time": c.get("start_time"),
+                "end_time": c.get("end_time"),
+            }
 
-        results.append({
-            "id": str(c.get("id", "")),
-            "agent_id": agent_str,
-            "from_number": c.get("from_number"),
-            "to_number": c.get("to_number"),
-            "duration_seconds": c.get("duration_seconds"),
-            "status": c_status,
-            "transcript_string": c.get("transcript_string"),
-            "transcript": c.get("transcript"),
-            "cost": c.get("cost"),
-            "start_time": c.get("start_time"),
-            "end_time": c.get("end_time"),
-        })
-
-    return {
-        "data": results,
-        "total_items": len(results),
-        "current_page": page,
-        "total_pages": raw.get("total_pages", 1),
-    }
+    # Streamed: each call is serialized as it is sent
+    return JSONArrayStream(
+        {
+            "total_items": total_items,
+            "current_page": page,
+            "total_pages": max(1, (total_items + limit - 1) // limit),
+            "next_cursor": next_cursor,
+        },
+        "data",
+        results(),
+    )
 
 
 @router.get("/rich")
@@ -155,132 +125,178 @@ async def list_calls_rich(
     accessible_agents: AccessibleAgentIds,
     limit: int = Query(20, ge=1, le=100),
     page: int = Query(1, ge=1),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
     call_status: str | None = Query(None, alias="status"),
     from_date: str | None = Query(None),
     to_date: str | None = Query(None),
 ):
-    """List calls with rich data formatted for frontend (paginated)."""
-    # Fetch more than needed to handle filtering
-    fetch_limit = min(limit * 3, 500)
-    raw = await cr.list_calls(limit=fetch_limit, page=1)
-    calls = raw.get("data", []) if isinstance(raw, dict) else raw
-    filtered = []
+    """List calls with rich data formatted for frontend (paginated).
 
-    # Parse date filters
-    filter_from = None
-    filter_to = None
-    if from_date:
-        try:
-            filter_from = datetime.strptime(from_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-        except ValueError:
-            pass
-    if to_date:
-        try:
-            filter_to = datetime.strptime(to_date, "%Y-%m-%d").replace(
-                hour=23, minute=59, second=59, tzinfo=timezone.utc
-            )
-        except ValueError:
-            pass
+    Pass ``cursor`` (the ``next_cursor`` of the previous page) to page in
+    constant time; ``page`` alone still works but costs an OFFSET.
+    """
+    page_calls, next_cursor, total_items = await _calls_page(
+        db, tenant_id, accessible_agents, limit, page, cursor, call_status, None, from_date, to_date
+    )
 
-    for c in calls:
-        agent_ext = c.get("agent_id")
-        agent_str = str(agent_ext) if agent_ext else None
+    agent_names = await agent_cache.get_agent_names(
+        str(c["agent_id"]) for c in page_calls if c.get("agent_id")
+    )
 
-        if accessible_agents is not None and agent_str not in accessible_agents:
-            continue
+    def results():
+        for c in page_calls:
+            agent_ext = c.get("agent_id")
+            agent_name = agent_names.get(str(agent_ext), agent_cache.UNKNOWN_AGENT) if agent_ext else agent_cache.UNKNOWN_AGENT
 
-        c_status = c.get("status", "unknown")
-        if call_status and c_status != call_status:
-            continue
+            yield {
+                "id": str(c.get("id", "")),
+                "external_id": str(c.get("id", "")),
+                "agent_name": agent_name,
+                "caller_number": c.get("from_number") or "",
+                "caller_name": None,
+                "direction": c.get("direction", "inbound"),
+                "status": c.get("status", "completed"),
+                "duration_seconds": c.get("duration_seconds") or 0,
+                "started_at": c.get("start_time"),
+                "ended_at": c.get("end_time"),
+                "outcome": None,
+                "sentiment": None,
+                "transcript": transform_transcript(c.get("transcript")),
+                "summary": c.get("transcript_string"),
+                "recording_url": c.get("recording_url"),
+                "tags": [],
+                "cost": c.get("cost") or 0,
+            }
 
-        # Date filtering
-        if filter_from or filter_to:
-            start_str = c.get("start_time")
-            if start_str:
-                try:
-                    start_dt = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
-                    if start_dt.tzinfo is None:
-                        start_dt = start_dt.replace(tzinfo=timezone.utc)
-                    if filter_from and start_dt < filter_from:
-                        continue
-                    if filter_to and start_dt > filter_to:
-                        continue
-                except (ValueError, AttributeError):
-                    pass
+    # Streamed: transcripts are transformed and serialized call by call as they are sent
+    return JSONArrayStream(
+        {
+            "total_items": total_items,
+            "current_page": page,
+            "total_pages": max(1, (total_items + limit - 1) // limit),
+            "per_page": limit,
+            "next_cursor": next_cursor,
+        },
+        "calls",
+        results(),
+    )
 
-        filtered.append(c)
 
-    # Paginate
-    total_items = len(filtered)
-    total_pages = max(1, (total_items + limit - 1) // limit)
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    page_calls = filtered[start_idx:end_idx]
+@router.get("/search")
+async def search_calls(
+    db: DBSession,
+    current_user: CurrentUser,
+    tenant_id: TenantId,
+    accessible_agents: AccessibleAgentIds,
+    q: str = Query(..., min_length=2, max_length=200, description="Mots recherchés dans les transcriptions"),
+    limit: int = Query(20, ge=1, le=50),
+    page: int = Query(1, ge=1),
+):
+    """Search call transcripts (ranked, with highlighted snippets)."""
+    matches, total_items = await call_store.search_transcripts(
+        db, tenant_id, accessible_agents, q, limit, offset=(page - 1) * limit
+    )
+    agent_names = await agent_cache.get_agent_names(call.agent_external_id for call, _, _ in matches)
 
     results = []
-    for c in page_calls:
-        agent_ext = c.get("agent_id")
-        agent_str = str(agent_ext) if agent_ext else None
-        agent_name = await get_agent_name(agent_str)
-
+    for call, rank, snippet in matches:
         results.append({
-            "id": str(c.get("id", "")),
-            "external_id": str(c.get("id", "")),
-            "agent_name": agent_name,
-            "caller_number": c.get("from_number") or "",
-            "caller_name": None,
-            "direction": c.get("direction", "inbound"),
-            "status": c.get("status", "completed"),
-            "duration_seconds": c.get("duration_seconds") or 0,
-            "started_at": c.get("start_time"),
-            "ended_at": c.get("end_time"),
-            "outcome": None,
-            "sentiment": None,
-            "transcript": transform_transcript(c.get("transcript")),
-            "summary": c.get("transcript_string"),
-            "recording_url": c.get("recording_url"),
-            "tags": [],
-            "cost": c.get("cost") or 0,
+            "id": call.external_call_id,
+            "external_id": call.external_call_id,
+            "agent_name": agent_names.get(call.agent_external_id, agent_cache.UNKNOWN_AGENT),
+            "caller_number": call.caller_number or "",
+            "status": call.status,
+            "duration_seconds": call.duration or 0,
+            "started_at": call.started_at.isoformat() if call.started_at else None,
+            "rank": rank,
+            "snippet": snippet,
         })
 
-    return {
-        "calls": results,
+    return FastJSONResponse({
+        "results": results,
         "total_items": total_items,
         "current_page": page,
-        "total_pages": total_pages,
+        "total_pages": max(1, (total_items + limit - 1) // limit),
         "per_page": limit,
-    }
+    })
+
+
+@router.get("/export")
+async def export_calls(
+    current_user: CurrentUser,
+    tenant_id: TenantId,
+    accessible_agents: AccessibleAgentIds,
+    export_format: str = Query("csv", alias="format", enum=list(call_export.FORMATS)),
+    call_status: str | None = Query(None, alias="status"),
+    agent_id: str | None = Query(None),
+    from_date: str | None = Query(None),
+    to_date: str | None = Query(None),
+    include_transcript: bool = Query(False),
+):
+    """Export the filtered call history (local call store), newest first, as CSV or NDJSON.
+
+    The file is streamed while it is read: no page size, no total count.
+    """
+    if export_format not in call_export.FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Format d'export invalide (csv ou ndjson)")
+    filter_from, filter_to = _date_range(from_date, to_date)
+    query = call_export.export_query(
+        tenant_id, accessible_agents, filter_from, filter_to, call_status, agent_id, include_transcript
+    )
+    chunks = call_export.csv_chunks if export_format == "csv" else call_export.ndjson_chunks
+    filename = f"appels-{datetime.now(timezone.utc):%Y%m%d-%H%M}.{export_format}"
+    return StreamingResponse(
+        chunks(query, include_transcript),
+        media_type=call_export.FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
 
 
 @router.get("/{call_id}")
 async def get_call(
     call_id: str,
-    db: DBSession,
     current_user: CurrentUser,
     tenant_id: TenantId,
     accessible_agents: AccessibleAgentIds,
 ):
-    """Get call details with full transcript."""
-    call = await cr.get_call(call_id)
+    """Get call details with full transcript, agent, calendar and alert context.
+
+    The context lookups run concurrently; one that fails or times out is
+    left empty and listed in ``unavailable``.
+    """
+    call = await call_details.get_call(tenant_id, call_id)
     
     if not call:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appel non trouvé")
     
     agent_id = str(call.get("agent_id", "")) if call.get("agent_id") else None
     
-    if accessible_agents is not None and agent_id not in accessible_agents:
+    if agent_id not in accessible_agents:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Vous n'avez pas accès à cet appel"
         )
     
-    # Bug #2: dynamic agent name
-    agent_name = await get_agent_name(agent_id)
+    started_at = call_store.parse_timestamp(call.get("start_time"))
+    ended_at = call_store.parse_timestamp(call.get("end_time")) or (
+        started_at + timedelta(seconds=call.get("duration_seconds") or 0) if started_at else None
+    )
+    timeouts = call_details.TIMEOUTS
+    parts = {"agent_name": (get_agent_name(agent_id), timeouts["agent_name"], agent_cache.UNKNOWN_AGENT)}
+    if started_at:
+        # Bookings made during the call, a few minutes of margin for the agent's last tool calls
+        parts["calendar_events"] = (
+            events_booked_between(tenant_id, started_at, ended_at + timedelta(minutes=5)),
+            timeouts["calendar_events"],
+            None,
+        )
+        parts["alerts"] = (call_details.related_alerts(tenant_id, started_at), timeouts["alerts"], [])
+    context, unavailable = await call_details.gather_parts(parts)
     
-    return {
+    return FastJSONResponse({
         "id": str(call.get("id", call_id)),
         "external_id": str(call.get("id", call_id)),
-        "agent_name": agent_name,
+        "agent_name": context["agent_name"],
         "caller_number": call.get("from_number") or "",
         "caller_name": None,
         "direction": call.get("direction", "inbound"),
@@ -297,4 +313,7 @@ async def get_call(
         "cost": call.get("cost"),
         "variable_values": call.get("variable_values"),
         "post_call_answers": call.get("post_call_answers"),
-    }
+        "calendar_events": context.get("calendar_events"),
+        "alerts": context.get("alerts", []),
+        "unavailable": unavailable,
+    })
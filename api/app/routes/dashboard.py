@@ -7,14 +7,19 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Query
+from sqlalchemy import distinct, func, select
 
 from ..deps import AccessibleAgentIds, CurrentUser, DBSession, TenantId
-from ..services import callrounded as cr
+from ..models import CallRollup
+from ..services import rollups
+from ..services import agent_cache
+from ..services.response_cache import CachedRoute, cached
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/stats")
+@cached(ttl=15, tags=("calls",))
 async def dashboard_stats(
     db: DBSession,
     current_user: CurrentUser,
@@ -24,15 +29,9 @@ async def dashboard_stats(
     to_date: Optional[str] = Query(None, description="End date YYYY-MM-DD"),
 ):
     """
-    Compute dashboard stats from CallRounded API data.
+    Compute dashboard stats from the daily call rollups (synced from CallRounded).
     Users see stats only for their assigned agents.
     """
-    try:
-        raw = await cr.list_calls(limit=1000)
-        calls = raw.get("data", []) if isinstance(raw, dict) else raw
-    except Exception:
-        calls = []
-
     # Parse date filters
     filter_from = None
     filter_to = None
@@ -52,79 +51,48 @@ async def dashboard_stats(
     now = datetime.now(timezone.utc)
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
 
-    total_calls = 0
-    calls_today = 0
-    completed_calls = 0
-    missed_calls = 0
-    failed_calls = 0
-    total_duration = 0.0
-    total_cost = 0.0
-    duration_count = 0
-    seen_agents = set()
-
-    for c in calls:
-        agent_id = str(c.get("agent_id", "")) if c.get("agent_id") else None
-        
-        # Filter by accessible agents (role-based)
-        if accessible_agents is not None and agent_id not in accessible_agents:
-            continue
-        
-        start_str = c.get("start_time")
-        start_dt = None
-        if start_str:
-            try:
-                start_dt = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
-                if start_dt.tzinfo is None:
-                    start_dt = start_dt.replace(tzinfo=timezone.utc)
-            except (ValueError, AttributeError):
-                pass
-
-        if filter_from and start_dt and start_dt < filter_from:
-            continue
-        if filter_to and start_dt and start_dt > filter_to:
-            continue
-
-        total_calls += 1
-        
-        if agent_id:
-            seen_agents.add(agent_id)
-
-        status = c.get("status", "unknown")
-        if status == "completed":
-            completed_calls += 1
-        elif status == "missed":
-            missed_calls += 1
-        elif status == "failed":
-            failed_calls += 1
-
-        dur = c.get("duration_seconds")
-        if dur and dur > 0:
-            total_duration += dur
-            duration_count += 1
-
-        cost = c.get("cost")
-        if cost:
-            total_cost += cost
-
-        if start_dt and start_dt >= today_start:
-            calls_today += 1
+    buckets = rollups.scope(tenant_id, accessible_agents, "day", filter_from, filter_to)
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(CallRollup.total_calls), 0),
+            func.coalesce(func.sum(CallRollup.total_calls).filter(CallRollup.bucket_start >= today_start), 0),
+            func.coalesce(func.sum(CallRollup.completed_calls), 0),
+            func.coalesce(func.sum(CallRollup.missed_calls), 0),
+            func.coalesce(func.sum(CallRollup.failed_calls), 0),
+            func.coalesce(func.sum(CallRollup.duration_sum), 0.0),
+            func.coalesce(func.sum(CallRollup.duration_count), 0),
+            func.coalesce(func.sum(CallRollup.cost_sum), 0.0),
+            func.count(distinct(CallRollup.agent_external_id)).filter(CallRollup.agent_external_id != ""),
+        ).where(*buckets)
+    )
+    (
+        total_calls,
+        calls_today,
+        completed_calls,
+        missed_calls,
+        failed_calls,
+        total_duration,
+        duration_count,
+        total_cost,
+        seen_agents_count,
+    ) = result.one()
 
     avg_duration = round(total_duration / duration_count, 1) if duration_count > 0 else 0.0
     response_rate = round((completed_calls / total_calls * 100), 1) if total_calls > 0 else 0.0
 
     # Count agents — Bug #3: use API instead of empty AgentCache table
-    if accessible_agents is not None:
-        total_agents = len(accessible_agents)
-        active_agents = len(seen_agents)
+    if not accessible_agents.unrestricted:
+        total_agents = len(accessible_agents.agents)
+        active_agents = seen_agents_count
     else:
-        # Admin sees all agents — fetch from CallRounded API directly
+        # Admin sees all agents — CallRounded API through the agent cache
         try:
-            all_api_agents = await cr.list_agents()
+            all_api_agents = await agent_cache.list_agents()
             total_agents = len(all_api_agents)
             active_agents = total_agents  # All listed agents are considered active
         except Exception:
-            total_agents = len(seen_agents)
-            active_agents = len(seen_agents)
+            total_agents = seen_agents_count
+            active_agents = seen_agents_count
 
     return {
         "total_agents": total_agents,
@@ -135,6 +103,7 @@ async def dashboard_stats(
         "missed_calls": missed_calls,
         "failed_calls": failed_calls,
         "avg_duration": avg_duration,
+        "duration_count": duration_count,  # lets live clients keep avg_duration exact
         "total_cost": round(total_cost, 2),
         "response_rate": response_rate,
     }
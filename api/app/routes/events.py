@@ -0,0 +1,69 @@
+"""
+CallRounded Manager - Live Events Routes (Server-Sent Events)
+
+One long-lived stream per browser tab. Events:
+
+- ``call``   — a call was created or changed (summary of the call)
+- ``stats``  — deltas to apply to the dashboard counters
+- ``alert``  — a new alert event
+- ``resync`` — too much changed at once: reload the data
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Iterator
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from ..deps import AccessibleAgentIds, CurrentUser, TenantId
+from ..services import event_hub
+
+router = APIRouter()
+
+_HEARTBEAT_SECONDS = 15  # keeps proxies from closing an idle stream
+_RETRY_MS = 5000
+
+
+def _format(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _sse_events(message: dict[str, Any]) -> Iterator[tuple[str, dict[str, Any]]]:
+    data = message.get("data") or {}
+    kind = message.get("kind")
+    if kind == "call":
+        summary = {k: v for k, v in data.items() if k != "delta"}
+        yield "call", summary
+        if data.get("delta"):
+            yield "stats", {**data["delta"], "start_time": data.get("start_time")}
+    elif kind in ("alert", "stats", "resync"):
+        yield kind, data
+
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    current_user: CurrentUser,
+    tenant_id: TenantId,
+    accessible_agents: AccessibleAgentIds,
+):
+    """Live updates for the current tenant, restricted to the user's agents."""
+
+    async def stream() -> AsyncIterator[str]:
+        async with event_hub.subscribe(tenant_id, accessible_agents) as sub:
+            yield f"retry: {_RETRY_MS}\n\n"
+            yield _format("ready", {"user_id": str(current_user.id)})
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), timeout=_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                for event, data in _sse_events(message):
+                    yield _format(event, data)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -8,7 +8,7 @@ import re
 from fastapi import APIRouter
 
 from ..deps import AccessibleAgentIds, CurrentUser, DBSession, TenantId
-from ..services import callrounded as cr
+from ..services import agent_cache
 
 router = APIRouter()
 
@@ -95,7 +95,7 @@ async def list_knowledge_bases(
     /knowledge-bases API endpoint is not available in CallRounded API v1.
     """
     try:
-        agents = await cr.list_agents()
+        agents = accessible_agents.filter(await agent_cache.list_agents(), key=lambda a: a.get("id"))
         if not agents:
             return []
         return [parse_salon_info(a) for a in agents]
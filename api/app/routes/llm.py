@@ -13,10 +13,12 @@ from pydantic import BaseModel
 from ..config import settings
 from ..deps import AdminUser, DBSession, TenantId
 from ..services import callrounded as cr
+from ..services import metrics
+from ..services.response_cache import CachedRoute, cached
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/admin/llm", tags=["LLM Agent Builder"])
+router = APIRouter(prefix="/admin/llm", tags=["LLM Agent Builder"], route_class=CachedRoute)
 
 
 # ============================================================================
@@ -174,7 +176,7 @@ async def call_anthropic(messages: list[dict], tools: list[dict] | None = None)
             detail="ANTHROPIC_API_KEY non configurée"
         )
     
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.transport("anthropic")) as client:
         payload = {
             "model": "claude-sonnet-4-20250514",
             "max_tokens": 2048,
@@ -208,7 +210,7 @@ async def call_anthropic(messages: list[dict], tools: list[dict] | None = None)
 
 async def create_agent_via_api(agent_config: dict) -> dict:
     """Create agent via CallRounded API."""
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=metrics.transport("callrounded")) as client:
         response = await client.post(
             f"{settings.CALLROUNDED_API_URL}/agents",
             headers={
@@ -355,6 +357,7 @@ async def chat_with_llm(
 
 
 @router.get("/voices")
+@cached(ttl=3600)
 async def list_available_voices(admin: AdminUser):
     """List available voices for agent creation."""
     return {
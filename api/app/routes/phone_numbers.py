@@ -4,10 +4,11 @@ CallRounded Manager - Phone Numbers Routes
 since the /phone-numbers API endpoint is not available.
 """
 from fastapi import APIRouter
+from sqlalchemy import func, select
 
 from ..deps import AccessibleAgentIds, CurrentUser, DBSession, TenantId
-from ..services import callrounded as cr
-from .calls import get_agent_name
+from ..models import CallCache
+from ..services import agent_cache
 
 router = APIRouter()
 
@@ -22,40 +23,47 @@ async def list_phone_numbers(
     """
     Extract phone numbers from call data since the /phone-numbers API
     endpoint is not available in CallRounded API v1.
-    We deduce our numbers from the 'to_number' field in calls.
+    We deduce our numbers from the 'to_number' field of the local call store.
     """
     try:
-        raw = await cr.list_calls(limit=200)
-        calls = raw.get("data", []) if isinstance(raw, dict) else raw
-
-        # Extract unique to_numbers (our numbers that receive calls)
-        numbers_map: dict[str, dict] = {}
-        for c in calls:
-            to_num = c.get("to_number")
-            if to_num and to_num not in numbers_map:
-                agent_id = c.get("agent_id")
-                agent_str = str(agent_id) if agent_id else None
-                numbers_map[to_num] = {
-                    "number": to_num,
-                    "agent_id": agent_str,
-                    "agent_name": None,
-                    "call_count": 0,
-                    "last_call": None,
-                    "status": "active",
-                }
-            if to_num:
-                numbers_map[to_num]["call_count"] += 1
-                start = c.get("start_time")
-                if start:
-                    current_last = numbers_map[to_num]["last_call"]
-                    if not current_last or start > current_last:
-                        numbers_map[to_num]["last_call"] = start
+        tenant_calls = (
+            CallCache.tenant_id == tenant_id,
+            CallCache.to_number.isnot(None),
+            accessible_agents.clause(CallCache.agent_external_id),
+        )
+
+        # Call count and last call per number (our numbers that receive calls)
+        stats = await db.execute(
+            select(CallCache.to_number, func.count(), func.max(CallCache.started_at))
+            .where(*tenant_calls)
+            .group_by(CallCache.to_number)
+        )
+        # Agent of the most recent call on each number
+        latest_agents = await db.execute(
+            select(CallCache.to_number, CallCache.agent_external_id)
+            .where(*tenant_calls)
+            .distinct(CallCache.to_number)
+            .order_by(CallCache.to_number, CallCache.started_at.desc())
+        )
+        agent_by_number = dict(latest_agents.all())
+
+        numbers = []
+        for to_num, call_count, last_call in stats.all():
+            numbers.append({
+                "number": to_num,
+                "agent_id": agent_by_number.get(to_num),
+                "agent_name": None,
+                "call_count": call_count,
+                "last_call": last_call.isoformat() if last_call else None,
+                "status": "active",
+            })
 
         # Get agent names
-        for num_data in numbers_map.values():
+        agent_names = await agent_cache.get_agent_names(n["agent_id"] for n in numbers)
+        for num_data in numbers:
             if num_data["agent_id"]:
-                num_data["agent_name"] = await get_agent_name(num_data["agent_id"])
+                num_data["agent_name"] = agent_names[num_data["agent_id"]]
 
-        return list(numbers_map.values())
+        return numbers
     except Exception:
         return []
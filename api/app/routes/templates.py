@@ -12,10 +12,12 @@ from sqlalchemy import or_, select, func
 
 from ..deps import AdminUser, CurrentUser, DBSession, TenantId
 from ..models import AgentTemplate
+from ..services import response_cache
+from ..services.response_cache import CachedRoute, cached
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/templates", tags=["Agent Templates"])
+router = APIRouter(prefix="/templates", tags=["Agent Templates"], route_class=CachedRoute)
 
 
 # ============================================================================
@@ -181,6 +183,7 @@ Ton ton : accueillant et gourmand.""",
 # ============================================================================
 
 @router.get("", response_model=list[TemplateOut])
+@cached(ttl=600, tags=("templates",))
 async def list_templates(
     current_user: CurrentUser,
     tenant_id: TenantId,
@@ -210,6 +213,7 @@ async def list_templates(
 
 
 @router.get("/presets", response_model=list[TemplateOut])
+@cached(ttl=3600, tags=("templates",))
 async def list_preset_templates(
     current_user: CurrentUser,
     db: DBSession,
@@ -224,6 +228,7 @@ async def list_preset_templates(
 
 
 @router.get("/categories")
+@cached(ttl=3600)
 async def list_categories(current_user: CurrentUser):
     """List available template categories."""
     return {
@@ -301,6 +306,7 @@ async def create_template(
     )
     
     db.add(template)
+    await response_cache.invalidate(db, tenant_id, "templates")
     await db.commit()
     await db.refresh(template)
     
@@ -335,6 +341,7 @@ async def update_template(
     for field, value in body.model_dump(exclude_unset=True).items():
         setattr(template, field, value)
     
+    await response_cache.invalidate(db, tenant_id, "templates")
     await db.commit()
     await db.refresh(template)
     
@@ -365,6 +372,7 @@ async def delete_template(
         )
     
     await db.delete(template)
+    await response_cache.invalidate(db, tenant_id, "templates")
     await db.commit()
     
     logger.info(f"Template deleted: {template_id}")
@@ -393,6 +401,8 @@ async def use_template(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template non trouvé")
     
     template.usage_count += 1
+    # Usage counts order the lists; a preset's count shows in every tenant's
+    await response_cache.invalidate(db, tenant_id, "templates", all_tenants=template.is_preset)
     await db.commit()
     await db.refresh(template)
     
@@ -426,6 +436,8 @@ async def seed_preset_templates(
         db.add(template)
         created += 1
     
+    if created:
+        await response_cache.invalidate(db, admin.tenant_id, "templates", all_tenants=True)
     await db.commit()
     
     logger.info(f"Seeded {created} preset templates")
@@ -0,0 +1,73 @@
+"""
+CallRounded Manager - Webhooks Routes
+
+CallRounded pushes call events here instead of us polling the calls list.
+Requests are signed: ``X-CallRounded-Signature: t=<unix ts>,v1=<hex>`` where
+``v1`` is the HMAC-SHA256 of ``"<t>.<raw body>"`` with the webhook secret.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import time
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+
+from ..config import settings
+from ..deps import DBSession
+from ..services import call_ingest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _verify_signature(body: bytes, header: str | None) -> None:
+    """Raise 401 unless ``header`` is a fresh, valid signature of ``body``."""
+    if not header:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Signature manquante")
+    parts = dict(item.split("=", 1) for item in header.split(",") if "=" in item)
+    timestamp, signature = parts.get("t", ""), parts.get("v1", "")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > settings.CALLROUNDED_WEBHOOK_TOLERANCE_SECONDS:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Signature expirée")
+    expected = hmac.new(
+        settings.CALLROUNDED_WEBHOOK_SECRET.encode(),
+        timestamp.encode() + b"." + body,
+        hashlib.sha256,
+    ).hexdigest()
+    if not hmac.compare_digest(expected, signature):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Signature invalide")
+
+
+@router.post("/callrounded")
+async def callrounded_webhook(
+    request: Request,
+    db: DBSession,
+    x_callrounded_signature: str | None = Header(None),
+):
+    """Receive a call.started / call.ended / transcript.ready event."""
+    if not settings.CALLROUNDED_WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Webhook non configuré")
+
+    body = await request.body()
+    _verify_signature(body, x_callrounded_signature)
+
+    try:
+        event = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="JSON invalide")
+    if not isinstance(event, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Événement invalide")
+
+    event_type = event.get("type") or event.get("event")
+    if event_type not in call_ingest.EVENT_TYPES:
+        # Acknowledge so that CallRounded does not retry events we do not use
+        return {"status": "ignored", "type": event_type}
+
+    call = event.get("data") or {}
+    if not isinstance(call, dict) or not call.get("id"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Appel sans identifiant")
+
+    await call_ingest.ingest_event(db, event_type, call)
+    await db.commit()
+    return {"status": "ok", "type": event_type, "call_id": str(call["id"])}
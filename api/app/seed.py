@@ -1,13 +1,16 @@
-"""Seed script — creates default tenant and admin user."""
+"""Seed script — migrates the database, then creates default tenant and admin user."""
 
 import asyncio
+from pathlib import Path
 
-from sqlalchemy import select
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .auth import hash_password
+from .auth import hash_password_async
 from .database import async_session, engine
-from .models import Base, Tenant, User
+from .models import Tenant, User
 
 
 ADMIN_USERS = [
@@ -19,11 +22,38 @@ ADMIN_USERS = [
 ]
 
 
-async def seed():
-    # Create tables if they do not exist (dev convenience; use alembic in prod)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+async def _unversioned_revision() -> str | None:
+    """Revision matching a schema created by ``create_all`` before migrations existed.
+
+    None when the database is empty or already under alembic.
+    """
+    async with engine.connect() as conn:
+        tables = {
+            name: (await conn.execute(text("SELECT to_regclass(:name)"), {"name": name})).scalar() is not None
+            for name in ("alembic_version", "tenants", "notification_outbox")
+        }
+    await engine.dispose()  # the pool must not outlive this event loop
+    if tables["alembic_version"] or not tables["tenants"]:
+        return None
+    return "0002" if tables["notification_outbox"] else "0001"
 
+
+def migrate():
+    """Bring the schema to the latest alembic revision."""
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    existing = asyncio.run(_unversioned_revision())
+    if existing:
+        command.stamp(config, existing)
+        print(f"✓ Existing schema stamped at revision {existing}")
+    command.upgrade(config, "head")
+    print("✓ Migrations applied")
+
+
+async def seed():
     async with async_session() as db:
         # Tenant
         result = await db.execute(select(Tenant).where(Tenant.name == "W&I Agency"))
@@ -53,7 +83,7 @@ async def seed():
                 user = User(
                     tenant_id=tenant.id,
                     email=admin["email"],
-                    password_hash=hash_password(admin["password"]),
+                    password_hash=await hash_password_async(admin["password"]),
                     role=admin["role"],
                     is_active=True,
                 )
@@ -68,4 +98,5 @@ async def seed():
 
 
 if __name__ == "__main__":
+    migrate()
     asyncio.run(seed())
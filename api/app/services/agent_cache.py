@@ -0,0 +1,288 @@
+"""Agent metadata cache — one place to resolve CallRounded agents (name, prompt, ...).
+
+Lookups go through a bounded in-process LRU, optionally backed by the
+``agent_metadata_cache`` table so that every gunicorn worker shares hits.
+
+- Fresh entries (younger than the TTL) are served directly.
+- Stale entries (within the stale-while-revalidate window) are served while a
+  background refresh runs.
+- Concurrent misses on the same agent share a single upstream request.
+- Agents CallRounded answers 404 for are cached briefly as misses. An
+  upstream error is not an answer: nothing is stored, a stale entry keeps
+  being served and its refresh is retried after ``_RETRY_AFTER`` seconds.
+- :func:`invalidate` publishes an ``agent`` event through the event hub:
+  every worker drops its local entry when the writer commits.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable, Protocol
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import async_session
+from ..models import AgentMetadataCache
+from . import callrounded as cr
+from . import event_hub
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_AGENT = "Agent inconnu"
+
+_NEGATIVE_TTL = 30  # seconds a "not found" answer is kept
+_RETRY_AFTER = 30  # seconds before a failed refresh of a stale entry is retried
+
+
+@dataclass
+class CacheEntry:
+    value: dict[str, Any] | None
+    fetched_at: float  # epoch seconds
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> CacheEntry | None: ...
+    async def set(self, key: str, entry: CacheEntry) -> None: ...
+    async def delete(self, key: str) -> None: ...
+
+
+class MemoryBackend:
+    """Bounded LRU living in the worker's memory."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    async def get(self, key: str) -> CacheEntry | None:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self.discard(key)
+
+    def discard(self, key: str | None = None) -> None:
+        """Drop ``key``, or every entry when None."""
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PostgresBackend:
+    """Entries stored in ``agent_metadata_cache``, shared by every worker."""
+
+    async def get(self, key: str) -> CacheEntry | None:
+        async with async_session() as db:
+            row = (await db.execute(
+                select(AgentMetadataCache).where(AgentMetadataCache.external_id == key)
+            )).scalar_one_or_none()
+        if row is None:
+            return None
+        return CacheEntry(row.payload, row.fetched_at.timestamp())
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        fetched_at = datetime.fromtimestamp(entry.fetched_at, tz=timezone.utc)
+        stmt = pg_insert(AgentMetadataCache).values(external_id=key, payload=entry.value, fetched_at=fetched_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AgentMetadataCache.external_id],
+            set_={"payload": stmt.excluded.payload, "fetched_at": stmt.excluded.fetched_at},
+        )
+        async with async_session() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    async def delete(self, key: str) -> None:
+        async with async_session() as db:
+            await db.execute(delete(AgentMetadataCache).where(AgentMetadataCache.external_id == key))
+            await db.commit()
+
+
+class AgentCacheService:
+    """LRU + optional shared backend, with TTL, stale-while-revalidate and single-flight."""
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        ttl: float = 300,
+        stale_ttl: float = 3600,
+        max_size: int = 1024,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._local = MemoryBackend(max_size)
+        self._shared = backend
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._retry_at: dict[str, float] = {}  # agents whose last refresh failed
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def _lookup(self, agent_id: str) -> CacheEntry | None:
+        entry = await self._local.get(agent_id)
+        if entry is None and self._shared is not None:
+            try:
+                entry = await self._shared.get(agent_id)
+            except Exception as exc:
+                logger.warning("Agent cache backend get(%s) failed: %s", agent_id, exc)
+                entry = None
+            if entry is not None:
+                await self._local.set(agent_id, entry)
+        return entry
+
+    async def _load(self, agent_id: str, previous: CacheEntry | None) -> dict[str, Any] | None:
+        try:
+            value = await cr.fetch_agent(agent_id)  # None: 404
+        except Exception as exc:
+            # Not an answer: keep what we had, in every worker, and retry later
+            logger.warning("Agent cache refresh of %s failed: %s", agent_id, exc)
+            self.errors += 1
+            self._retry_at[agent_id] = time.time() + _RETRY_AFTER
+            return previous.value if previous is not None else None
+        self._retry_at.pop(agent_id, None)
+        entry = CacheEntry(value, time.time())
+        await self._local.set(agent_id, entry)
+        if self._shared is not None:
+            try:
+                await self._shared.set(agent_id, entry)
+            except Exception as exc:
+                logger.warning("Agent cache backend set(%s) failed: %s", agent_id, exc)
+        return value
+
+    def _fetch(self, agent_id: str, previous: CacheEntry | None = None) -> asyncio.Task:
+        """Single-flight: concurrent callers for one agent share the same task."""
+        task = self._inflight.get(agent_id)
+        if task is None:
+            task = asyncio.create_task(self._load(agent_id, previous))
+            self._inflight[agent_id] = task
+            task.add_done_callback(
+                lambda t: self._inflight.pop(agent_id, None) if self._inflight.get(agent_id) is t else None
+            )
+        return task
+
+    async def get(self, agent_id: str) -> dict[str, Any] | None:
+        """Return the CallRounded agent object, or None if it cannot be resolved."""
+        entry = await self._lookup(agent_id)
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            ttl = self.ttl if entry.value is not None else _NEGATIVE_TTL
+            if age < ttl:
+                self.hits += 1
+                return entry.value
+            if entry.value is not None and age < ttl + self.stale_ttl:
+                self.stale_hits += 1
+                if time.time() >= self._retry_at.get(agent_id, 0):
+                    self._fetch(agent_id, entry)  # revalidate in the background
+                return entry.value
+        self.misses += 1
+        return await asyncio.shield(self._fetch(agent_id))
+
+    async def invalidate(self, agent_id: str) -> None:
+        await self._local.delete(agent_id)
+        if self._shared is not None:
+            await self._shared.delete(agent_id)
+
+    def forget(self, agent_id: str | None = None) -> None:
+        """Drop this worker's entry for ``agent_id`` (every entry when None); the shared one stays."""
+        self._local.discard(agent_id)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": "postgres" if self._shared is not None else "memory",
+            "size": len(self._local),
+            "max_size": self._local.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "inflight": len(self._inflight),
+        }
+
+
+def _build() -> AgentCacheService:
+    backend = PostgresBackend() if settings.AGENT_CACHE_BACKEND == "postgres" else None
+    return AgentCacheService(
+        backend=backend,
+        ttl=settings.AGENT_CACHE_TTL_SECONDS,
+        stale_ttl=settings.AGENT_CACHE_STALE_SECONDS,
+        max_size=settings.AGENT_CACHE_MAX_SIZE,
+    )
+
+
+cache = _build()
+
+
+async def get_agent(agent_id: str | None) -> dict[str, Any] | None:
+    if not agent_id:
+        return None
+    return await cache.get(agent_id)
+
+
+async def get_agent_name(agent_id: str | None, default: str = UNKNOWN_AGENT) -> str:
+    """Agent display name, or ``default`` when it cannot be resolved."""
+    agent = await get_agent(agent_id)
+    return agent.get("name", default) if agent else default
+
+
+async def get_agent_names(agent_ids: Iterable[str | None], default: str = UNKNOWN_AGENT) -> dict[str, str]:
+    """Resolve the names of the distinct ``agent_ids`` at once.
+
+    Cache hits are answered locally; misses are fetched concurrently, at most
+    ``AGENT_CACHE_FETCH_CONCURRENCY`` upstream requests at a time.
+    """
+    distinct_ids = {a for a in agent_ids if a}
+    semaphore = asyncio.Semaphore(settings.AGENT_CACHE_FETCH_CONCURRENCY)
+
+    async def resolve(agent_id: str) -> tuple[str, str]:
+        async with semaphore:
+            return agent_id, await get_agent_name(agent_id, default)
+
+    return dict(await asyncio.gather(*(resolve(a) for a in distinct_ids)))
+
+
+async def list_agents() -> list[dict[str, Any]]:
+    """Cached equivalent of ``callrounded.list_agents`` (the configured agent)."""
+    if not settings.CALLROUNDED_AGENT_ID:
+        return []
+    agent = await get_agent(settings.CALLROUNDED_AGENT_ID)
+    return [agent] if agent else []
+
+
+async def invalidate(db: AsyncSession, tenant_id: uuid.UUID, agent_id: str) -> None:
+    """Drop a modified agent from the caches; the caller commits.
+
+    The other workers drop their local entry when the ``agent`` event is
+    delivered, on commit.
+    """
+    await cache.invalidate(agent_id)
+    await event_hub.publish(db, tenant_id, "agent", {"id": agent_id})
+
+
+def _on_event(message: dict[str, Any]) -> None:
+    kind = message.get("kind")
+    if kind == "agent":
+        cache.forget((message.get("data") or {}).get("id"))
+    elif kind == "resync" and message.get("tenant_id") is None:
+        # The hub reconnected: invalidations may have been missed
+        cache.forget()
+
+
+event_hub.add_listener(_on_event)
@@ -0,0 +1,422 @@
+"""Alert rule evaluation — turns ``AlertRule``s into ``AlertEvent``s.
+
+Every active rule owns a sliding window of per-minute call counters held in
+memory. Windows are seeded once from ``calls_cache`` (at startup, for new
+rules, or on a "resync" event: lost event stream, bulk import) and then kept
+up to date incrementally from the call events of the event hub, which every
+worker receives. A
+periodic tick only expires old minutes and compares the running totals with
+the thresholds, so its cost does not depend on the call history.
+
+Rule types and their ``conditions``:
+
+- ``missed_calls``   — ``threshold`` missed calls within ``period_minutes``
+- ``low_completion`` — completion rate below ``threshold_pct`` over
+  ``period_hours`` (24 by default), once ``min_calls`` calls were received
+- ``high_cost``      — cost of ``period_hours`` reaches ``threshold_amount``
+- ``no_activity``    — no call for ``inactive_hours``
+
+Every worker maintains the windows; the evaluation itself runs under a
+Postgres advisory lock so that a tick writes its events only once. Rules
+respect ``cooldown_minutes``; events are written in one transaction per tick,
+together with their notifications (services/notifier.py outbox).
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import async_session
+from ..models import AlertEvent, AlertRule, CallCache, CallRollup
+from . import event_hub, notifier
+from .call_store import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+_EVAL_LOCK_KEY = 0x414C5254  # "ALRT"
+
+SEVERITIES = {
+    "missed_calls": "warning",
+    "low_completion": "warning",
+    "high_cost": "critical",
+    "no_activity": "info",
+}
+
+
+def _minute(value: datetime) -> int:
+    """Minutes since the epoch."""
+    return int(value.timestamp() // 60)
+
+
+class SlidingWindow:
+    """Running totals of the calls started during the last ``span`` minutes.
+
+    Counters (per minute and in ``totals``) are ``[total, completed, missed, cost]``.
+    """
+
+    def __init__(self, span: int):
+        self.span = span
+        self._minutes: list[int] = []  # sorted keys of _buckets
+        self._buckets: dict[int, list[float]] = {}
+        self.totals = [0, 0, 0, 0.0]
+
+    def add(self, minute: int, values: list[float], now_minute: int) -> None:
+        if minute <= now_minute - self.span:
+            return  # already outside the window
+        bucket = self._buckets.get(minute)
+        if bucket is None:
+            bucket = self._buckets[minute] = [0, 0, 0, 0.0]
+            bisect.insort(self._minutes, minute)
+        for i, v in enumerate(values):
+            bucket[i] += v
+            self.totals[i] += v
+
+    def expire(self, now_minute: int) -> None:
+        cutoff = now_minute - self.span
+        while self._minutes and self._minutes[0] <= cutoff:
+            bucket = self._buckets.pop(self._minutes.pop(0))
+            for i, v in enumerate(bucket):
+                self.totals[i] -= v
+
+    def __len__(self) -> int:
+        return len(self._minutes)
+
+
+@dataclass
+class RuleState:
+    id: uuid.UUID
+    tenant_id: str
+    name: str
+    rule_type: str
+    conditions: dict[str, Any]
+    cooldown_minutes: int
+    window: SlidingWindow | None = field(default=None, repr=False)
+
+    @property
+    def span(self) -> int:
+        """Window length in minutes (0 = the rule needs no window)."""
+        c = self.conditions
+        if self.rule_type == "missed_calls":
+            minutes = int(c.get("period_minutes", 60))
+        elif self.rule_type in ("low_completion", "high_cost"):
+            minutes = int(c.get("period_hours", 24)) * 60
+        else:
+            return 0
+        return max(1, min(minutes, settings.ALERT_MAX_WINDOW_HOURS * 60))
+
+
+_rules: dict[uuid.UUID, RuleState] = {}
+_by_tenant: dict[str, list[RuleState]] = {}
+_last_call: dict[str, datetime] = {}
+_dirty: set[str] = set()  # tenants whose windows must be re-seeded
+_seeding: dict[str, list[tuple[int, list[float]]]] = {}  # call events received while a tenant is seeded
+_all_dirty = True
+_task: asyncio.Task | None = None
+_stats = {"ticks": 0, "evaluations": 0, "triggered": 0, "seeded_tenants": 0}
+
+
+# ============================================================================
+# INCREMENTAL UPDATES (event hub listener)
+# ============================================================================
+
+def on_event(message: dict[str, Any]) -> None:
+    """Apply a call change to the windows of its tenant's rules."""
+    global _all_dirty
+    kind = message.get("kind")
+    tenant_id = message.get("tenant_id")
+    if kind == "resync":
+        if tenant_id is None:
+            _all_dirty = True
+        else:
+            _dirty.add(tenant_id)
+        return
+    if kind != "call":
+        return
+    data = message.get("data") or {}
+    started = parse_timestamp(data.get("start_time"))
+    if started is None:
+        return
+    if started > _last_call.get(tenant_id, datetime.min.replace(tzinfo=timezone.utc)):
+        _last_call[tenant_id] = started
+    delta = data.get("delta") or {}
+    values = [
+        delta.get("total_calls", 0),
+        delta.get("completed_calls", 0),
+        delta.get("missed_calls", 0),
+        delta.get("total_cost", 0.0),
+    ]
+    if not any(values):
+        return
+    if tenant_id in _seeding:
+        _seeding[tenant_id].append((_minute(started), values))
+    now_minute = _minute(datetime.now(timezone.utc))
+    for rule in _by_tenant.get(tenant_id, ()):
+        if rule.window is not None:
+            rule.window.add(_minute(started), values, now_minute)
+
+
+# ============================================================================
+# RULES & SEEDING
+# ============================================================================
+
+def _load_rule(row: AlertRule) -> RuleState:
+    try:
+        conditions = json.loads(row.conditions) if row.conditions else {}
+    except ValueError:
+        conditions = {}
+    return RuleState(
+        id=row.id,
+        tenant_id=str(row.tenant_id),
+        name=row.name,
+        rule_type=row.rule_type,
+        conditions=conditions,
+        cooldown_minutes=row.cooldown_minutes,
+    )
+
+
+def _refresh_rules(rows: list[AlertRule]) -> set[str]:
+    """Replace the rule set; return the tenants of new or modified rules, to be seeded."""
+    to_seed = set()
+    rules = {}
+    for row in rows:
+        state = _load_rule(row)
+        known = _rules.get(row.id)
+        if known is not None and known.rule_type == state.rule_type and known.conditions == state.conditions:
+            state.window = known.window
+        else:
+            to_seed.add(state.tenant_id)
+        rules[row.id] = state
+    _rules.clear()
+    _rules.update(rules)
+    _by_tenant.clear()
+    for state in rules.values():
+        _by_tenant.setdefault(state.tenant_id, []).append(state)
+    return to_seed
+
+
+async def _seed(db: AsyncSession, tenant_ids: set[str], now: datetime) -> None:
+    """Rebuild the windows and last-call times of ``tenant_ids`` from the database."""
+    states = [r for t in tenant_ids for r in _by_tenant.get(t, ())]
+    if not states:
+        return
+    ids = [uuid.UUID(t) for t in tenant_ids]
+    now_minute = _minute(now)
+    # Built aside and swapped in at the end. The call events received while
+    # the query runs are buffered and replayed on the new windows: the query
+    # snapshot may predate them (an event delivered late for a call already in
+    # the snapshot is counted twice, until the next seed)
+    windows = {s.id: SlidingWindow(s.span) for s in states if s.span}
+    buffered: dict[str, list[tuple[int, list[float]]]] = {t: [] for t in tenant_ids}
+
+    longest = max((s.span for s in states), default=0)
+    if longest:
+        minute = func.date_trunc("minute", CallCache.started_at)
+        _seeding.update(buffered)
+        try:
+            result = await db.execute(
+                select(
+                    CallCache.tenant_id,
+                    minute,
+                    func.count(),
+                    func.count().filter(CallCache.status == "completed"),
+                    func.count().filter(CallCache.status == "missed"),
+                    func.coalesce(func.sum(CallCache.cost), 0.0),
+                )
+                .where(CallCache.tenant_id.in_(ids), CallCache.started_at > now - timedelta(minutes=longest))
+                .group_by(CallCache.tenant_id, minute)
+            )
+            rows = result.all()
+        finally:
+            for tenant_id in tenant_ids:
+                _seeding.pop(tenant_id, None)
+        for tenant_id, bucket, total, completed, missed, cost in rows:
+            for state in _by_tenant.get(str(tenant_id), ()):
+                if state.id in windows:
+                    windows[state.id].add(_minute(bucket), [total, completed, missed, cost], now_minute)
+        now_minute = _minute(datetime.now(timezone.utc))
+        for tenant_id, events in buffered.items():
+            for state in _by_tenant.get(tenant_id, ()):
+                if state.id in windows:
+                    for minute_key, values in events:
+                        windows[state.id].add(minute_key, values, now_minute)
+    for state in states:
+        state.window = windows.get(state.id)
+
+    result = await db.execute(
+        select(CallRollup.tenant_id, func.max(CallRollup.last_call_at))
+        .where(CallRollup.tenant_id.in_(ids), CallRollup.granularity == "day")
+        .group_by(CallRollup.tenant_id)
+    )
+    for tenant_id, last_call_at in result.all():
+        known = _last_call.get(str(tenant_id))
+        if last_call_at is not None and (known is None or last_call_at > known):
+            _last_call[str(tenant_id)] = last_call_at
+    _stats["seeded_tenants"] += len(tenant_ids)
+
+
+# ============================================================================
+# EVALUATION
+# ============================================================================
+
+def _check(state: RuleState, now: datetime) -> tuple[str, str, dict[str, Any]] | None:
+    """Return ``(title, message, context)`` when the rule fires."""
+    c = state.conditions
+    if state.rule_type == "no_activity":
+        hours = float(c.get("inactive_hours", 4))
+        last = _last_call.get(state.tenant_id)
+        if last is None or now - last < timedelta(hours=hours):
+            return None
+        return (
+            state.name,
+            f"Aucun appel depuis plus de {hours:g} h (dernier appel : {last:%d/%m %H:%M} UTC)",
+            {"last_call_at": last.isoformat(), "inactive_hours": hours},
+        )
+
+    window = state.window
+    if window is None:
+        return None
+    total, completed, missed, cost = window.totals
+    context = {"window_minutes": window.span, "total_calls": total, "completed_calls": completed,
+               "missed_calls": missed, "cost": round(cost, 2)}
+
+    if state.rule_type == "missed_calls":
+        threshold = int(c.get("threshold", 5))
+        if missed >= threshold:
+            return state.name, f"{missed} appels manqués sur les {window.span} dernières minutes (seuil : {threshold})", context
+    elif state.rule_type == "low_completion":
+        threshold = float(c.get("threshold_pct", 50.0))
+        if total >= int(c.get("min_calls", 10)) and total > 0:
+            rate = completed / total * 100
+            if rate < threshold:
+                context["completion_pct"] = round(rate, 1)
+                return state.name, f"Taux de réponse de {rate:.0f} % sur {total} appels (seuil : {threshold:g} %)", context
+    elif state.rule_type == "high_cost":
+        threshold = float(c.get("threshold_amount", 100.0))
+        if cost >= threshold:
+            return state.name, f"Coût de {cost:.2f} € sur les {window.span // 60} dernières heures (seuil : {threshold:g} €)", context
+    return None
+
+
+async def tick() -> dict[str, Any]:
+    """Refresh rules and windows, then evaluate every active rule once."""
+    global _all_dirty
+    now = datetime.now(timezone.utc)
+    _stats["ticks"] += 1
+    async with async_session() as db:
+        locked = (await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _EVAL_LOCK_KEY})).scalar()
+        rows = (await db.execute(select(AlertRule).where(AlertRule.is_active == True))).scalars().all()  # noqa: E712
+
+        to_seed = _refresh_rules(list(rows))
+        if _all_dirty:
+            to_seed = set(_by_tenant)
+            _all_dirty = False
+        to_seed |= _dirty & set(_by_tenant)
+        _dirty.clear()
+        await _seed(db, to_seed, now)
+
+        now_minute = _minute(now)
+        for state in _rules.values():
+            if state.window is not None:
+                state.window.expire(now_minute)
+
+        if not locked:
+            return {"status": "skipped", "reason": "evaluated by another worker"}
+
+        events = []
+        fired_rules = []
+        rule_updates = []
+        for row in rows:
+            state = _rules[row.id]
+            _stats["evaluations"] += 1
+            if row.last_triggered and now - row.last_triggered < timedelta(minutes=row.cooldown_minutes):
+                continue
+            fired = _check(state, now)
+            if fired is None:
+                continue
+            title, message, context = fired
+            events.append(AlertEvent(
+                id=uuid.uuid4(),
+                tenant_id=row.tenant_id,
+                rule_id=row.id,
+                severity=SEVERITIES.get(row.rule_type, "warning"),
+                title=title,
+                message=message,
+                context=json.dumps(context, default=str),
+                created_at=now,
+            ))
+            fired_rules.append(row)
+            rule_updates.append({"id": row.id, "last_triggered": now, "trigger_count": row.trigger_count + 1})
+
+        if events:
+            db.add_all(events)
+            await db.flush()
+            await db.execute(update(AlertRule), rule_updates)
+            await notifier.enqueue(db, list(zip(events, fired_rules)))
+            for event in events:
+                await event_hub.publish(db, event.tenant_id, "alert", {
+                    "id": str(event.id),
+                    "rule_id": str(event.rule_id),
+                    "severity": event.severity,
+                    "title": event.title,
+                    "message": event.message,
+                    "created_at": now.isoformat(),
+                })
+        await db.commit()  # also releases the advisory lock
+
+    _stats["triggered"] += len(events)
+    if events:
+        logger.info("Alert engine: %s alert(s) triggered", len(events))
+    return {"status": "ok", "rules": len(rows), "triggered": len(events)}
+
+
+# ============================================================================
+# LIFECYCLE
+# ============================================================================
+
+async def _run_forever() -> None:
+    interval = settings.ALERT_EVAL_INTERVAL_SECONDS
+    while True:
+        try:
+            await tick()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Alert evaluation failed")
+        await asyncio.sleep(interval)
+
+
+def start() -> None:
+    """Feed the windows from the event hub and start the periodic evaluation."""
+    global _task
+    if settings.ALERT_ENGINE_ENABLED and _task is None:
+        event_hub.add_listener(on_event)
+        _task = asyncio.create_task(_run_forever(), name="alert-engine")
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+def stats() -> dict[str, Any]:
+    return {
+        **_stats,
+        "rules": len(_rules),
+        "tenants": len(_by_tenant),
+        "window_buckets": sum(len(r.window) for r in _rules.values() if r.window is not None),
+    }
@@ -0,0 +1,90 @@
+"""Alert counters of a tenant (notification badge), from one aggregate query.
+
+Results can be cached per tenant for ``ALERT_STATS_CACHE_TTL_SECONDS``
+(0 disables the cache). Entries are dropped as soon as an alert is created
+or acknowledged: locally, and on the other workers through the event hub.
+"""
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import AlertEvent, AlertRule
+from . import event_hub
+
+SEVERITIES = ("info", "warning", "critical")
+
+_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+
+
+async def compute(db: AsyncSession, tenant_id: uuid.UUID) -> dict[str, Any]:
+    """Unacknowledged count, last-24h count per severity and active rules, in one query."""
+    since = datetime.now(timezone.utc) - timedelta(days=1)
+    recent = AlertEvent.created_at >= since
+    active_rules = (
+        select(func.count())
+        .where(AlertRule.tenant_id == tenant_id, AlertRule.is_active == True)  # noqa: E712
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            AlertEvent.severity,
+            func.count().filter(AlertEvent.acknowledged_at.is_(None)),
+            func.count().filter(recent),
+            active_rules,
+        )
+        # Each branch is served by its own index (partial unacknowledged / tenant+created_at)
+        .where(AlertEvent.tenant_id == tenant_id, AlertEvent.acknowledged_at.is_(None) | recent)
+        .group_by(AlertEvent.severity)
+    )
+    rows = result.all()
+
+    by_severity = {s: 0 for s in SEVERITIES}
+    unacknowledged = last_24h = 0
+    for severity, unack, last_day, _ in rows:
+        unacknowledged += unack
+        last_24h += last_day
+        if severity in by_severity:
+            by_severity[severity] += last_day
+    rules = rows[0][3] if rows else await db.scalar(select(active_rules))
+
+    return {
+        "unacknowledged": unacknowledged,
+        "last_24h": last_24h,
+        "by_severity": by_severity,
+        "active_rules": rules,
+    }
+
+
+async def get(db: AsyncSession, tenant_id: uuid.UUID) -> dict[str, Any]:
+    ttl = settings.ALERT_STATS_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return await compute(db, tenant_id)
+    key = str(tenant_id)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    stats = await compute(db, tenant_id)
+    _cache[key] = (time.monotonic() + ttl, stats)
+    return stats
+
+
+def invalidate(tenant_id: uuid.UUID | str | None) -> None:
+    """Forget a tenant's cached counters (``None``: every tenant)."""
+    if tenant_id is None:
+        _cache.clear()
+    else:
+        _cache.pop(str(tenant_id), None)
+
+
+def _on_event(message: dict[str, Any]) -> None:
+    if message.get("kind") in ("alert", "alert_ack", "resync"):
+        invalidate(message.get("tenant_id"))
+
+
+event_hub.add_listener(_on_event)
@@ -0,0 +1,124 @@
+"""Call detail assembly — the call, then its context fetched concurrently.
+
+``GET /api/calls/{call_id}`` needs the CallRounded call first (its agent
+decides access), then several lookups that do not depend on each other:
+the agent name, the calendar events booked during the call and the alerts
+raised right after it. :func:`gather_parts` runs those at once, each with
+its own timeout; a lookup that fails or is too slow is replaced by its
+fallback and named in ``unavailable``, so the page still shows the call.
+
+A finished call never changes, and the ingestion (sync, webhooks) already
+keeps its payload in the tenant's ``calls_cache`` row: :func:`get_call`
+serves it from there, in every worker and after a restart, without a
+CallRounded request (the agent name comes from the agent cache). A call
+missing from the table, still in progress, or completed without its
+transcript yet, is fetched upstream.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable
+
+from sqlalchemy import select
+
+from ..database import async_session
+from ..models import AlertEvent
+from . import callrounded as cr
+from . import call_store
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = frozenset(
+    {"completed", "missed", "failed", "voicemail", "transferred", "busy", "no-answer", "canceled", "ended"}
+)
+# Seconds each context lookup may take before the detail is sent without it
+TIMEOUTS = {"agent_name": 2.0, "calendar_events": 3.0, "alerts": 2.0}
+# Alerts raised this long after a call started are shown with it
+ALERT_WINDOW = timedelta(hours=1)
+_MAX_ALERTS = 5
+
+_stats = {"hits": 0, "misses": 0, "timeouts": 0, "failures": 0}
+
+
+def is_finished(call: dict[str, Any]) -> bool:
+    status = call.get("status")
+    return status in FINISHED_STATUSES and (status != "completed" or bool(call.get("transcript")))
+
+
+async def get_call(tenant_id: uuid.UUID, call_id: str) -> dict[str, Any] | None:
+    """The CallRounded call, from the tenant's ``calls_cache`` row when it is finished."""
+    async with async_session() as db:
+        stored = await call_store.get_stored_call(db, tenant_id, call_id)
+    if stored is not None and is_finished(stored):
+        _stats["hits"] += 1
+        return stored
+    _stats["misses"] += 1
+    # Upstream unavailable: the stored (unfinished) state is still better than a 404
+    return await cr.get_call(call_id) or stored
+
+
+async def related_alerts(tenant_id: uuid.UUID, started_at: datetime) -> list[dict[str, Any]]:
+    """Alerts of the tenant raised within :data:`ALERT_WINDOW` after ``started_at``."""
+    async with async_session() as db:
+        result = await db.execute(
+            select(AlertEvent.id, AlertEvent.severity, AlertEvent.title, AlertEvent.created_at, AlertEvent.acknowledged_at)
+            .where(
+                AlertEvent.tenant_id == tenant_id,
+                AlertEvent.created_at >= started_at,
+                AlertEvent.created_at < started_at + ALERT_WINDOW,
+            )
+            .order_by(AlertEvent.created_at)
+            .limit(_MAX_ALERTS)
+        )
+    return [
+        {
+            "id": str(row.id),
+            "severity": row.severity,
+            "title": row.title,
+            "created_at": row.created_at,
+            "acknowledged": row.acknowledged_at is not None,
+        }
+        for row in result.all()
+    ]
+
+
+async def gather_parts(
+    parts: dict[str, tuple[Awaitable[Any], float, Any]],
+) -> tuple[dict[str, Any], list[str]]:
+    """Await ``{name: (awaitable, timeout, fallback)}`` concurrently.
+
+    Returns every result (the fallback for a part that failed or timed out)
+    and the names of the parts that did.
+    """
+
+    async def run(name: str, awaitable: Awaitable[Any], timeout: float) -> Any:
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            _stats["timeouts"] += 1
+            logger.warning("call_details.%s timed out after %.1fs", name, timeout)
+            raise
+        except Exception as exc:
+            _stats["failures"] += 1
+            logger.warning("call_details.%s failed: %s", name, exc)
+            raise
+
+    names = list(parts)
+    outcomes = await asyncio.gather(
+        *(run(name, awaitable, timeout) for name, (awaitable, timeout, _) in parts.items()),
+        return_exceptions=True,
+    )
+    results, unavailable = {}, []
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, BaseException):  # CancelledError included
+            results[name] = parts[name][2]
+            unavailable.append(name)
+        else:
+            results[name] = outcome
+    return results, unavailable
+
+
+def stats() -> dict[str, Any]:
+    return dict(_stats)
@@ -0,0 +1,158 @@
+"""Call history export — CSV or NDJSON, streamed from the local call store.
+
+The rows are read through a server-side cursor (``AsyncSession.stream``,
+``EXPORT_BATCH_SIZE`` rows per fetch) and written out as they arrive, so
+memory stays flat whatever the number of calls, and the first bytes (the
+CSV header) leave before the query has returned anything.
+
+Only the exported columns are selected, as plain rows: no ORM objects pile
+up in the session's identity map, and the ``payload`` JSONB is only read
+when transcripts are asked for (its ``transcript`` key only).
+
+The request's session is closed once the endpoint returns, before the body
+is sent; the export opens its own, held for as long as the download lasts.
+"""
+
+import csv
+import io
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+import orjson
+from sqlalchemy import Select
+
+from ..database import async_session
+from ..models import CallCache
+from . import agent_cache, call_store
+from .principals import AgentScope
+from .transcripts import transform_transcript
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+EXPORT_BATCH_SIZE = 1000  # rows per cursor fetch
+_CHUNK_SIZE = 64 * 1024  # bytes buffered before a chunk is sent
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")  # cells Excel would evaluate
+
+COLUMNS = (
+    "id", "started_at", "ended_at", "agent_id", "agent_name", "direction", "caller_number",
+    "to_number", "status", "duration_seconds", "cost", "recording_url",
+)
+
+
+def export_query(
+    tenant_id: uuid.UUID,
+    accessible_agents: AgentScope,
+    start: datetime | None,
+    end: datetime | None,
+    call_status: str | None,
+    agent_id: str | None,
+    include_transcript: bool,
+) -> Select:
+    """Newest first, same filters and access scope as the call list."""
+    columns = [
+        CallCache.external_call_id,
+        CallCache.started_at,
+        CallCache.ended_at,
+        CallCache.agent_external_id,
+        CallCache.direction,
+        CallCache.caller_number,
+        CallCache.to_number,
+        CallCache.status,
+        CallCache.duration,
+        CallCache.cost,
+        CallCache.recording_url,
+    ]
+    if include_transcript:
+        columns += [CallCache.transcription, CallCache.payload["transcript"].label("raw_transcript")]
+    query = call_store.filtered_calls(tenant_id, accessible_agents, start, end).with_only_columns(*columns)
+    if call_status:
+        query = query.where(CallCache.status == call_status)
+    if agent_id:
+        query = query.where(CallCache.agent_external_id == agent_id)
+    return query.order_by(CallCache.started_at.desc(), CallCache.id.desc())
+
+
+def _record(row: Any, agent_name: str) -> dict[str, Any]:
+    return {
+        "id": row.external_call_id,
+        "started_at": row.started_at,
+        "ended_at": row.ended_at,
+        "agent_id": row.agent_external_id,
+        "agent_name": agent_name,
+        "direction": row.direction,
+        "caller_number": row.caller_number,
+        "to_number": row.to_number,
+        "status": row.status,
+        "duration_seconds": row.duration,
+        "cost": row.cost,
+        "recording_url": row.recording_url,
+    }
+
+
+async def _records(query: Select, include_transcript: bool, structured: bool) -> AsyncIterator[dict[str, Any]]:
+    names: dict[str | None, str] = {None: agent_cache.UNKNOWN_AGENT}
+    async with async_session() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for row in result:
+            agent = row.agent_external_id
+            if agent not in names:
+                names[agent] = await agent_cache.get_agent_name(agent)
+            record = _record(row, names[agent])
+            if include_transcript:
+                # NDJSON keeps the turns, CSV the filtered text (one cell)
+                record["transcript"] = transform_transcript(row.raw_transcript) if structured else row.transcription
+            yield record
+
+
+def _csv_value(value: Any) -> Any:
+    """A CSV cell; caller-provided text that a spreadsheet would run as a formula is quoted with ``'``."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def csv_chunks(query: Select, include_transcript: bool) -> AsyncIterator[bytes]:
+    """UTF-8 CSV with a BOM (Excel reads the accents right), header row first."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS + (("transcript",) if include_transcript else ()))
+    yield b"\xef\xbb\xbf" + out.getvalue().encode()
+    out.seek(0)
+    out.truncate()
+
+    async for record in _exported(_records(query, include_transcript, structured=False)):
+        writer.writerow([_csv_value(value) for value in record.values()])
+        if out.tell() >= _CHUNK_SIZE:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue().encode()
+
+
+async def ndjson_chunks(query: Select, include_transcript: bool) -> AsyncIterator[bytes]:
+    """One JSON object per line."""
+    buffer = bytearray()
+    async for record in _exported(_records(query, include_transcript, structured=True)):
+        buffer += orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        if len(buffer) >= _CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    yield bytes(buffer)
+
+
+async def _exported(records: AsyncIterator[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+    """Counts the exported rows; a failure midway is logged, the download ends short."""
+    count = 0
+    try:
+        async for record in records:
+            count += 1
+            yield record
+    except Exception:
+        logger.exception("calls.export failed after %d rows", count)
+        raise
+    logger.info("calls.export rows=%d", count)
@@ -0,0 +1,179 @@
+"""Single entry point for calls entering the local store.
+
+Both the periodic sync (services/call_sync.py) and the CallRounded webhook
+(routes/webhooks.py) go through :func:`ingest_calls`, which upserts
+``calls_cache`` (idempotent on ``external_call_id``), refreshes the rollup
+buckets the calls fall into and publishes the changes to live clients.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import CallCache
+from . import call_store, event_hub, rollups
+
+logger = logging.getLogger(__name__)
+
+CALL_STARTED = "call.started"
+CALL_ENDED = "call.ended"
+TRANSCRIPT_READY = "transcript.ready"
+EVENT_TYPES = (CALL_STARTED, CALL_ENDED, TRANSCRIPT_READY)
+
+# More changed calls than this in one batch (initial or full sync) send one "resync" instead
+_MAX_LIVE_EVENTS = 50
+
+# Namespace of the per-call advisory locks (the second key is the call id's hash)
+_CALL_LOCK_NAMESPACE = 0x43414C4C  # "CALL"
+
+_STATUS_COUNTERS = {"completed": "completed_calls", "missed": "missed_calls", "failed": "failed_calls"}
+
+
+async def _previous_state(
+    db: AsyncSession,
+    tenant_ids: list[uuid.UUID],
+    calls: list[dict[str, Any]],
+) -> dict[tuple[uuid.UUID, str], tuple]:
+    external_ids = [str(c["id"]) for c in calls if c.get("id")]
+    result = await db.execute(
+        select(
+            CallCache.tenant_id, CallCache.external_call_id,
+            CallCache.status, CallCache.duration, CallCache.cost,
+        ).where(CallCache.tenant_id.in_(tenant_ids), CallCache.external_call_id.in_(external_ids))
+    )
+    return {(row[0], row[1]): row[2:] for row in result.all()}
+
+
+def _positive(value: float | None) -> float:
+    return value if value and value > 0 else 0
+
+
+def _stats_delta(call: dict[str, Any], previous: tuple | None, started: datetime) -> dict[str, float]:
+    """Change of the dashboard counters caused by this version of ``call``."""
+    status, duration, cost = call.get("status") or "unknown", call.get("duration_seconds"), call.get("cost")
+    old_status, old_duration, old_cost = previous or (None, None, None)
+    delta = {
+        "total_calls": 0 if previous else 1,
+        "total_calls_today": 0 if previous or started < rollups.day_start(datetime.now(timezone.utc)) else 1,
+        "completed_calls": 0,
+        "missed_calls": 0,
+        "failed_calls": 0,
+        "duration_sum": _positive(duration) - _positive(old_duration),
+        "duration_count": int(_positive(duration) > 0) - int(_positive(old_duration) > 0),
+        "total_cost": (cost or 0) - (old_cost or 0),
+    }
+    if old_status in _STATUS_COUNTERS:
+        delta[_STATUS_COUNTERS[old_status]] -= 1
+    if status in _STATUS_COUNTERS:
+        delta[_STATUS_COUNTERS[status]] += 1
+    return delta
+
+
+def _changes(
+    tenant_ids: list[uuid.UUID],
+    calls: list[dict[str, Any]],
+    previous: dict[tuple[uuid.UUID, str], tuple],
+) -> dict[uuid.UUID, list[tuple[dict[str, Any], str | None]]]:
+    """``"call"`` event payloads (and agent) per tenant, for the calls that changed."""
+    now = datetime.now(timezone.utc)
+    changes: dict[uuid.UUID, list[tuple[dict[str, Any], str | None]]] = {t: [] for t in tenant_ids}
+    for c in calls:
+        if not c.get("id"):
+            continue
+        external_id = str(c["id"])
+        agent_id = str(c["agent_id"]) if c.get("agent_id") else None
+        started = call_store.parse_timestamp(c.get("start_time")) or call_store.parse_timestamp(c.get("end_time")) or now
+        summary = {
+            "id": external_id,
+            "agent_id": agent_id,
+            "from_number": c.get("from_number"),
+            "to_number": c.get("to_number"),
+            "status": c.get("status") or "unknown",
+            "duration_seconds": c.get("duration_seconds"),
+            "cost": c.get("cost"),
+            "start_time": started.isoformat(),
+            "end_time": c.get("end_time"),
+        }
+        for tenant_id in tenant_ids:
+            old = previous.get((tenant_id, external_id))
+            delta = _stats_delta(c, old, started)
+            if old is not None and old[0] == summary["status"] and not any(delta.values()):
+                continue  # nothing a client displays has changed
+            data = {**summary, "new": old is None, "previous_status": old[0] if old else None, "delta": delta}
+            changes[tenant_id].append((data, agent_id))
+    return changes
+
+
+async def _publish_changes(
+    db: AsyncSession,
+    tenant_ids: list[uuid.UUID],
+    calls: list[dict[str, Any]],
+    previous: dict[tuple[uuid.UUID, str], tuple],
+) -> None:
+    """Publish the calls that changed; a batch without changes publishes nothing."""
+    for tenant_id, changed in _changes(tenant_ids, calls, previous).items():
+        if len(changed) > _MAX_LIVE_EVENTS:
+            await event_hub.publish(db, tenant_id, "resync", {})
+            continue
+        for data, agent_id in changed:
+            await event_hub.publish(db, tenant_id, "call", data, agent_id)
+
+
+async def ingest_calls(
+    db: AsyncSession,
+    tenant_ids: Iterable[uuid.UUID],
+    calls: list[dict[str, Any]],
+) -> int:
+    """Store CallRounded call objects, refresh their rollups and notify live clients.
+
+    The caller commits; notifications are only delivered once it does.
+    """
+    tenant_ids = list(tenant_ids)
+    previous = await _previous_state(db, tenant_ids, calls)
+    written = await call_store.upsert_calls(db, tenant_ids, calls)
+    await rollups.refresh_for_calls(db, tenant_ids, calls)
+    await _publish_changes(db, tenant_ids, calls, previous)
+    return written
+
+
+async def _stored_payload(db: AsyncSession, tenant_ids: list[uuid.UUID], external_id: str) -> dict[str, Any]:
+    result = await db.execute(
+        select(CallCache.payload)
+        .where(CallCache.tenant_id.in_(tenant_ids), CallCache.external_call_id == external_id)
+        .limit(1)
+    )
+    return result.scalar_one_or_none() or {}
+
+
+async def ingest_event(db: AsyncSession, event_type: str, call: dict[str, Any]) -> dict[str, Any]:
+    """Apply one webhook event (possibly a partial call object) to the store.
+
+    The event is merged into the stored call. Events may arrive out of order:
+    a late ``call.started`` only fills fields that are still missing, so it
+    never turns an ended call back into an ongoing one. The caller commits.
+
+    Events of one call are merged one at a time: a transaction-level advisory
+    lock on the call id, held until the caller commits, makes a concurrent
+    event for the same call wait and then read the merged payload.
+    """
+    tenant_ids = await call_store.target_tenant_ids(db)
+    if not tenant_ids:
+        return {}
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(:namespace, hashtext(:call_id))"),
+        {"namespace": _CALL_LOCK_NAMESPACE, "call_id": str(call["id"])},
+    )
+    stored = await _stored_payload(db, tenant_ids, str(call["id"]))
+    if event_type == CALL_STARTED:
+        merged = {**call, **{k: v for k, v in stored.items() if v is not None}}
+    else:
+        merged = {**stored, **{k: v for k, v in call.items() if v is not None}}
+    await ingest_calls(db, tenant_ids, [merged])
+    if stored and stored.get("start_time") != merged.get("start_time"):
+        # The call moved to another bucket: refresh the one it left too
+        await rollups.refresh_for_calls(db, tenant_ids, [stored])
+    return merged
@@ -0,0 +1,257 @@
+"""Local call store — maps CallRounded call objects onto ``calls_cache`` rows.
+
+Read routes query this table instead of downloading calls from the upstream
+API on every page view. Rows are written by services/call_sync.py.
+"""
+
+import base64
+import html
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import CallCache, Tenant
+from .principals import AgentScope
+from .transcripts import searchable_text
+
+logger = logging.getLogger(__name__)
+
+# Keeps a multi-row INSERT well below the 32767 bind parameters limit of Postgres
+_UPSERT_CHUNK = 500
+
+_UPDATABLE_COLUMNS = (
+    "agent_external_id",
+    "caller_number",
+    "to_number",
+    "direction",
+    "duration",
+    "cost",
+    "status",
+    "transcription",
+    "recording_url",
+    "started_at",
+    "ended_at",
+    "payload",
+    "synced_at",
+)
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    """Parse a CallRounded ISO timestamp (``Z`` suffix allowed) into an aware datetime."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def to_row(tenant_id: uuid.UUID, call: dict[str, Any], now: datetime) -> dict[str, Any] | None:
+    """Build a ``calls_cache`` row from a CallRounded call object."""
+    external_id = call.get("id")
+    if not external_id:
+        return None
+    agent_id = call.get("agent_id")
+    # started_at is the keyset/ordering column: fall back so it is never NULL
+    started_at = parse_timestamp(call.get("start_time")) or parse_timestamp(call.get("end_time")) or now
+    return {
+        "id": uuid.uuid4(),
+        "tenant_id": tenant_id,
+        "external_call_id": str(external_id),
+        "agent_external_id": str(agent_id) if agent_id else None,
+        "caller_number": call.get("from_number"),
+        "to_number": call.get("to_number"),
+        "direction": call.get("direction"),
+        "duration": call.get("duration_seconds"),
+        "cost": call.get("cost"),
+        "status": call.get("status") or "unknown",
+        "transcription": searchable_text(call),
+        "recording_url": call.get("recording_url"),
+        "started_at": started_at,
+        "ended_at": parse_timestamp(call.get("end_time")),
+        "payload": call,
+        "synced_at": now,
+    }
+
+
+async def target_tenant_ids(db: AsyncSession) -> list[uuid.UUID]:
+    """Tenants that receive calls fetched with the configured API key.
+
+    ``CALLROUNDED_TENANT_ID`` pins the key to one tenant; when empty every
+    tenant sees the upstream calls, as the proxy routes always did.
+    """
+    if settings.CALLROUNDED_TENANT_ID:
+        return [uuid.UUID(settings.CALLROUNDED_TENANT_ID)]
+    result = await db.execute(select(Tenant.id))
+    return list(result.scalars().all())
+
+
+async def upsert_calls(
+    db: AsyncSession,
+    tenant_ids: Iterable[uuid.UUID],
+    calls: list[dict[str, Any]],
+) -> int:
+    """Insert or refresh calls in bulk (idempotent on ``external_call_id``).
+
+    The caller is responsible for committing.
+    """
+    now = datetime.now(timezone.utc)
+    # Deduplicate: ON CONFLICT cannot touch the same row twice in one statement
+    by_id = {str(c["id"]): c for c in calls if c.get("id")}
+    written = 0
+    for tenant_id in tenant_ids:
+        rows = [r for r in (to_row(tenant_id, c, now) for c in by_id.values()) if r]
+        for start in range(0, len(rows), _UPSERT_CHUNK):
+            chunk = rows[start:start + _UPSERT_CHUNK]
+            stmt = pg_insert(CallCache).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_call_external_id_per_tenant",
+                set_={col: stmt.excluded[col] for col in _UPDATABLE_COLUMNS},
+            )
+            await db.execute(stmt)
+            written += len(chunk)
+    return written
+
+
+def filtered_calls(
+    tenant_id: uuid.UUID,
+    accessible_agents: AgentScope,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> Select:
+    """Base ``SELECT`` of a tenant's calls, restricted to accessible agents and ``[start, end)``."""
+    query = select(CallCache).where(CallCache.tenant_id == tenant_id)
+    if not accessible_agents.unrestricted:
+        query = query.where(accessible_agents.clause(CallCache.agent_external_id))
+    if start is not None:
+        query = query.where(CallCache.started_at >= start)
+    if end is not None:
+        query = query.where(CallCache.started_at < end)
+    return query
+
+
+def encode_cursor(call: CallCache) -> str:
+    """Opaque cursor pointing just after ``call`` in the newest-first order."""
+    raw = f"{call.started_at.isoformat()}|{call.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        started_at, call_id = raw.split("|", 1)
+        return datetime.fromisoformat(started_at), uuid.UUID(call_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    limit: int,
+    cursor: str | None = None,
+    offset: int = 0,
+) -> tuple[list[CallCache], str | None]:
+    """Run ``query`` newest first and return one page plus the cursor of the next one.
+
+    With a cursor the page is read by keyset (``(started_at, id) < cursor``), so
+    its cost does not depend on how deep it is. ``offset`` is only used without
+    a cursor, for clients still paging by number.
+    """
+    if cursor:
+        started_at, call_id = decode_cursor(cursor)
+        query = query.where(tuple_(CallCache.started_at, CallCache.id) < tuple_(started_at, call_id))
+    elif offset:
+        query = query.offset(offset)
+    query = query.order_by(CallCache.started_at.desc(), CallCache.id.desc()).limit(limit + 1)
+    rows = list((await db.execute(query)).scalars().all())
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+# ts_headline markers; swapped for <mark> once the snippet has been HTML-escaped
+_HL_START, _HL_STOP = "\u27e6", "\u27e7"
+_HEADLINE_OPTIONS = f"StartSel={_HL_START}, StopSel={_HL_STOP}, MaxFragments=2, MaxWords=18, MinWords=6, FragmentDelimiter=\" … \""
+
+
+def _snippet(headline: str | None) -> str:
+    escaped = html.escape(headline or "")
+    return escaped.replace(_HL_START, "<mark>").replace(_HL_STOP, "</mark>")
+
+
+async def search_transcripts(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    accessible_agents: AgentScope,
+    text: str,
+    limit: int,
+    offset: int = 0,
+) -> tuple[list[tuple[CallCache, float, str]], int]:
+    """Full-text search over transcripts (French configuration), best matches first.
+
+    ``text`` uses the web search syntax (``"phrase exacte"``, ``-exclu``, ``or``).
+    Returns ``(call, rank, snippet)`` for one page plus the total number of
+    matches; snippets are HTML-escaped with matched words in ``<mark>``.
+    """
+    query = func.websearch_to_tsquery("french", text)
+    matches = filtered_calls(tenant_id, accessible_agents).where(CallCache.transcription_tsv.bool_op("@@")(query))
+
+    total = await db.scalar(select(func.count()).select_from(matches.subquery()))
+    if not total:
+        return [], 0
+
+    rank = func.ts_rank_cd(CallCache.transcription_tsv, query).label("rank")
+    page = (
+        matches.with_only_columns(CallCache.id, rank)
+        .order_by(rank.desc(), CallCache.started_at.desc(), CallCache.id.desc())
+        .limit(limit)
+        .offset(offset)
+        .subquery()
+    )
+    # Headlines are expensive: only compute them for the rows of the page
+    headline = func.ts_headline("french", CallCache.transcription, query, _HEADLINE_OPTIONS)
+    result = await db.execute(
+        select(CallCache, page.c.rank, headline)
+        .join(page, page.c.id == CallCache.id)
+        .order_by(page.c.rank.desc(), CallCache.started_at.desc(), CallCache.id.desc())
+    )
+    return [(call, rank_, _snippet(hl)) for call, rank_, hl in result.all()], total
+
+
+async def get_stored_call(db: AsyncSession, tenant_id: uuid.UUID, external_id: str) -> dict[str, Any] | None:
+    """The CallRounded-shaped dict of a tenant's stored call, or None if it is not stored."""
+    result = await db.execute(
+        select(CallCache).where(CallCache.tenant_id == tenant_id, CallCache.external_call_id == external_id)
+    )
+    call = result.scalar_one_or_none()
+    return to_api_dict(call) if call is not None else None
+
+
+def to_api_dict(call: CallCache) -> dict[str, Any]:
+    """Return the CallRounded-shaped dict of a stored call."""
+    if call.payload:
+        return call.payload
+    return {
+        "id": call.external_call_id,
+        "agent_id": call.agent_external_id,
+        "from_number": call.caller_number,
+        "to_number": call.to_number,
+        "direction": call.direction,
+        "duration_seconds": call.duration,
+        "cost": call.cost,
+        "status": call.status,
+        "transcript_string": call.transcription,
+        "recording_url": call.recording_url,
+        "start_time": call.started_at.isoformat() if call.started_at else None,
+        "end_time": call.ended_at.isoformat() if call.ended_at else None,
+    }
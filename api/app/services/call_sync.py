@@ -0,0 +1,165 @@
+"""Background ingestion of CallRounded calls into the local call store.
+
+The worker pages through ``GET /calls`` (newest first) and stops once it
+reaches calls older than its checkpoint — the start of the last completed
+run (``sync_checkpoints``), minus an overlap window so that in-progress calls
+get their final status. The checkpoint does not depend on the stored calls:
+a call ingested by the webhook never moves it past one the webhook missed.
+The first run, or ``full=True``, walks every page. A page CallRounded fails
+to return ends the run without moving the checkpoint: the next run resumes
+from the same point.
+
+Each page refreshes the call rollups of the hours it touched. When the
+CallRounded webhook is configured, calls arrive as they happen and this sync
+only reconciles whatever the webhook missed.
+
+Only one gunicorn worker syncs at a time: the run is guarded by a Postgres
+advisory lock held on a dedicated connection.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ..config import settings
+from ..database import async_session, engine
+from ..models import SyncCheckpoint
+from . import call_ingest, call_store
+from . import callrounded as cr
+
+logger = logging.getLogger(__name__)
+
+_SYNC_LOCK_KEY = 0x43524353  # "CRCS"
+_MAX_PAGES = 10_000
+_CHECKPOINT = "calls"
+
+_task: asyncio.Task | None = None
+
+
+async def _checkpoint(db) -> datetime | None:
+    result = await db.execute(select(SyncCheckpoint.synced_at).where(SyncCheckpoint.name == _CHECKPOINT))
+    return result.scalar_one_or_none()
+
+
+async def _save_checkpoint(db, synced_at: datetime) -> None:
+    stmt = pg_insert(SyncCheckpoint).values(name=_CHECKPOINT, synced_at=synced_at)
+    await db.execute(stmt.on_conflict_do_update(index_elements=["name"], set_={"synced_at": stmt.excluded.synced_at}))
+
+
+async def sync_calls(full: bool = False) -> dict[str, Any]:
+    """Fetch new/updated calls from CallRounded and upsert them into ``calls_cache``."""
+    async with engine.connect() as lock_conn:
+        locked = (await lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": _SYNC_LOCK_KEY}
+        )).scalar()
+        if not locked:
+            return {"status": "skipped", "reason": "sync already running"}
+        try:
+            return await _sync_pages(full)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _SYNC_LOCK_KEY})
+            await lock_conn.commit()
+
+
+async def _sync_pages(full: bool) -> dict[str, Any]:
+    started = datetime.now(timezone.utc)
+    async with async_session() as db:
+        tenant_ids = await call_store.target_tenant_ids(db)
+        if not tenant_ids:
+            return {"status": "skipped", "reason": "no tenant"}
+        checkpoint = None if full else await _checkpoint(db)
+
+    cutoff = None
+    if checkpoint is not None:
+        cutoff = checkpoint - timedelta(minutes=settings.CALL_SYNC_OVERLAP_MINUTES)
+
+    page_size = settings.CALL_SYNC_PAGE_SIZE
+    pages = fetched = written = 0
+    complete = False  # every page down to the cutoff (or the last one) was read
+    error = None
+    page = 1
+    while page <= _MAX_PAGES:
+        try:
+            raw = await cr.fetch_calls(limit=page_size, page=page)
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+            logger.warning("Call sync stopped at page %s: %s", page, error)
+            break
+        calls = raw.get("data", []) if isinstance(raw, dict) else raw
+        if not calls:
+            complete = True
+            break
+        pages += 1
+        fetched += len(calls)
+
+        async with async_session() as db:
+            written += await call_ingest.ingest_calls(db, tenant_ids, calls)
+            await db.commit()
+
+        if cutoff is not None:
+            starts = [call_store.parse_timestamp(c.get("start_time")) for c in calls]
+            oldest = min((s for s in starts if s), default=None)
+            if oldest is not None and oldest < cutoff:
+                complete = True
+                break
+        total_pages = raw.get("total_pages") if isinstance(raw, dict) else None
+        if len(calls) < page_size or (total_pages and page >= total_pages):
+            complete = True
+            break
+        page += 1
+
+    # Only a run that went through: a failed or truncated one is resumed from the same point
+    if complete:
+        async with async_session() as db:
+            await _save_checkpoint(db, started)
+            await db.commit()
+
+    logger.info(
+        "Call sync %s: %s pages, %s calls fetched, %s rows written",
+        "done" if complete else "incomplete", pages, fetched, written,
+    )
+    result = {
+        "status": "ok" if complete else "error",
+        "full": full or checkpoint is None,
+        "pages": pages,
+        "fetched": fetched,
+        "written": written,
+        "checkpoint": checkpoint.isoformat() if checkpoint else None,
+    }
+    if not complete:
+        result["reason"] = error or f"stopped after {_MAX_PAGES} pages"
+    return result
+
+
+async def _run_forever() -> None:
+    interval = settings.CALL_SYNC_INTERVAL_SECONDS
+    while True:
+        try:
+            await sync_calls()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Call sync failed")
+        await asyncio.sleep(interval)
+
+
+def start() -> None:
+    """Start the periodic sync task (called from the app lifespan)."""
+    global _task
+    if settings.CALL_SYNC_ENABLED and _task is None:
+        _task = asyncio.create_task(_run_forever(), name="call-sync")
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -1,29 +1,159 @@
-"""CallRounded (Rounded) API client — proxies all external calls through the backend."""
+"""CallRounded (Rounded) API client — proxies all external calls through the backend.
 
+A single ``httpx.AsyncClient`` is shared by every request of a worker so that
+TCP/TLS connections are reused through a keep-alive pool. It is opened by the
+FastAPI lifespan hook (:func:`startup`) and closed on shutdown (:func:`shutdown`).
+"""
+
+import asyncio
+import importlib.util
 import logging
+import time
 from typing import Any
 
 import httpx
 
 from ..config import settings
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
 _TIMEOUT = 15.0
 
+_http: httpx.AsyncClient | None = None
+_http_loop: asyncio.AbstractEventLoop | None = None
+
+# Pool usage counters (per worker), exposed through pool_stats()
+_in_flight = 0
+_peak_in_flight = 0
+_requests_total = 0
+_errors_total = 0
+_saturated_total = 0
+_opened_at: float | None = None
+
 
 def _headers() -> dict[str, str]:
     return {"X-Api-Key": settings.CALLROUNDED_API_KEY, "Accept": "application/json"}
 
 
-def _client() -> httpx.AsyncClient:
+def _http2_available() -> bool:
+    return settings.CALLROUNDED_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.CALLROUNDED_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.CALLROUNDED_MAX_KEEPALIVE,
+        keepalive_expiry=settings.CALLROUNDED_KEEPALIVE_EXPIRY,
+    )
     return httpx.AsyncClient(
         base_url=settings.CALLROUNDED_API_URL,
         headers=_headers(),
-        timeout=_TIMEOUT,
+        timeout=httpx.Timeout(_TIMEOUT, pool=settings.CALLROUNDED_POOL_TIMEOUT),
+        transport=metrics.transport("callrounded", limits=limits, http2=_http2_available()),
     )
 
 
+def _discard(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Release a client opened under another event loop.
+
+    Its connections can only be closed by that loop: the close is scheduled
+    there while it still runs. Once it has stopped (a previous test), nothing
+    can await the close any more; the client is dropped and its sockets are
+    closed when the transports are collected.
+    """
+    if loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    else:
+        logger.debug("Dropping a CallRounded client whose event loop has stopped")
+
+
+def _open() -> httpx.AsyncClient:
+    global _http, _http_loop, _opened_at
+    if _http is not None and not _http.is_closed:
+        _discard(_http, _http_loop)
+    _http = _build_client()
+    _http_loop = asyncio.get_running_loop()
+    _opened_at = time.time()
+    return _http
+
+
+async def startup() -> None:
+    """Open the shared client (called from the app lifespan)."""
+    if _http is None or _http.is_closed:
+        _open()
+        logger.info(
+            "CallRounded client opened (max_connections=%s, keepalive=%s, http2=%s)",
+            settings.CALLROUNDED_MAX_CONNECTIONS,
+            settings.CALLROUNDED_MAX_KEEPALIVE,
+            _http2_available(),
+        )
+
+
+async def shutdown() -> None:
+    """Close the shared client and release pooled connections."""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+        logger.info("CallRounded client closed")
+
+
+def _client() -> httpx.AsyncClient:
+    """Return the shared client, opening it lazily (tests, scripts) if needed.
+
+    Pooled connections are bound to the event loop that opened them, so a
+    client created under another loop (e.g. a previous test) is replaced.
+    """
+    if _http is None or _http.is_closed or _http_loop is not asyncio.get_running_loop():
+        return _open()
+    return _http
+
+
+async def _request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Send a request through the shared pool, keeping usage counters up to date."""
+    global _in_flight, _peak_in_flight, _requests_total, _errors_total, _saturated_total
+    _requests_total += 1
+    _in_flight += 1
+    _peak_in_flight = max(_peak_in_flight, _in_flight)
+    if _in_flight > settings.CALLROUNDED_MAX_CONNECTIONS:
+        _saturated_total += 1
+    try:
+        return await _client().request(method, url, **kwargs)
+    except Exception:
+        _errors_total += 1
+        raise
+    finally:
+        _in_flight -= 1
+
+
+def pool_stats() -> dict[str, Any]:
+    """Snapshot of the connection pool usage for this worker."""
+    connections = []
+    if _http is not None and not _http.is_closed:
+        transport = getattr(_http, "_transport", None)
+        pool = getattr(getattr(transport, "transport", transport), "_pool", None)  # under the metrics wrapper
+        connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if c.is_idle())
+    max_connections = settings.CALLROUNDED_MAX_CONNECTIONS
+    return {
+        "open": _http is not None and not _http.is_closed,
+        "http2": _http2_available(),
+        "max_connections": max_connections,
+        "max_keepalive_connections": settings.CALLROUNDED_MAX_KEEPALIVE,
+        "connections": len(connections),
+        "idle_connections": idle,
+        "active_connections": len(connections) - idle,
+        "in_flight": _in_flight,
+        "peak_in_flight": _peak_in_flight,
+        "saturation": round(_in_flight / max_connections, 3) if max_connections else 0.0,
+        "saturated_requests_total": _saturated_total,
+        "requests_total": _requests_total,
+        "errors_total": _errors_total,
+        "uptime_seconds": round(time.time() - _opened_at, 1) if _opened_at else 0.0,
+    }
+
+
 # ── Agents ────────────────────────────────────────────────────────────
 # NOTE: Rounded API has NO list agents endpoint (GET /agents → 405)
 # We use the configured agent ID to fetch the single agent
@@ -36,13 +166,19 @@ async def list_agents() -> list[dict[str, Any]]:
     return [agent] if agent else []
 
 
+async def fetch_agent(agent_id: str) -> dict[str, Any] | None:
+    """The agent, or None when CallRounded answers 404; raises on any other error (unlike :func:`get_agent`)."""
+    resp = await _request("GET", f"/agents/{agent_id}")
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    data = resp.json()
+    return data.get("data", data)
+
+
 async def get_agent(agent_id: str) -> dict[str, Any] | None:
     try:
-        async with _client() as client:
-            resp = await client.get(f"/agents/{agent_id}")
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", data)
+        return await fetch_agent(agent_id)
     except Exception as exc:
         logger.warning("CallRounded get_agent(%s) failed: %s", agent_id, exc)
         return None
@@ -50,11 +186,10 @@ async def get_agent(agent_id: str) -> dict[str, Any] | None:
 
 async def update_agent(agent_id: str, payload: dict[str, Any]) -> dict[str, Any] | None:
     try:
-        async with _client() as client:
-            resp = await client.patch(f"/agents/{agent_id}", json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", data)
+        resp = await _request("PATCH", f"/agents/{agent_id}", json=payload)
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("data", data)
     except Exception as exc:
         logger.warning("CallRounded update_agent(%s) failed: %s", agent_id, exc)
         return None
@@ -62,11 +197,10 @@ async def update_agent(agent_id: str, payload: dict[str, Any]) -> dict[str, Any]
 
 async def deploy_agent(agent_id: str) -> dict[str, Any] | None:
     try:
-        async with _client() as client:
-            resp = await client.post(f"/agents/{agent_id}/deploy")
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", data)
+        resp = await _request("POST", f"/agents/{agent_id}/deploy")
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("data", data)
     except Exception as exc:
         logger.warning("CallRounded deploy_agent(%s) failed: %s", agent_id, exc)
         return None
@@ -74,12 +208,16 @@ async def deploy_agent(agent_id: str) -> dict[str, Any] | None:
 
 # ── Calls ─────────────────────────────────────────────────────────────
 
+async def fetch_calls(limit: int = 50, page: int = 1) -> dict[str, Any]:
+    """One page of ``GET /calls``; raises on a transport or HTTP error (unlike :func:`list_calls`)."""
+    resp = await _request("GET", "/calls", params={"limit": limit, "page": page, "use_cursor": False})
+    resp.raise_for_status()
+    return resp.json()
+
+
 async def list_calls(limit: int = 50, page: int = 1) -> dict[str, Any]:
     try:
-        async with _client() as client:
-            resp = await client.get("/calls", params={"limit": limit, "page": page, "use_cursor": False})
-            resp.raise_for_status()
-            return resp.json()
+        return await fetch_calls(limit=limit, page=page)
     except Exception as exc:
         logger.warning("CallRounded list_calls failed: %s", exc)
         return {"data": [], "total_items": 0}
@@ -87,11 +225,10 @@ async def list_calls(limit: int = 50, page: int = 1) -> dict[str, Any]:
 
 async def get_call(call_id: str) -> dict[str, Any] | None:
     try:
-        async with _client() as client:
-            resp = await client.get(f"/calls/{call_id}")
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", data)
+        resp = await _request("GET", f"/calls/{call_id}")
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("data", data)
     except Exception as exc:
         logger.warning("CallRounded get_call(%s) failed: %s", call_id, exc)
         return None
@@ -99,10 +236,9 @@ async def get_call(call_id: str) -> dict[str, Any] | None:
 
 async def terminate_call(call_id: str) -> bool:
     try:
-        async with _client() as client:
-            resp = await client.post(f"/calls/{call_id}/terminate")
-            resp.raise_for_status()
-            return True
+        resp = await _request("POST", f"/calls/{call_id}/terminate")
+        resp.raise_for_status()
+        return True
     except Exception as exc:
         logger.warning("CallRounded terminate_call(%s) failed: %s", call_id, exc)
         return False
@@ -112,11 +248,10 @@ async def terminate_call(call_id: str) -> bool:
 
 async def list_phone_numbers(limit: int = 50) -> list[dict[str, Any]]:
     try:
-        async with _client() as client:
-            resp = await client.get("/phone-numbers", params={"limit": limit})
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", [])
+        resp = await _request("GET", "/phone-numbers", params={"limit": limit})
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("data", [])
     except Exception as exc:
         logger.warning("CallRounded list_phone_numbers failed: %s", exc)
         return []
@@ -124,11 +259,10 @@ async def list_phone_numbers(limit: int = 50) -> list[dict[str, Any]]:
 
 async def update_phone_number(phone_id: str, payload: dict[str, Any]) -> dict[str, Any] | None:
     try:
-        async with _client() as client:
-            resp = await client.patch(f"/phone-numbers/{phone_id}", json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", data)
+        resp = await _request("PATCH", f"/phone-numbers/{phone_id}", json=payload)
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("data", data)
     except Exception as exc:
         logger.warning("CallRounded update_phone_number(%s) failed: %s", phone_id, exc)
         return None
@@ -138,11 +272,10 @@ async def update_phone_number(phone_id: str, payload: dict[str, Any]) -> dict[st
 
 async def get_knowledge_base(kb_id: str) -> dict[str, Any] | None:
     try:
-        async with _client() as client:
-            resp = await client.get(f"/knowledge-bases/{kb_id}")
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", data)
+        resp = await _request("GET", f"/knowledge-bases/{kb_id}")
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("data", data)
     except Exception as exc:
         logger.warning("CallRounded get_knowledge_base(%s) failed: %s", kb_id, exc)
         return None
@@ -160,12 +293,11 @@ async def create_agent(payload: dict[str, Any]) -> dict[str, Any] | None:
     """
     try:
         logger.info("CallRounded create_agent: %s", payload.get("name"))
-        async with _client() as client:
-            resp = await client.post("/agents", json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            logger.info("CallRounded agent created: %s", data.get("data", {}).get("id"))
-            return data.get("data", data)
+        resp = await _request("POST", "/agents", json=payload)
+        resp.raise_for_status()
+        data = resp.json()
+        logger.info("CallRounded agent created: %s", data.get("data", {}).get("id"))
+        return data.get("data", data)
     except Exception as exc:
         logger.error("CallRounded create_agent failed: %s", exc)
         return None
@@ -176,11 +308,10 @@ async def create_agent(payload: dict[str, Any]) -> dict[str, Any] | None:
 async def list_phone_numbers() -> list[dict[str, Any]]:
     """List all phone numbers."""
     try:
-        async with _client() as client:
-            resp = await client.get("/phone-numbers")
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", [])
+        resp = await _request("GET", "/phone-numbers")
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("data", [])
     except Exception as exc:
         logger.warning("CallRounded list_phone_numbers failed: %s", exc)
         return []
@@ -191,11 +322,10 @@ async def set_phone_redirect(phone_id: str, redirect: bool, redirect_number: str
     Uses PUT with full payload and is_redirect_enabled field (matches CallRounded dashboard behavior)."""
     try:
         # First GET the current phone number config
-        async with _client() as client:
-            get_resp = await client.get(f"/phone-numbers/{phone_id}")
-            get_resp.raise_for_status()
-            current = get_resp.json().get("data", {})
-        
+        get_resp = await _request("GET", f"/phone-numbers/{phone_id}")
+        get_resp.raise_for_status()
+        current = get_resp.json().get("data", {})
+
         # Build full PUT payload matching CallRounded dashboard format
         payload = {
             "name": current.get("name", ""),
@@ -209,11 +339,10 @@ async def set_phone_redirect(phone_id: str, redirect: bool, redirect_number: str
         }
         logger.info("set_phone_redirect PUT payload: is_redirect_enabled=%s for phone %s", redirect, phone_id)
         
-        async with _client() as client:
-            resp = await client.put(f"/phone-numbers/{phone_id}", json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("data", data)
+        resp = await _request("PUT", f"/phone-numbers/{phone_id}", json=payload)
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("data", data)
     except Exception as exc:
         logger.warning("CallRounded set_phone_redirect(%s, %s) failed: %s", phone_id, redirect, exc)
         return None
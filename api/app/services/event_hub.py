@@ -0,0 +1,187 @@
+"""Live event fan-out — Postgres LISTEN/NOTIFY to every connected client of a tenant.
+
+Writers call :func:`publish` inside their transaction; Postgres delivers the
+notification on commit, to every gunicorn worker. Each worker holds a single
+listening connection and dispatches the message to its local subscribers of
+that tenant (one per open SSE stream), so one change serves all clients
+however many are connected.
+
+Messages are small dicts::
+
+    {"tenant_id": "...", "kind": "call" | "stats" | "alert" | "resync",
+     "agent_id": "..." | None, "data": {...}}
+
+A subscriber only receives messages whose ``agent_id`` is one of its
+accessible agents (tenant-wide messages have ``agent_id = None``). Services
+that need every message of every tenant (the alert engine) register with
+:func:`add_listener`.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from .principals import AgentScope
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "callrounded_events"
+
+_QUEUE_SIZE = 256
+_MAX_PAYLOAD = 7900  # NOTIFY payloads are limited to 8000 bytes
+_RECONNECT_DELAY = 5
+
+RESYNC = {"kind": "resync", "agent_id": None, "data": {}}
+
+
+class Subscription:
+    """One connected client: a bounded queue plus its agent scope."""
+
+    def __init__(self, tenant_id: str, accessible_agents: "AgentScope"):
+        self.tenant_id = tenant_id
+        self.agents = accessible_agents
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=_QUEUE_SIZE)
+
+    def wants(self, message: dict[str, Any]) -> bool:
+        agent_id = message.get("agent_id")
+        return agent_id is None or agent_id in self.agents
+
+    def push(self, message: dict[str, Any]) -> None:
+        """Queue a message; a client too slow to keep up is told to reload instead."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+_subscribers: dict[str, set[Subscription]] = {}
+_listeners: list[Callable[[dict[str, Any]], None]] = []
+_task: asyncio.Task | None = None
+_delivered = 0
+
+
+def _dsn() -> str:
+    return settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def add_listener(callback: Callable[[dict[str, Any]], None]) -> None:
+    """Call ``callback(message)`` for every message received by this worker."""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def _dispatch(message: dict[str, Any]) -> None:
+    global _delivered
+    for callback in _listeners:
+        try:
+            callback(message)
+        except Exception:
+            logger.exception("Event listener %r failed", callback)
+    for sub in _subscribers.get(message.get("tenant_id"), ()):
+        if sub.wants(message):
+            sub.push(message)
+            _delivered += 1
+
+
+def _on_notify(connection, pid, channel, payload: str) -> None:
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        logger.warning("Ignoring malformed event payload on %s", channel)
+        return
+    _dispatch(message)
+
+
+async def _listen_forever() -> None:
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(_dsn())
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: closed.set())
+            await conn.add_listener(CHANNEL, _on_notify)
+            logger.info("Event hub listening on %s", CHANNEL)
+            # Messages sent while we were away are lost: ask clients to reload
+            # (tenant_id None tells listeners that every tenant is affected)
+            _dispatch({**RESYNC, "tenant_id": None})
+            for tenant_id in list(_subscribers):
+                _dispatch({**RESYNC, "tenant_id": tenant_id})
+            await closed.wait()
+            logger.warning("Event hub connection lost")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Event hub cannot listen: %s", exc)
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(_RECONNECT_DELAY)
+
+
+def start() -> None:
+    """Start this worker's listener (called from the app lifespan)."""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_listen_forever(), name="event-hub")
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+async def publish(
+    db: AsyncSession,
+    tenant_id: uuid.UUID | str,
+    kind: str,
+    data: dict[str, Any],
+    agent_id: str | None = None,
+) -> None:
+    """Queue a message for the tenant's clients; it is delivered when ``db`` commits."""
+    message = {"tenant_id": str(tenant_id), "kind": kind, "agent_id": agent_id, "data": data}
+    payload = json.dumps(message, default=str)
+    if len(payload.encode()) > _MAX_PAYLOAD:
+        payload = json.dumps({**RESYNC, "tenant_id": str(tenant_id)})
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+@asynccontextmanager
+async def subscribe(tenant_id: uuid.UUID | str, accessible_agents: "AgentScope") -> AsyncIterator[Subscription]:
+    """Register a client for the duration of the ``async with`` block."""
+    sub = Subscription(str(tenant_id), accessible_agents)
+    _subscribers.setdefault(sub.tenant_id, set()).add(sub)
+    try:
+        yield sub
+    finally:
+        subs = _subscribers.get(sub.tenant_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del _subscribers[sub.tenant_id]
+
+
+def stats() -> dict[str, Any]:
+    return {
+        "listening": _task is not None and not _task.done(),
+        "tenants": len(_subscribers),
+        "subscribers": sum(len(s) for s in _subscribers.values()),
+        "delivered": _delivered,
+    }
@@ -14,6 +14,7 @@ from pydantic import BaseModel
 
 from ..config import settings
 from ..services import callrounded as cr
+from ..services import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -132,7 +133,7 @@ async def chat(request: ChatRequest) -> ChatResponse:
     ]
     
     try:
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=metrics.transport("anthropic")) as client:
             response = await client.post(
                 "https://api.anthropic.com/v1/messages",
                 headers={
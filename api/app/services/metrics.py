@@ -0,0 +1,224 @@
+"""Request, SQL and upstream metrics, in Prometheus text format (``GET /metrics``).
+
+Three sources feed per-worker histograms:
+
+- :class:`~app.middleware.metrics.MetricsMiddleware` times every request,
+  labelled by route template (``/api/calls/{call_id}``, not the raw path);
+- SQLAlchemy engine events (:func:`instrument_engine`) time every query;
+- :func:`transport` wraps the httpx transport of the CallRounded, Anthropic
+  and Google clients and times every upstream call.
+
+While a request runs, its queries and upstream calls are also added up in a
+:class:`RequestStats` held in a context variable; the middleware sends them
+back in a ``Server-Timing`` header and records queries per request.
+
+Each gunicorn worker keeps its own figures and every series carries a
+``worker`` label (the pid): a scrape sees the worker that served it.
+"""
+
+import os
+import re
+import time
+from bisect import bisect_left
+from contextvars import ContextVar, Token
+from typing import Any, Iterable
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[\w.:=-]{12,}$|@")  # uuids, long opaque ids, calendar e-mails
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one: above the largest bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Family:
+    """Histograms of one metric, one per label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series: dict[tuple[str, ...], Histogram] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        histogram = self.series.get(labels)
+        if histogram is None:
+            histogram = self.series[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for values, histogram in sorted(self.series.items()):
+            labels = f'worker="{os.getpid()}",' + "".join(
+                f'{name}="{_escape(value)}",' for name, value in zip(self.labels, values)
+            )
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels}le="{bound:g}"}} {cumulative}'
+            yield f'{self.name}_bucket{{{labels}le="+Inf"}} {histogram.count}'
+            yield f"{self.name}_sum{{{labels[:-1]}}} {histogram.sum:.6f}"
+            yield f"{self.name}_count{{{labels[:-1]}}} {histogram.count}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUESTS = _Family(
+    "http_request_duration_seconds", "Time to serve an API request.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = _Family(
+    "http_request_db_queries", "SQL queries run by one API request.",
+    ("method", "route"), COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = _Family(
+    "http_request_db_duration_seconds", "SQL time of one API request.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+QUERIES = _Family("db_query_duration_seconds", "Time of one SQL query (requests and background tasks).", (), LATENCY_BUCKETS)
+UPSTREAM = _Family(
+    "upstream_request_duration_seconds", "Time of a call to an external API, up to the response headers.",
+    ("service", "method", "operation", "status"), LATENCY_BUCKETS,
+)
+FAMILIES = (REQUESTS, REQUEST_QUERIES, REQUEST_DB_TIME, QUERIES, UPSTREAM)
+
+
+# ── Per-request accounting ────────────────────────────────────────────
+
+class RequestStats:
+    __slots__ = ("started", "queries", "db_time", "upstream")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.upstream: dict[str, float] = {}
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value, in milliseconds."""
+        parts = [
+            f"app;dur={(time.perf_counter() - self.started) * 1000:.1f}",
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+        ]
+        parts += [f"{service};dur={spent * 1000:.1f}" for service, spent in self.upstream.items()]
+        return ", ".join(parts)
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def begin() -> tuple[RequestStats, Token]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end(token: Token) -> None:
+    _current.reset(token)
+
+
+def observe_request(method: str, route: str, status: int, stats: RequestStats) -> None:
+    REQUESTS.observe(time.perf_counter() - stats.started, method, route, str(status))
+    REQUEST_QUERIES.observe(stats.queries, method, route)
+    REQUEST_DB_TIME.observe(stats.db_time, method, route)
+
+
+# ── SQL ───────────────────────────────────────────────────────────────
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("metrics_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    QUERIES.observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+def _on_error(context) -> None:
+    if context.connection is not None:
+        started = context.connection.info.get("metrics_started")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time the queries of ``engine`` (the async engine's events run in the request's context)."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_execute)
+        event.listen(sync_engine, "handle_error", _on_error)
+
+
+# ── Upstream APIs ─────────────────────────────────────────────────────
+
+def operation(path: str) -> str:
+    """Path with its ids replaced, to keep the label set small: ``/v1/calls/{id}``."""
+    return "/".join("{id}" if _ID_SEGMENT.search(segment) else segment for segment in path.split("/"))
+
+
+def observe_upstream(service: str, method: str, path: str, status: str, elapsed: float) -> None:
+    UPSTREAM.observe(elapsed, service, method, operation(path), status)
+    stats = _current.get()
+    if stats is not None:
+        stats.upstream[service] = stats.upstream.get(service, 0.0) + elapsed
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """httpx transport timing each request of ``service`` (errors have status ``error``)."""
+
+    def __init__(self, service: str, transport: httpx.AsyncBaseTransport):
+        self.service = service
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            observe_upstream(self.service, request.method, request.url.path, status, time.perf_counter() - started)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def transport(service: str, **kwargs: Any) -> InstrumentedTransport:
+    """An instrumented ``httpx.AsyncHTTPTransport(**kwargs)``, for ``AsyncClient(transport=...)``."""
+    return InstrumentedTransport(service, httpx.AsyncHTTPTransport(**kwargs))
+
+
+# ── Exposition ────────────────────────────────────────────────────────
+
+def render() -> str:
+    """Every metric of this worker, in Prometheus text format (0.0.4)."""
+    return "\n".join(line for family in FAMILIES for line in family.render()) + "\n"
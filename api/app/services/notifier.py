@@ -0,0 +1,337 @@
+"""Alert notifications — a Postgres outbox drained by a pool of async workers.
+
+:func:`enqueue` is called by the alert engine in the transaction that
+creates the ``AlertEvent``s, so a notification exists if and only if its
+alert does. Nothing is sent on the request path or in the evaluator.
+
+- A new row waits ``NOTIFY_DIGEST_SECONDS`` before its first attempt; alerts
+  raised for the same destination in the meantime join it, so an alert
+  storm becomes one digest per tenant and destination.
+- Workers claim due rows with ``FOR UPDATE SKIP LOCKED`` (any worker of any
+  process); a claim is a lease, so rows of a crashed worker are retried.
+- Webhooks go through one pooled HTTP client, emails through SMTP; each
+  destination (URL host / SMTP server) has its own concurrency limit. No
+  database connection is held while a notification is being sent.
+- Failures are retried with exponential backoff and jitter, then
+  dead-lettered (``status = 'dead'``) after ``NOTIFY_MAX_ATTEMPTS``.
+"""
+
+import asyncio
+import logging
+import random
+import smtplib
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import async_session
+from ..models import AlertEvent, AlertRule, NotificationOutbox, Role, User
+from . import event_hub
+
+logger = logging.getLogger(__name__)
+
+_LEASE = timedelta(minutes=5)  # a claimed row is retried after this if its worker died
+
+_http: httpx.AsyncClient | None = None
+_limits: dict[str, asyncio.Semaphore] = {}
+_wake = asyncio.Event()
+_tasks: list[asyncio.Task] = []
+_stats = {"sent": 0, "failed": 0, "dead": 0}
+
+
+# ============================================================================
+# ENQUEUE (alert engine transaction)
+# ============================================================================
+
+async def _tenant_admin_emails(db: AsyncSession, tenant_id: uuid.UUID) -> list[str]:
+    result = await db.execute(
+        select(User.email).where(
+            User.tenant_id == tenant_id,
+            User.role == Role.TENANT_ADMIN.value,
+            User.is_active == True,  # noqa: E712
+        )
+    )
+    return sorted(result.scalars().all())
+
+
+async def enqueue(db: AsyncSession, alerts: list[tuple[AlertEvent, AlertRule]]) -> int:
+    """Queue the notifications of freshly created alerts; the caller commits.
+
+    Returns the number of new outbox rows (alerts joining a waiting digest
+    do not create one).
+    """
+    now = datetime.now(timezone.utc)
+    targets: dict[tuple[uuid.UUID, str, str], list[str]] = {}
+    admin_emails: dict[uuid.UUID, str] = {}
+    for event, rule in alerts:
+        channels = []
+        if rule.notify_webhook and rule.webhook_url:
+            channels.append(("webhook", rule.webhook_url))
+        if rule.notify_email and settings.SMTP_HOST:
+            if rule.tenant_id not in admin_emails:
+                admin_emails[rule.tenant_id] = ",".join(await _tenant_admin_emails(db, rule.tenant_id))
+            if admin_emails[rule.tenant_id]:
+                channels.append(("email", admin_emails[rule.tenant_id]))
+        for channel, destination in channels:
+            targets.setdefault((event.tenant_id, channel, destination), []).append(str(event.id))
+
+    created = 0
+    for (tenant_id, channel, destination), event_ids in targets.items():
+        waiting = (await db.execute(
+            select(NotificationOutbox)
+            .where(
+                NotificationOutbox.tenant_id == tenant_id,
+                NotificationOutbox.channel == channel,
+                NotificationOutbox.destination == destination,
+                NotificationOutbox.status == "pending",
+                NotificationOutbox.attempts == 0,
+                NotificationOutbox.next_attempt_at > now,
+            )
+            .with_for_update(skip_locked=True)
+            .limit(1)
+        )).scalar_one_or_none()
+        if waiting is not None:
+            waiting.alert_event_ids = [*waiting.alert_event_ids, *event_ids]
+            continue
+        db.add(NotificationOutbox(
+            tenant_id=tenant_id,
+            channel=channel,
+            destination=destination,
+            alert_event_ids=event_ids,
+            next_attempt_at=now + timedelta(seconds=settings.NOTIFY_DIGEST_SECONDS),
+        ))
+        created += 1
+    return created
+
+
+# ============================================================================
+# DELIVERY
+# ============================================================================
+
+def _client() -> httpx.AsyncClient:
+    global _http
+    if _http is None or _http.is_closed:
+        _http = httpx.AsyncClient(
+            timeout=settings.NOTIFY_HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=settings.NOTIFY_MAX_CONNECTIONS, max_keepalive_connections=10),
+        )
+    return _http
+
+
+def _limit(key: str) -> asyncio.Semaphore:
+    sem = _limits.get(key)
+    if sem is None:
+        sem = _limits[key] = asyncio.Semaphore(settings.NOTIFY_PER_DESTINATION_CONCURRENCY)
+    return sem
+
+
+def _alert_dict(event: AlertEvent) -> dict[str, Any]:
+    return {
+        "id": str(event.id),
+        "rule_id": str(event.rule_id),
+        "severity": event.severity,
+        "title": event.title,
+        "message": event.message,
+        "created_at": event.created_at.isoformat() if event.created_at else None,
+    }
+
+
+async def _send_webhook(row: NotificationOutbox, events: list[AlertEvent]) -> None:
+    payload = {
+        "type": "alert" if len(events) == 1 else "alert.digest",
+        "tenant_id": str(row.tenant_id),
+        "count": len(events),
+        "alerts": [_alert_dict(e) for e in events],
+    }
+    async with _limit(urlsplit(row.destination).netloc):
+        resp = await _client().post(row.destination, json=payload)
+    resp.raise_for_status()
+
+
+def _smtp_send(message: EmailMessage) -> None:
+    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.NOTIFY_HTTP_TIMEOUT) as smtp:
+        if settings.SMTP_STARTTLS:
+            smtp.starttls()
+        if settings.SMTP_USERNAME:
+            smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        smtp.send_message(message)
+
+
+async def _send_email(row: NotificationOutbox, events: list[AlertEvent]) -> None:
+    message = EmailMessage()
+    message["From"] = settings.SMTP_FROM
+    message["To"] = row.destination
+    if len(events) == 1:
+        message["Subject"] = f"[CallRounded] Alerte : {events[0].title}"
+    else:
+        message["Subject"] = f"[CallRounded] {len(events)} nouvelles alertes"
+    message.set_content("\n\n".join(
+        f"[{e.severity.upper()}] {e.title}\n{e.message}\n{e.created_at:%d/%m/%Y %H:%M} UTC" for e in events
+    ))
+    # smtplib is blocking: run it off the event loop
+    async with _limit(f"smtp:{settings.SMTP_HOST}"):
+        await asyncio.to_thread(_smtp_send, message)
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = min(settings.NOTIFY_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), settings.NOTIFY_BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+async def _deliver(row: NotificationOutbox) -> None:
+    """Send one outbox row and record the outcome.
+
+    No database connection is held while sending: the alerts are read in one
+    short session and the outcome written in another, so slow webhook or SMTP
+    servers never keep pooled connections away from the API.
+    """
+    ids = [uuid.UUID(i) for i in row.alert_event_ids]
+    async with async_session() as db:
+        events = list((await db.execute(
+            select(AlertEvent).where(AlertEvent.id.in_(ids)).order_by(AlertEvent.created_at)
+        )).scalars().all())
+
+    values: dict[str, Any]
+    try:
+        if events:
+            if row.channel == "webhook":
+                await _send_webhook(row, events)
+            elif row.channel == "email":
+                await _send_email(row, events)
+            else:
+                raise ValueError(f"unknown channel {row.channel!r}")
+    except Exception as exc:
+        now = datetime.now(timezone.utc)
+        attempts = row.attempts + 1
+        error = f"{type(exc).__name__}: {exc}"[:1000]
+        if attempts >= settings.NOTIFY_MAX_ATTEMPTS:
+            values = {"status": "dead", "attempts": attempts, "last_error": error}
+            _stats["dead"] += 1
+            logger.error("Notification %s dead-lettered after %s attempts: %s", row.id, attempts, error)
+        else:
+            values = {
+                "status": "pending",
+                "attempts": attempts,
+                "last_error": error,
+                "next_attempt_at": now + _backoff(attempts),
+            }
+            _stats["failed"] += 1
+            logger.warning("Notification %s failed (attempt %s): %s", row.id, attempts, error)
+        sent = False
+    else:
+        now = datetime.now(timezone.utc)
+        values = {"status": "sent", "attempts": row.attempts + 1, "sent_at": now, "last_error": None}
+        _stats["sent"] += 1
+        sent = True
+
+    async with async_session() as db:
+        if sent and events:
+            channels = func.coalesce(AlertEvent.notification_channels + ",", "") + row.channel
+            await db.execute(
+                update(AlertEvent)
+                .where(AlertEvent.id.in_([e.id for e in events]))
+                .values(notified_at=now, notification_channels=channels)
+            )
+        await db.execute(update(NotificationOutbox).where(NotificationOutbox.id == row.id).values(**values))
+        await db.commit()
+
+
+async def _claim(limit: int) -> list[NotificationOutbox]:
+    """Lease up to ``limit`` due rows to this worker."""
+    now = datetime.now(timezone.utc)
+    async with async_session() as db:
+        due = (
+            select(NotificationOutbox.id)
+            .where(
+                NotificationOutbox.status.in_(("pending", "sending")),
+                NotificationOutbox.next_attempt_at <= now,
+            )
+            .order_by(NotificationOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due))
+            .values(status="sending", next_attempt_at=now + _LEASE)
+            .returning(NotificationOutbox)
+        )
+        rows = list(result.scalars().all())
+        await db.commit()
+    return rows
+
+
+async def _worker(n: int) -> None:
+    while True:
+        try:
+            rows = await _claim(settings.NOTIFY_BATCH_SIZE)
+            if rows:
+                await asyncio.gather(*(_deliver(r) for r in rows))
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Notification worker %s failed", n)
+        _wake.clear()
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=settings.NOTIFY_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _on_event(message: dict[str, Any]) -> None:
+    if message.get("kind") == "alert":
+        _wake.set()
+
+
+# ============================================================================
+# LIFECYCLE
+# ============================================================================
+
+def start() -> None:
+    """Start the delivery workers of this process (called from the app lifespan)."""
+    if settings.NOTIFY_ENABLED and not _tasks:
+        event_hub.add_listener(_on_event)
+        for n in range(settings.NOTIFY_WORKERS):
+            _tasks.append(asyncio.create_task(_worker(n), name=f"notifier-{n}"))
+
+
+async def stop() -> None:
+    global _http
+    for task in _tasks:
+        task.cancel()
+    for task in _tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _tasks.clear()
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
+
+async def outbox_stats(db: AsyncSession) -> dict[str, Any]:
+    result = await db.execute(
+        select(NotificationOutbox.status, func.count()).group_by(NotificationOutbox.status)
+    )
+    return {"outbox": dict(result.all()), "workers": len(_tasks), **_stats}
+
+
+async def retry_dead(db: AsyncSession, outbox_id: uuid.UUID | None = None) -> int:
+    """Put dead-lettered rows back in the queue; the caller commits."""
+    query = update(NotificationOutbox).where(NotificationOutbox.status == "dead")
+    if outbox_id is not None:
+        query = query.where(NotificationOutbox.id == outbox_id)
+    result = await db.execute(
+        query.values(status="pending", attempts=0, next_attempt_at=func.now()).returning(NotificationOutbox.id)
+    )
+    return len(result.all())
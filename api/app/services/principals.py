@@ -0,0 +1,214 @@
+"""Authenticated principals — what ``get_current_user`` needs, cached per token.
+
+A :class:`Principal` is a read-only snapshot of a user, its agent
+assignments and its tenant's flags, loaded with one query and cached per
+``(user_id, jti)`` for ``PRINCIPAL_CACHE_TTL_SECONDS`` (never beyond the
+token's expiry; 0 disables the cache).
+
+Changes to users, assignments or tenant settings go through :func:`bump`,
+which increments ``tenants.auth_version`` in the caller's transaction and
+broadcasts the new version through the event hub. Each worker remembers the
+latest version of every tenant and refuses cached principals (and fresh ones
+read before the change committed) built from an older version, so an admin
+change applies on the next request, on every worker.
+
+:class:`AgentScope` is what a principal may see (``deps.AccessibleAgentIds``).
+"""
+
+import time
+import uuid
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Callable, Iterable, TypeVar
+
+from sqlalchemy import String, any_, bindparam, false, func, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..config import settings
+from ..models import Role, Tenant, User, UserAgentAssignment
+from . import event_hub
+
+_ADMIN_ROLES = (Role.SUPER_ADMIN.value, Role.TENANT_ADMIN.value)
+
+T = TypeVar("T")
+
+
+class AgentScope:
+    """The agents a request may see: every agent of the tenant, or a fixed set.
+
+    Membership is a set lookup; :meth:`clause` turns the scope into a SQL
+    condition so that queries on local tables filter in the database.
+    """
+
+    __slots__ = ("agents",)
+
+    def __init__(self, agents: Iterable[str] | None = None):
+        self.agents: frozenset[str] | None = frozenset(agents) if agents is not None else None
+
+    @property
+    def unrestricted(self) -> bool:
+        return self.agents is None
+
+    def __contains__(self, agent_id: object) -> bool:
+        return self.agents is None or agent_id in self.agents
+
+    def __repr__(self) -> str:
+        return "AgentScope(all)" if self.agents is None else f"AgentScope({len(self.agents)} agents)"
+
+    def filter(self, items: Iterable[T], key: Callable[[T], Any]) -> list[T]:
+        """Items whose agent (``key(item)``) is in scope."""
+        if self.agents is None:
+            return list(items)
+        return [item for item in items if key(item) in self.agents]
+
+    def clause(self, column: ColumnElement) -> ColumnElement[bool]:
+        """``WHERE`` condition restricting ``column`` (an agent external id) to the scope."""
+        if self.agents is None:
+            return true()
+        if not self.agents:
+            return false()
+        # One array parameter: the statement text does not depend on the number of agents
+        return column == any_(bindparam("scope_agents", sorted(self.agents), type_=ARRAY(String), unique=True))
+
+
+ALL_AGENTS = AgentScope()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user of a request (same read API as ``User``)."""
+
+    id: uuid.UUID
+    tenant_id: uuid.UUID
+    email: str
+    role: str
+    agent_ids: frozenset[str]
+    tenant_name: str
+    tenant_display_name: str | None
+    agent_enabled: bool
+    auth_version: int
+
+    def is_admin(self) -> bool:
+        return self.role in _ADMIN_ROLES
+
+    @cached_property
+    def scope(self) -> AgentScope:
+        return ALL_AGENTS if self.is_admin() else AgentScope(self.agent_ids)
+
+    def can_access_agent(self, agent_external_id: str) -> bool:
+        return agent_external_id in self.scope
+
+
+_cache: dict[tuple[str, str], tuple[float, Principal]] = {}
+_versions: dict[str, int] = {}  # latest auth_version seen per tenant
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+async def load(db: AsyncSession, user_id: uuid.UUID) -> Principal | None:
+    """Read an active user, its assignments and its tenant in one query."""
+    assignments = (
+        select(func.array_agg(UserAgentAssignment.agent_external_id))
+        .where(UserAgentAssignment.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            User.id, User.tenant_id, User.email, User.role,
+            Tenant.name, Tenant.display_name, Tenant.agent_enabled, Tenant.auth_version,
+            assignments,
+        )
+        .join(Tenant, Tenant.id == User.tenant_id)
+        .where(User.id == user_id, User.is_active.is_(True))
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return Principal(
+        id=row[0],
+        tenant_id=row[1],
+        email=row[2],
+        role=row[3],
+        tenant_name=row[4],
+        tenant_display_name=row[5],
+        agent_enabled=row[6],
+        auth_version=row[7],
+        agent_ids=frozenset(row[8] or ()),
+    )
+
+
+def _current(principal: Principal) -> bool:
+    return principal.auth_version >= _versions.get(str(principal.tenant_id), 0)
+
+
+async def get(db: AsyncSession, user_id: uuid.UUID, jti: str, expires_at: float | None = None) -> Principal | None:
+    """Principal of a decoded access token; ``expires_at`` is its ``exp`` (unix time)."""
+    ttl = settings.PRINCIPAL_CACHE_TTL_SECONDS
+    key = (str(user_id), jti)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] > time.monotonic() and _current(cached[1]):
+        _stats["hits"] += 1
+        return cached[1]
+
+    _stats["misses"] += 1
+    principal = await load(db, user_id)
+    if principal is None:
+        _cache.pop(key, None)
+        return None
+    tenant = str(principal.tenant_id)
+    _versions[tenant] = max(_versions.get(tenant, 0), principal.auth_version)
+    if ttl > 0 and _current(principal):
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if len(_cache) >= settings.PRINCIPAL_CACHE_MAX_ENTRIES:
+            _cache.pop(next(iter(_cache)))  # oldest entry
+        _cache[key] = (time.monotonic() + ttl, principal)
+    return principal
+
+
+def invalidate(tenant_id: uuid.UUID | str | None, version: int | None = None) -> None:
+    """Drop the cached principals of a tenant (``None``: every tenant)."""
+    _stats["invalidations"] += 1
+    if tenant_id is None:
+        _cache.clear()
+        return
+    tenant = str(tenant_id)
+    if version is not None:
+        _versions[tenant] = max(_versions.get(tenant, 0), version)
+    for key in [k for k, (_, p) in _cache.items() if str(p.tenant_id) == tenant]:
+        del _cache[key]
+
+
+async def bump(db: AsyncSession, tenant_id: uuid.UUID) -> int:
+    """Record a change of the tenant's users, assignments or settings; the caller commits.
+
+    Applies to this worker at once (a rollback only costs a few cache misses)
+    and to the other workers when the transaction commits.
+    """
+    version = (await db.execute(
+        update(Tenant)
+        .where(Tenant.id == tenant_id)
+        .values(auth_version=Tenant.auth_version + 1)
+        .returning(Tenant.auth_version)
+    )).scalar_one()
+    invalidate(tenant_id, version)
+    await event_hub.publish(db, tenant_id, "auth", {"version": version})
+    return version
+
+
+def _on_event(message: dict[str, Any]) -> None:
+    kind = message.get("kind")
+    if kind == "auth":
+        invalidate(message.get("tenant_id"), (message.get("data") or {}).get("version"))
+    elif kind == "resync" and message.get("tenant_id") is None:
+        # The hub reconnected: version changes may have been missed
+        invalidate(None)
+
+
+event_hub.add_listener(_on_event)
+
+
+def stats() -> dict[str, Any]:
+    return {"entries": len(_cache), "tenants": len(_versions), **_stats}
@@ -0,0 +1,192 @@
+"""Sampled request profiles, saved as collapsed stacks (flame graph input).
+
+:class:`~app.middleware.profiler.ProfilerMiddleware` runs a request under
+pyinstrument, a statistical profiler: it samples the stack every
+``PROFILER_INTERVAL_MS`` instead of tracing each call, and in async mode
+only records the request's own task — time spent awaiting (upstream calls,
+SQL) shows up as ``[await]`` under the awaiting frame. Code run in the
+threadpool (sync routes) is not seen, only the await on it.
+
+A request is profiled when:
+
+- it is drawn at ``PROFILER_SAMPLE_RATE``; the profile is always kept;
+- or its path starts with one of ``PROFILER_SLOW_PATHS`` and
+  ``PROFILER_SLOW_MS`` is set (0, off, by default): the duration of a
+  request is not known when it starts, so every request of these routes is
+  profiled and the profile is kept only if it took ``PROFILER_SLOW_MS`` or
+  more. That is the sampler's overhead on each of them, whatever
+  ``PROFILER_SAMPLE_RATE``: a mode for a diagnosis, not for production.
+
+At most ``PROFILER_MAX_CONCURRENT`` requests per worker are profiled at a
+time, the others run as usual. Profiles are written to ``PROFILER_DIR``
+(shared by the workers), one ``.folded`` file per request, the oldest
+removed beyond ``PROFILER_MAX_FILES``. Each line is ``frame;frame;… µs``,
+the input of ``flamegraph.pl`` and speedscope.
+
+pyinstrument is optional: without the module, the middleware does nothing.
+"""
+
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ..config import settings
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pragma: no cover - optional dependency
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = ".folded"
+_NAME = re.compile(r"^[\w.{}+-]+\.folded$")
+
+_active = 0
+_stats = {"profiled": 0, "saved": 0, "discarded": 0, "busy": 0, "errors": 0}
+
+
+def available() -> bool:
+    return Profiler is not None
+
+
+def start() -> Any | None:
+    """A running profiler for the current request, or None if every slot is taken."""
+    global _active
+    if _active >= settings.PROFILER_MAX_CONCURRENT:
+        _stats["busy"] += 1
+        return None
+    profiler = Profiler(interval=settings.PROFILER_INTERVAL_MS / 1000, async_mode="enabled")
+    try:
+        profiler.start()
+    except RuntimeError:  # already profiled higher up in this context
+        _stats["errors"] += 1
+        return None
+    _active += 1
+    _stats["profiled"] += 1
+    return profiler
+
+
+def stop(profiler: Any) -> Any:
+    global _active
+    _active -= 1
+    return profiler.stop()
+
+
+# ── Collapsed stacks ──────────────────────────────────────────────────
+
+def _label(frame: Any) -> str:
+    if frame.is_synthetic:
+        return frame.identifier
+    label = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+    return label.replace(";", ":")
+
+
+def collapsed(session: Any) -> str:
+    """``frame;frame;… weight`` lines, the weight being self time in µs."""
+    root = session.root_frame()
+    if root is None:
+        return ""
+    weights: dict[str, int] = {}
+    pending = [(root, _label(root))]
+    while pending:
+        frame, stack = pending.pop()
+        own = frame.time - sum(child.time for child in frame.children)
+        for child in frame.children:
+            if child.identifier == "[self]":
+                own += child.time
+            else:
+                pending.append((child, f"{stack};{_label(child)}"))
+        weights[stack] = weights.get(stack, 0) + round(own * 1_000_000)
+    return "".join(f"{stack} {weight}\n" for stack, weight in sorted(weights.items()) if weight > 0)
+
+
+# ── Storage ───────────────────────────────────────────────────────────
+
+def _directory() -> Path:
+    return Path(settings.PROFILER_DIR)
+
+
+def _file_name(method: str, route: str, reason: str, elapsed: float) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    slug = re.sub(r"[^\w.{}+-]+", "_", route.strip("/").replace("/", "+"))  # "+" stands for "/"
+    return f"{stamp}-{os.getpid()}-{reason}-{round(elapsed * 1000)}ms-{method}-{slug}{SUFFIX}"
+
+
+def _write(session: Any, name: str) -> None:
+    directory = _directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(collapsed(session))
+    # File names start with the time: the first ones are the oldest
+    for old in sorted(directory.glob(f"*{SUFFIX}"))[: -max(1, settings.PROFILER_MAX_FILES)]:
+        try:
+            old.unlink()
+        except FileNotFoundError:  # removed by another worker
+            pass
+
+
+async def save(session: Any, method: str, route: str, reason: str, elapsed: float) -> None:
+    """Write the profile off the event loop; a failure is logged, never raised."""
+    try:
+        await asyncio.to_thread(_write, session, _file_name(method, route, reason, elapsed))
+        _stats["saved"] += 1
+    except Exception:
+        _stats["errors"] += 1
+        logger.exception("profiler.save failed route=%s", route)
+
+
+def discard() -> None:
+    _stats["discarded"] += 1
+
+
+def list_profiles() -> list[dict[str, Any]]:
+    """Saved profiles, newest first (every worker's)."""
+    directory = _directory()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in sorted(directory.glob(f"*{SUFFIX}"), reverse=True):
+        parts = path.name[: -len(SUFFIX)].split("-", 5)
+        if len(parts) != 6:
+            continue
+        stamp, pid, reason, duration, method, slug = parts
+        try:
+            size = path.stat().st_size
+            created_at = datetime.strptime(stamp, "%Y%m%dT%H%M%S%f").replace(tzinfo=timezone.utc)
+            duration_ms = int(duration.removesuffix("ms"))
+        except (FileNotFoundError, ValueError):
+            continue
+        profiles.append({
+            "name": path.name,
+            "created_at": created_at.isoformat(),
+            "worker": pid,
+            "reason": reason,
+            "duration_ms": duration_ms,
+            "method": method,
+            "route": "/" + slug.replace("+", "/"),
+            "size": size,
+        })
+    return profiles
+
+
+def profile_path(name: str) -> Path | None:
+    """Path of a saved profile, or None for an unknown or invalid name."""
+    if not _NAME.match(name):
+        return None
+    path = _directory() / name
+    return path if path.is_file() else None
+
+
+def stats() -> dict[str, Any]:
+    return {
+        "enabled": settings.PROFILER_ENABLED,
+        "available": available(),
+        "active": _active,
+        "sample_rate": settings.PROFILER_SAMPLE_RATE,
+        "slow_ms": settings.PROFILER_SLOW_MS,
+        **_stats,
+    }
@@ -0,0 +1,231 @@
+"""Response cache for read-heavy GET routes, with strong ETags and 304s.
+
+A route opts in with :func:`cached` and a router built with
+``route_class=CachedRoute``::
+
+    router = APIRouter(route_class=CachedRoute)
+
+    @router.get("/presets", response_model=list[TemplateOut])
+    @cached(ttl=3600, tags=("templates",))
+    async def list_preset_templates(current_user: CurrentUser, db: DBSession): ...
+
+Dependencies run as usual (authentication, role checks), then the serialized
+body is looked up per worker by (route, tenant, agent scope, path and query
+parameters). On a hit the endpoint is not called, so a route that only needs
+the principal (served by the principal cache) answers without any query.
+
+Every cached response carries a strong ETag, the hash of its body; a request
+whose ``If-None-Match`` matches gets an empty 304.
+
+Entries expire after the route's TTL and are dropped as soon as the data
+behind them changes: writers call :func:`invalidate` with the route's tags,
+which applies to this worker at once and to the others through the event hub
+when the transaction commits. Call ingestion ("call" / "resync" messages)
+drops the tenant's ``"calls"`` entries (dashboard, analytics).
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from ..config import settings
+from . import event_hub
+from .principals import AgentScope, Principal
+
+CACHE_CONTROL = "private, no-cache"  # browsers keep the body but revalidate with If-None-Match
+
+_request: ContextVar[Request | None] = ContextVar("response_cache_request", default=None)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float
+    tags: frozenset[str]
+
+
+@dataclass
+class _Entry:
+    expires: float
+    tenant: str
+    tags: frozenset[str]
+    etag: str
+    body: bytes
+    media_type: str | None
+
+
+_cache: dict[tuple, _Entry] = {}
+_generation = 0  # bumped by every invalidation; a response computed across one is not stored
+_stats = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0}
+
+
+def cached(ttl: float, tags: Iterable[str] = ()) -> Callable:
+    """Mark an ``async`` endpoint as cacheable (needs ``route_class=CachedRoute``)."""
+
+    def decorator(endpoint: Callable) -> Callable:
+        if not asyncio.iscoroutinefunction(endpoint):
+            raise TypeError(f"{endpoint.__qualname__}: only async endpoints can be cached")
+        endpoint.response_cache = CachePolicy(ttl=ttl, tags=frozenset(tags))
+        return endpoint
+
+    return decorator
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def matches(if_none_match: str | None, etag: str) -> bool:
+    """``If-None-Match`` uses the weak comparison: ``W/"x"`` matches ``"x"``."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _respond(request: Request, etag: str, body: bytes, media_type: str | None, status: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "X-Cache": status}
+    if matches(request.headers.get("if-none-match"), etag):
+        _stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+
+def _principal(values: dict[str, Any]) -> tuple[str, frozenset[str] | None]:
+    """Tenant and agent scope of the request, from its resolved dependencies."""
+    tenant, agents = "", None
+    for value in values.values():
+        if isinstance(value, Principal):
+            tenant, agents = str(value.tenant_id), value.scope.agents
+    for value in values.values():
+        if isinstance(value, AgentScope):
+            agents = value.agents
+    return tenant, agents
+
+
+class CachedRoute(APIRoute):
+    """``APIRoute`` serving the endpoints marked with :func:`cached` from the cache."""
+
+    def get_route_handler(self) -> Callable:
+        policy: CachePolicy | None = getattr(self.endpoint, "response_cache", None)
+        if policy is None or "GET" not in self.methods:
+            return super().get_route_handler()
+
+        # FastAPI resolves the dependencies then calls ``dependant.call`` with them:
+        # that call is where the cache sits, so the key can use the principal.
+        self.dependant.call = self._cached_call(self.dependant.call, policy)
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            token = _request.set(request)
+            try:
+                return await handler(request)
+            finally:
+                _request.reset(token)
+
+        return route_handler
+
+    def _cached_call(self, endpoint: Callable, policy: CachePolicy) -> Callable:
+        params = [field.name for field in self.dependant.path_params + self.dependant.query_params]
+        response_class = (
+            self.response_class.value if isinstance(self.response_class, DefaultPlaceholder) else self.response_class
+        )
+
+        async def call(**values: Any) -> Response:
+            request = _request.get()
+            tenant, agents = _principal(values)
+            key = (self.unique_id, tenant, agents, tuple(repr(values.get(name)) for name in params))
+
+            entry = _cache.get(key)
+            if entry is not None and entry.expires > time.monotonic():
+                _stats["hits"] += 1
+                return _respond(request, entry.etag, entry.body, entry.media_type, "HIT")
+
+            _stats["misses"] += 1
+            generation = _generation
+            result = await endpoint(**values)
+            if isinstance(result, StreamingResponse) or (isinstance(result, Response) and result.status_code != 200):
+                return result  # nothing to keep
+            if isinstance(result, Response):
+                rendered = result  # serialized by the endpoint (app/responses.py)
+            else:
+                rendered = response_class(await serialize_response(
+                    field=self.response_field,
+                    response_content=result,
+                    include=self.response_model_include,
+                    exclude=self.response_model_exclude,
+                    by_alias=self.response_model_by_alias,
+                    exclude_unset=self.response_model_exclude_unset,
+                    exclude_defaults=self.response_model_exclude_defaults,
+                    exclude_none=self.response_model_exclude_none,
+                ))
+            etag = etag_for(rendered.body)
+            if settings.RESPONSE_CACHE_ENABLED and generation == _generation:
+                if key not in _cache and len(_cache) >= settings.RESPONSE_CACHE_MAX_ENTRIES:
+                    _cache.pop(next(iter(_cache)))  # oldest entry
+                _cache[key] = _Entry(
+                    expires=time.monotonic() + policy.ttl,
+                    tenant=tenant,
+                    tags=policy.tags,
+                    etag=etag,
+                    body=rendered.body,
+                    media_type=rendered.media_type,
+                )
+            return _respond(request, etag, rendered.body, rendered.media_type, "MISS")
+
+        return call
+
+
+def drop(tenant_id: uuid.UUID | str | None, tags: Iterable[str] = ()) -> None:
+    """Forget this worker's entries of a tenant (``None``: every tenant) with one of ``tags`` (none: all)."""
+    global _generation
+    _generation += 1
+    _stats["invalidations"] += 1
+    tenant = str(tenant_id) if tenant_id is not None else None
+    tags = frozenset(tags)
+    for key in [
+        k for k, e in _cache.items()
+        if (tenant is None or e.tenant == tenant) and (not tags or e.tags & tags)
+    ]:
+        del _cache[key]
+
+
+async def invalidate(
+    db: AsyncSession, tenant_id: uuid.UUID, *tags: str, all_tenants: bool = False
+) -> None:
+    """Record a change of the data behind ``tags``; the caller commits.
+
+    ``all_tenants`` is for shared data (global presets); ``tenant_id`` is then
+    only the sender of the message.
+    """
+    drop(None if all_tenants else tenant_id, tags)
+    await event_hub.publish(db, tenant_id, "cache", {"tags": list(tags), "all_tenants": all_tenants})
+
+
+def _on_event(message: dict[str, Any]) -> None:
+    kind = message.get("kind")
+    tenant_id = message.get("tenant_id")
+    data = message.get("data") or {}
+    if kind == "cache":
+        drop(None if data.get("all_tenants") else tenant_id, data.get("tags") or ())
+    elif kind == "call" or (kind == "resync" and tenant_id is not None):
+        drop(tenant_id, ("calls",))
+    elif kind == "resync":
+        # The hub reconnected: invalidations may have been missed
+        drop(None)
+
+
+event_hub.add_listener(_on_event)
+
+
+def stats() -> dict[str, Any]:
+    return {"entries": len(_cache), "enabled": settings.RESPONSE_CACHE_ENABLED, **_stats}
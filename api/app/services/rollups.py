@@ -0,0 +1,260 @@
+"""Call rollups — hourly and daily counters derived from ``calls_cache``.
+
+Buckets are recomputed (not incremented) from the raw call store, so that a
+call re-ingested with a new status never gets counted twice. Ingestion
+refreshes only the hours it touched and re-sums their days from the hour
+buckets; :func:`rebuild` recomputes any range. Buckets are aligned on UTC
+hours/days.
+
+The refreshed buckets are upserted on ``uq_call_rollup_bucket``: the webhook
+and the sync may refresh the same hour at once, and the second transaction
+then waits for the first one's row instead of failing on the unique key.
+"""
+
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import DateTime, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import CallCache, CallRollup
+from .call_store import filtered_calls, parse_timestamp
+from .principals import AgentScope
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day")
+
+# Call statuses that have their own rollup counter
+_STATUS_COUNTERS = {
+    None: CallRollup.total_calls,
+    "completed": CallRollup.completed_calls,
+    "missed": CallRollup.missed_calls,
+    "failed": CallRollup.failed_calls,
+}
+
+_ROLLUP_COLUMNS = [
+    "id",
+    "tenant_id",
+    "agent_external_id",
+    "granularity",
+    "bucket_start",
+    "total_calls",
+    "completed_calls",
+    "missed_calls",
+    "failed_calls",
+    "duration_sum",
+    "duration_count",
+    "cost_sum",
+    "first_call_at",
+    "last_call_at",
+    "updated_at",
+]
+# Set again when a refreshed bucket already exists (all but the id and the bucket key)
+_ROLLUP_VALUES = [
+    c for c in _ROLLUP_COLUMNS if c not in ("id", "tenant_id", "agent_external_id", "granularity", "bucket_start")
+]
+
+
+def day_start(value: datetime | date) -> datetime:
+    """Midnight UTC of the day containing ``value``."""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).date()
+    return datetime.combine(value, time.min, tzinfo=timezone.utc)
+
+
+def hour_start(value: datetime) -> datetime:
+    """Start of the UTC hour containing ``value``."""
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _bucket_select(tenant_id: uuid.UUID, granularity: str, start: datetime, end: datetime):
+    call_utc = func.timezone("UTC", CallCache.started_at)
+    bucket = func.timezone("UTC", func.date_trunc(granularity, call_utc))
+    has_duration = CallCache.duration > 0
+    agent = func.coalesce(CallCache.agent_external_id, "")
+    return (
+        select(
+            func.gen_random_uuid(),
+            CallCache.tenant_id,
+            agent,
+            literal(granularity),
+            bucket,
+            func.count(),
+            func.count().filter(CallCache.status == "completed"),
+            func.count().filter(CallCache.status == "missed"),
+            func.count().filter(CallCache.status == "failed"),
+            func.coalesce(func.sum(CallCache.duration).filter(has_duration), 0.0),
+            func.count().filter(has_duration),
+            func.coalesce(func.sum(CallCache.cost), 0.0),
+            func.min(CallCache.started_at),
+            func.max(CallCache.started_at),
+            func.now(),
+        )
+        .where(
+            CallCache.tenant_id == tenant_id,
+            CallCache.started_at >= start,
+            CallCache.started_at < end,
+        )
+        .group_by(CallCache.tenant_id, agent, bucket)
+    )
+
+
+async def rebuild(db: AsyncSession, tenant_id: uuid.UUID, start: datetime, end: datetime) -> None:
+    """Recompute every hour and day bucket of ``tenant_id`` between the days of ``start`` and ``end``.
+
+    The range is widened to whole UTC days. The caller commits.
+    """
+    range_start = day_start(start)
+    range_end = day_start(end) + timedelta(days=1)
+    await db.execute(
+        delete(CallRollup).where(
+            CallRollup.tenant_id == tenant_id,
+            CallRollup.bucket_start >= range_start,
+            CallRollup.bucket_start < range_end,
+        )
+    )
+    for granularity in GRANULARITIES:
+        await db.execute(
+            insert(CallRollup).from_select(
+                _ROLLUP_COLUMNS, _bucket_select(tenant_id, granularity, range_start, range_end)
+            )
+        )
+
+
+def _day_from_hours_select(tenant_id: uuid.UUID, day: datetime):
+    """Day buckets of ``day`` summed from its hour buckets."""
+    return (
+        select(
+            func.gen_random_uuid(),
+            CallRollup.tenant_id,
+            CallRollup.agent_external_id,
+            literal("day"),
+            literal(day, DateTime(timezone=True)),
+            func.sum(CallRollup.total_calls),
+            func.sum(CallRollup.completed_calls),
+            func.sum(CallRollup.missed_calls),
+            func.sum(CallRollup.failed_calls),
+            func.sum(CallRollup.duration_sum),
+            func.sum(CallRollup.duration_count),
+            func.sum(CallRollup.cost_sum),
+            func.min(CallRollup.first_call_at),
+            func.max(CallRollup.last_call_at),
+            func.now(),
+        )
+        .where(
+            CallRollup.tenant_id == tenant_id,
+            CallRollup.granularity == "hour",
+            CallRollup.bucket_start >= day,
+            CallRollup.bucket_start < day + timedelta(days=1),
+        )
+        .group_by(CallRollup.tenant_id, CallRollup.agent_external_id)
+    )
+
+
+def _bucket_clauses(tenant_id: uuid.UUID, granularity: str, start: datetime, end: datetime) -> list:
+    return [
+        CallRollup.tenant_id == tenant_id,
+        CallRollup.granularity == granularity,
+        CallRollup.bucket_start >= start,
+        CallRollup.bucket_start < end,
+    ]
+
+
+async def _refresh_bucket(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    buckets: Any,
+) -> None:
+    """Upsert the recomputed ``buckets`` of ``[start, end)``, then drop the agents left without calls."""
+    stmt = pg_insert(CallRollup).from_select(_ROLLUP_COLUMNS, buckets)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_call_rollup_bucket",
+        set_={c: stmt.excluded[c] for c in _ROLLUP_VALUES},
+    ).returning(CallRollup.agent_external_id)
+    agents = (await db.execute(stmt)).scalars().all()
+    clauses = _bucket_clauses(tenant_id, granularity, start, end)
+    if agents:
+        clauses.append(CallRollup.agent_external_id.not_in(agents))
+    await db.execute(delete(CallRollup).where(*clauses))
+
+
+async def refresh_for_calls(
+    db: AsyncSession,
+    tenant_ids: Iterable[uuid.UUID],
+    calls: list[dict[str, Any]],
+) -> None:
+    """Refresh the buckets touched by freshly ingested CallRounded calls.
+
+    Each touched hour is recomputed from ``calls_cache``, then each touched day
+    is re-summed from its 24 hour buckets. The caller commits.
+    """
+    hours = set()
+    now = datetime.now(timezone.utc)
+    for c in calls:
+        started = parse_timestamp(c.get("start_time")) or parse_timestamp(c.get("end_time")) or now
+        hours.add(hour_start(started))
+    days = sorted({day_start(h) for h in hours})
+    for tenant_id in tenant_ids:
+        for hour in sorted(hours):
+            end = hour + timedelta(hours=1)
+            await _refresh_bucket(db, tenant_id, "hour", hour, end, _bucket_select(tenant_id, "hour", hour, end))
+        for day in days:
+            end = day + timedelta(days=1)
+            await _refresh_bucket(db, tenant_id, "day", day, end, _day_from_hours_select(tenant_id, day))
+
+
+def scope(
+    tenant_id: uuid.UUID,
+    accessible_agents: AgentScope,
+    granularity: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list:
+    """``WHERE`` clauses selecting a tenant's buckets for the accessible agents and range."""
+    clauses = [CallRollup.tenant_id == tenant_id, CallRollup.granularity == granularity]
+    if not accessible_agents.unrestricted:
+        clauses.append(accessible_agents.clause(CallRollup.agent_external_id))
+    if start is not None:
+        clauses.append(CallRollup.bucket_start >= start)
+    if end is not None:
+        clauses.append(CallRollup.bucket_start <= end)
+    return clauses
+
+
+async def count_calls(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    accessible_agents: AgentScope,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    status: str | None = None,
+    agent_id: str | None = None,
+) -> int:
+    """Exact number of calls in ``[start, end)`` matching the filters.
+
+    Summed from the daily buckets when the range falls on UTC day boundaries and
+    the status has a counter; otherwise counted on ``calls_cache``.
+    """
+    aligned = all(d is None or d == day_start(d) for d in (start, end))
+    if aligned and status in _STATUS_COUNTERS:
+        clauses = scope(tenant_id, accessible_agents, "day", start)
+        if end is not None:
+            clauses.append(CallRollup.bucket_start < end)
+        if agent_id is not None:
+            clauses.append(CallRollup.agent_external_id == agent_id)
+        total = await db.scalar(select(func.coalesce(func.sum(_STATUS_COUNTERS[status]), 0)).where(*clauses))
+        return int(total)
+
+    query = filtered_calls(tenant_id, accessible_agents, start, end)
+    if status is not None:
+        query = query.where(CallCache.status == status)
+    if agent_id is not None:
+        query = query.where(CallCache.agent_external_id == agent_id)
+    return await db.scalar(select(func.count()).select_from(query.subquery()))
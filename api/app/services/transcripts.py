@@ -0,0 +1,48 @@
+"""Call transcripts — CallRounded ``{role, content}`` entries to what users see and search."""
+
+from typing import Any
+
+
+def transform_transcript(raw_transcript):
+    """Transform CallRounded transcript to frontend format.
+    Filters out system messages and knowledge base content."""
+    if not raw_transcript:
+        return []
+    # Roles/patterns to exclude (system, KB injection, task switches)
+    EXCLUDED_ROLES = {"system", "tool", "function"}
+    KB_PREFIXES = (
+        "[Knowledge Base", "[KB]", "[Context]", "[System]",
+        "Base de connaissances", "knowledge_base",
+    )
+    result = []
+    for i, entry in enumerate(raw_transcript):
+        role = entry.get("role", "agent")
+        content = entry.get("content", "") or ""
+        # Skip system/tool roles
+        if role.lower() in EXCLUDED_ROLES:
+            continue
+        # Skip KB-injected content
+        if any(content.strip().startswith(prefix) for prefix in KB_PREFIXES):
+            continue
+        # Skip empty messages
+        if not content.strip():
+            continue
+        speaker = "agent" if role == "agent" else "caller"
+        result.append({
+            "speaker": speaker,
+            "text": content,
+            "timestamp": i * 5,
+        })
+    return result
+
+
+def searchable_text(call: dict[str, Any]) -> str | None:
+    """Transcript text stored in ``calls_cache.transcription`` and full-text indexed.
+
+    Only the messages kept by :func:`transform_transcript` are included, so
+    system prompts and knowledge-base injections never match a search.
+    """
+    lines = [entry["text"] for entry in transform_transcript(call.get("transcript"))]
+    if lines:
+        return "\n".join(lines)
+    return call.get("transcript_string")
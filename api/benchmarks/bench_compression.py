@@ -0,0 +1,84 @@
+"""
+Payload size and CPU cost per request of response compression
+(app/middleware/compression.py) on the transcript-heavy responses.
+
+No server or database is needed; the payloads are the synthetic ones of
+bench_serialization, serialized as the routes do (orjson)::
+
+    cd api && python -m benchmarks.bench_compression --calls 100 --turns 60
+
+For each payload and encoder setting: compressed size, ratio and median CPU
+time (``time.process_time``) to compress one response. "stream" is gzip in
+64 KiB flushed chunks, as for ``JSONArrayStream`` responses.
+"""
+import argparse
+import gzip
+import random
+import statistics
+import time
+import zlib
+
+from app.responses import dumps
+from benchmarks.bench_serialization import rich_page
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CHUNK = 64 * 1024
+
+
+def _gzip_stream(body: bytes, level: int) -> bytes:
+    c = zlib.compressobj(level, zlib.DEFLATED, 31)
+    out = [c.compress(body[i:i + CHUNK]) + c.flush(zlib.Z_SYNC_FLUSH) for i in range(0, len(body), CHUNK)]
+    return b"".join(out) + c.flush()
+
+
+def _encoders() -> list[tuple[str, object]]:
+    encoders = [("identity", lambda body: body)]
+    for level in (1, 6, 9):
+        encoders.append((f"gzip -{level}", lambda body, level=level: gzip.compress(body, level, mtime=0)))
+    encoders.append(("gzip -6 stream", lambda body: _gzip_stream(body, 6)))
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            encoders.append((f"br q{quality}", lambda body, q=quality: brotli.compress(body, quality=q)))
+    return encoders
+
+
+def _measure(encode, body: bytes, repeat: int) -> tuple[float, int]:
+    timings, size = [], 0
+    for _ in range(repeat):
+        started = time.process_time()
+        size = len(encode(body))
+        timings.append((time.process_time() - started) * 1000)
+    return statistics.median(timings), size
+
+
+def run(calls: int, turns: int, repeat: int) -> None:
+    page = rich_page(calls, turns, random.Random(42))
+    payloads = [
+        (f"GET /calls/rich ({calls} calls, {turns} turns)", dumps(page)),
+        (f"GET /calls/{{id}} ({turns} turns)", dumps(page["calls"][0])),
+    ]
+    if brotli is None:
+        print("brotli is not installed: gzip only\n")
+    for label, body in payloads:
+        print(f"{label} — {len(body) / 1024:.1f} KiB")
+        for name, encode in _encoders():
+            ms, size = _measure(encode, body, repeat)
+            print(f"  {name:16} {size / 1024:8.1f} KiB  ratio {len(body) / size:5.1f}  cpu {ms:7.2f} ms/request")
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=60, help="transcript entries per call")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.calls, args.turns, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Query plans of the hot queries before / after the composite indexes of
+migration 0003, on synthetic data (1M calls and alert events by default).
+
+Everything happens in a throwaway schema of the configured database, which is
+dropped at the end (``--keep`` to inspect it)::
+
+    cd api && python -m benchmarks.bench_indexes --rows 1000000
+
+For each query the plan shape and the execution time of
+``EXPLAIN (ANALYZE, BUFFERS)`` are printed without, then with the indexes.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.config import settings
+from app.models import Base
+
+SCHEMA = "bench_indexes"
+
+# Indexes added by alembic/versions/0003_hot_query_indexes.py
+INDEXES = [
+    "ix_calls_cache_tenant_started",
+    "ix_alert_events_tenant_created",
+    "ix_alert_rules_tenant_active",
+    "ix_agent_templates_tenant_name",
+    "ix_agent_templates_preset_category",
+    "ix_weekly_reports_tenant_week",
+    "ix_agents_cache_tenant_name",
+]
+
+# (label, SQL) — the WHERE / ORDER BY / LIMIT of the routes using them
+QUERIES = [
+    (
+        "GET /calls (page 1)",
+        "SELECT id, started_at FROM calls_cache WHERE tenant_id = :tenant"
+        " ORDER BY started_at DESC, id DESC LIMIT 20",
+    ),
+    (
+        "GET /calls (7 days)",
+        "SELECT count(*) FROM calls_cache WHERE tenant_id = :tenant"
+        " AND started_at >= now() - interval '7 days' AND started_at < now()",
+    ),
+    (
+        "GET /alerts/events",
+        "SELECT id, title FROM alert_events WHERE tenant_id = :tenant ORDER BY created_at DESC LIMIT 50",
+    ),
+    (
+        "GET /alerts/rules?active_only",
+        "SELECT id, name FROM alert_rules WHERE tenant_id = :tenant AND is_active",
+    ),
+    (
+        "POST /templates (name check)",
+        "SELECT id FROM agent_templates WHERE tenant_id = :tenant AND name = 'Template 42'",
+    ),
+    (
+        "GET /templates/presets",
+        "SELECT id, name FROM agent_templates WHERE is_preset ORDER BY category, name",
+    ),
+    (
+        "GET /analytics/weekly-reports",
+        "SELECT id, week_start FROM weekly_reports WHERE tenant_id = :tenant ORDER BY week_start DESC LIMIT 12",
+    ),
+    (
+        "GET /admin/agents",
+        "SELECT external_id, name FROM agents_cache WHERE tenant_id = :tenant ORDER BY name",
+    ),
+    (
+        "GET /admin/users/{id}/agents",
+        "SELECT agent_external_id FROM user_agent_assignments WHERE user_id = :user",
+    ),
+]
+
+FILL = [
+    """
+    INSERT INTO tenants (id, name, plan, agent_enabled)
+    SELECT gen_random_uuid(), 'Tenant ' || i, 'pro', true FROM generate_series(1, :tenants) i
+    """,
+    """
+    INSERT INTO users (id, tenant_id, email, password_hash, role, is_active)
+    SELECT gen_random_uuid(), t.id, 'user' || u || '@example.com', '-', 'USER', true
+    FROM tenants t, generate_series(1, 20) u
+    """,
+    """
+    INSERT INTO user_agent_assignments (id, user_id, agent_external_id)
+    SELECT gen_random_uuid(), u.id, 'agent-' || a
+    FROM users u, generate_series(1, greatest(:small / (20 * :tenants), 1)) a
+    """,
+    """
+    INSERT INTO agents_cache (id, tenant_id, external_id, name, status)
+    SELECT gen_random_uuid(), t.id, 'agent-' || a, 'Agent ' || md5(a::text), 'active'
+    FROM tenants t, generate_series(1, greatest(:small / :tenants, 1)) a
+    """,
+    """
+    INSERT INTO agent_templates (id, tenant_id, name, category, icon, is_preset,
+                                 greeting, system_prompt, voice, language, usage_count)
+    SELECT gen_random_uuid(), t.id, 'Template ' || n, 'custom', '-', false, '-', '-', 'emma', 'fr-FR', 0
+    FROM tenants t, generate_series(1, greatest(:small / :tenants, 1)) n
+    """,
+    """
+    INSERT INTO agent_templates (id, tenant_id, name, category, icon, is_preset,
+                                 greeting, system_prompt, voice, language, usage_count)
+    SELECT gen_random_uuid(), NULL, 'Preset ' || n, 'category-' || (n % 6), '-', true, '-', '-', 'emma', 'fr-FR', 0
+    FROM generate_series(1, 6) n
+    """,
+    """
+    INSERT INTO weekly_reports (id, tenant_id, week_start, week_end, total_calls, completed_calls,
+                                missed_calls, avg_duration, total_cost)
+    SELECT gen_random_uuid(), t.id, now() - w * interval '1 week', now() - (w - 1) * interval '1 week', 0, 0, 0, 0, 0
+    FROM tenants t, generate_series(1, greatest(:small / :tenants, 1)) w
+    """,
+    """
+    INSERT INTO alert_rules (id, tenant_id, name, rule_type, conditions, notify_email, notify_webhook,
+                             is_active, trigger_count, cooldown_minutes)
+    SELECT gen_random_uuid(), t.id, 'Rule ' || r, 'missed_calls', '{}', true, false, r % 4 = 0, 0, 60
+    FROM tenants t, generate_series(1, greatest(:small / :tenants, 1)) r
+    """,
+    """
+    INSERT INTO alert_events (id, tenant_id, rule_id, severity, title, message, created_at)
+    SELECT gen_random_uuid(), r.tenant_id, r.id, 'warning', 'Alert', '-',
+           now() - random() * interval '365 days'
+    FROM alert_rules r, generate_series(1, greatest(:rows / (SELECT count(*) FROM alert_rules), 1)) e
+    """,
+    """
+    INSERT INTO calls_cache (id, tenant_id, agent_external_id, external_call_id, status, started_at)
+    SELECT gen_random_uuid(), t.ids[1 + i % array_length(t.ids, 1)], 'agent-' || (i % 200), 'call-' || i,
+           (ARRAY['completed', 'missed', 'failed'])[1 + i % 3], now() - random() * interval '365 days'
+    FROM (SELECT array_agg(id) AS ids FROM tenants) t, generate_series(1, :rows) i
+    """,
+]
+
+
+def _nodes(plan: dict) -> list[str]:
+    node = plan["Node Type"]
+    if plan.get("Index Name"):
+        node += f" ({plan['Index Name']})"
+    return [node] + [n for child in plan.get("Plans", []) for n in _nodes(child)]
+
+
+async def _explain(conn: AsyncConnection, sql: str, params: dict) -> tuple[str, float, int]:
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params)
+    raw = result.scalar()
+    report = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    plan = report["Plan"]
+    buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+    return " > ".join(_nodes(plan)), report["Execution Time"], buffers
+
+
+async def _analyze(conn: AsyncConnection) -> None:
+    for table in Base.metadata.sorted_tables:
+        await conn.execute(text(f"ANALYZE {table.name}"))
+
+
+async def _plans(conn: AsyncConnection, params: dict) -> list[tuple[str, float, int]]:
+    plans = []
+    for _, sql in QUERIES:
+        await _explain(conn, sql, params)  # warm the cache: compare plans, not disk reads
+        plans.append(await _explain(conn, sql, params))
+    return plans
+
+
+async def run(rows: int, tenants: int, keep: bool) -> None:
+    engine = create_async_engine(settings.DATABASE_URL)
+    small = max(rows // 10, tenants)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.execute(text(f"SET search_path TO {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+            for name in INDEXES:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+            started = time.perf_counter()
+            for sql in FILL:
+                await conn.execute(text(sql), {"rows": rows, "small": small, "tenants": tenants})
+            await conn.commit()
+            await _analyze(conn)
+            print(f"Filled {rows:,} calls / alert events in {time.perf_counter() - started:.1f}s")
+
+            params = {
+                "tenant": (await conn.execute(text("SELECT id FROM tenants ORDER BY name LIMIT 1"))).scalar(),
+                "user": (await conn.execute(text("SELECT id FROM users ORDER BY email LIMIT 1"))).scalar(),
+            }
+            before = await _plans(conn, params)
+
+            started = time.perf_counter()
+            indexes = {index.name: index for table in Base.metadata.tables.values() for index in table.indexes}
+            for name in INDEXES:
+                await conn.run_sync(lambda sync_conn, index=indexes[name]: index.create(sync_conn))
+            await _analyze(conn)
+            await conn.commit()
+            print(f"Built {len(INDEXES)} indexes in {time.perf_counter() - started:.1f}s\n")
+
+            after = await _plans(conn, params)
+
+            for (label, _), (plan_b, ms_b, buf_b), (plan_a, ms_a, buf_a) in zip(QUERIES, before, after):
+                print(label)
+                print(f"  before {ms_b:9.2f} ms {buf_b:7d} buffers  {plan_b}")
+                print(f"  after  {ms_a:9.2f} ms {buf_a:7d} buffers  {plan_a}")
+
+            if not keep:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+                await conn.commit()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="calls and alert events to generate")
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCHEMA} schema afterwards")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.tenants, args.keep))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Login storm: password verification inline on the event loop vs. on the
+argon2 thread pool (app.auth.verify_password_async).
+
+No server or database is needed; each "login" is one argon2 verification
+with the configured parameters (ARGON2_*). While the logins run, a probe
+task ticks every millisecond and records how late it wakes up: that lag is
+what every other request on the worker would wait::
+
+    cd api && python -m benchmarks.bench_login --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app import auth
+from app.config import settings
+
+PASSWORD = "AdminPass123!"
+
+
+async def _probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - started - 0.001) * 1000)
+
+
+async def _inline(hashed: str) -> None:
+    auth.verify_password(PASSWORD, hashed)
+
+
+async def _offloaded(hashed: str) -> None:
+    await auth.verify_password_async(PASSWORD, hashed)
+
+
+async def _storm(login, hashed: str, logins: int, concurrency: int) -> dict[str, float]:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with sem:
+            await login(hashed)
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    lags.sort()
+    return {
+        "logins_per_s": logins / elapsed,
+        "lag_p50_ms": statistics.median(lags),
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[-1],
+        "lag_max_ms": lags[-1],
+    }
+
+
+async def run(logins: int, concurrency: int) -> None:
+    hashed = auth.hash_password(PASSWORD)
+    print(
+        f"argon2 t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST}KiB "
+        f"p={settings.ARGON2_PARALLELISM}, {settings.PASSWORD_HASH_CONCURRENCY} hashing threads, "
+        f"{logins} logins, {concurrency} concurrent\n"
+    )
+    for label, login in (("inline (before)", _inline), ("thread pool (after)", _offloaded)):
+        result = await _storm(login, hashed, logins, concurrency)
+        print(
+            f"{label:20} {result['logins_per_s']:7.1f} logins/s   event loop lag "
+            f"p50 {result['lag_p50_ms']:7.1f} ms  p99 {result['lag_p99_ms']:7.1f} ms  "
+            f"max {result['lag_max_ms']:7.1f} ms"
+        )
+    auth.shutdown_executor()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Overhead of the metrics (app/middleware/metrics.py, app/services/metrics.py)
+per request, to keep it within a few percent of a real route.
+
+No server or database is needed: requests are sent straight to an in-process
+FastAPI app (ASGI calls, no network), with and without MetricsMiddleware::
+
+    cd api && python -m benchmarks.bench_metrics --requests 5000
+
+- ``/ping``: an empty route, i.e. the worst case (the overhead is all there is)
+- ``/page``: serializes a page of calls, about the cost of a small list route
+- the SQL event listeners and ``observe_*`` calls, timed alone
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+from app.middleware.metrics import MetricsMiddleware
+from app.responses import FastJSONResponse
+from app.services import metrics
+from benchmarks.bench_serialization import rich_page
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    page = rich_page(20, 10, random.Random(42))
+
+    @app.get("/ping")
+    async def ping():
+        return FastJSONResponse({"status": "ok"})
+
+    @app.get("/page/{page_id}")
+    async def get_page(page_id: int):
+        return FastJSONResponse(page)
+
+    return app
+
+
+def _scope(app: FastAPI, path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80), "app": app,
+    }
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message: dict) -> None:
+    pass
+
+
+async def time_requests(asgi, app: FastAPI, path: str, requests: int) -> float:
+    """Median µs per request over 5 rounds."""
+    rounds = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(requests):
+            await asgi(_scope(app, path), _receive, _send)
+        rounds.append((time.perf_counter() - started) / requests * 1e6)
+    return statistics.median(rounds)
+
+
+def time_call(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def run(requests: int) -> None:
+    app = build_app()
+    instrumented = MetricsMiddleware(app)
+    for path in ("/ping", "/page/1"):
+        await time_requests(app, app, path, requests // 10)  # warm up
+        bare = await time_requests(app, app, path, requests)
+        timed = await time_requests(instrumented, app, path, requests)
+        print(
+            f"{path:10} without {bare:7.1f} µs  with {timed:7.1f} µs  "
+            f"overhead {timed - bare:5.1f} µs ({(timed - bare) / bare * 100:+.1f}%)"
+        )
+
+    conn = SimpleNamespace(info={})
+    stats, token = metrics.begin()
+
+    def query() -> None:
+        metrics._before_execute(conn, None, "SELECT 1", (), None, False)
+        metrics._after_execute(conn, None, "SELECT 1", (), None, False)
+
+    print(f"\nSQL listeners     {time_call(query, requests * 10):5.2f} µs/query")
+    print(f"observe_request   {time_call(lambda: metrics.observe_request('GET', '/api/calls', 200, stats), requests * 10):5.2f} µs")
+    print(
+        f"observe_upstream  "
+        f"{time_call(lambda: metrics.observe_upstream('callrounded', 'GET', '/v1/calls/0f1e2d3c-4b5a-6978-8796-a5b4c3d2e1f0', '200', 0.05), requests * 10):5.2f} µs"
+    )
+    print(f"Server-Timing     {time_call(stats.server_timing, requests * 10):5.2f} µs")
+    metrics.end(token)
+    started = time.perf_counter()
+    body = metrics.render()
+    print(f"render            {(time.perf_counter() - started) * 1000:5.2f} ms ({len(body) / 1024:.1f} KiB)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="requests per round (5 rounds per case)")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Serialization time of the large responses: FastAPI's default path
+(``jsonable_encoder`` / response_model validation, then ``json.dumps``) vs.
+app/responses.py (orjson, no re-validation, streamed arrays).
+
+No server or database is needed; the payloads are synthetic but have the
+shape of the real routes::
+
+    cd api && python -m benchmarks.bench_serialization --calls 100 --turns 60
+
+- ``GET /calls/rich``: a page of ``--calls`` calls with full transcripts
+- ``GET /analytics/overview``: a month of daily stats, 24 hours, ``--agents`` agents
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.responses import FastJSONResponse, JSONArrayStream
+from app.routes.analytics import AgentPerformance, AnalyticsOverview, DailyStats, HourlyDistribution
+
+WORDS = (
+    "bonjour je voudrais prendre rendez-vous pour une coupe mardi prochain vers quinze heures "
+    "très bien c'est noté votre numéro de téléphone s'il vous plaît merci beaucoup à bientôt "
+    "désolé nous sommes complets jeudi préférez-vous le matin ou l'après-midi"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))).capitalize() + "."
+
+
+def rich_page(calls: int, turns: int, rng: random.Random) -> dict:
+    now = datetime.now(timezone.utc)
+    page = []
+    for _ in range(calls):
+        started = now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        duration = rng.randint(10, 900)
+        transcript = [
+            {"speaker": "agent" if i % 2 == 0 else "caller", "text": _sentence(rng), "timestamp": i * 5}
+            for i in range(turns)
+        ]
+        call_id = str(uuid.uuid4())
+        page.append({
+            "id": call_id,
+            "external_id": call_id,
+            "agent_name": "Agent Accueil",
+            "caller_number": f"+336{rng.randint(10_000_000, 99_999_999)}",
+            "caller_name": None,
+            "direction": "inbound",
+            "status": rng.choice(("completed", "missed", "failed")),
+            "duration_seconds": duration,
+            "started_at": started.isoformat(),
+            "ended_at": (started + timedelta(seconds=duration)).isoformat(),
+            "outcome": None,
+            "sentiment": None,
+            "transcript": transcript,
+            "summary": " ".join(t["text"] for t in transcript),
+            "recording_url": f"https://recordings.example.com/{call_id}.mp3",
+            "tags": [],
+            "cost": round(rng.random(), 4),
+        })
+    return {
+        "calls": page,
+        "total_items": 12_345,
+        "current_page": 1,
+        "total_pages": 124,
+        "per_page": calls,
+        "next_cursor": "MjAyNi0xMC0xN1QwOTowMDowMHwxMjM0",
+    }
+
+
+def overview(agents: int, rng: random.Random) -> AnalyticsOverview:
+    today = datetime.now(timezone.utc).date()
+    return AnalyticsOverview(
+        period="month",
+        total_calls=9_876,
+        completed_calls=8_765,
+        missed_calls=987,
+        failed_calls=124,
+        completion_rate=88.7,
+        avg_duration=142.3,
+        total_cost=1234.56,
+        daily_stats=[
+            DailyStats(
+                date=(today - timedelta(days=d)).isoformat(),
+                total_calls=rng.randint(0, 500),
+                completed_calls=rng.randint(0, 400),
+                missed_calls=rng.randint(0, 100),
+                avg_duration=rng.random() * 300,
+                total_cost=round(rng.random() * 100, 2),
+            )
+            for d in range(31)
+        ],
+        hourly_distribution=[HourlyDistribution(hour=h, call_count=rng.randint(0, 900)) for h in range(24)],
+        agent_performance=[
+            AgentPerformance(
+                agent_id=str(uuid.uuid4()),
+                agent_name=f"Agent {a}",
+                total_calls=rng.randint(0, 900),
+                completed_calls=rng.randint(0, 800),
+                completion_rate=round(rng.random() * 100, 1),
+                avg_duration=round(rng.random() * 300, 1),
+            )
+            for a in range(agents)
+        ],
+    )
+
+
+async def _stream(payload: dict) -> bytes:
+    envelope = {k: v for k, v in payload.items() if k != "calls"}
+    response = JSONArrayStream(envelope, "calls", iter(payload["calls"]))
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+async def _timed(fn, repeat: int) -> tuple[float, int]:
+    timings, size = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        size = len(body)
+    return statistics.median(timings), size
+
+
+async def run(calls: int, turns: int, agents: int, repeat: int) -> None:
+    rng = random.Random(42)
+    page = rich_page(calls, turns, rng)
+    model = overview(agents, rng)
+    route = APIRoute("/analytics/overview", lambda: None, response_model=AnalyticsOverview)
+
+    async def default_page() -> bytes:
+        return JSONResponse(jsonable_encoder(page)).body
+
+    async def fast_page() -> bytes:
+        return FastJSONResponse(page).body
+
+    async def default_overview() -> bytes:
+        return JSONResponse(await serialize_response(field=route.response_field, response_content=model)).body
+
+    async def fast_overview() -> bytes:
+        return FastJSONResponse(model).body
+
+    cases = [
+        (f"GET /calls/rich ({calls} calls, {turns} turns)", [
+            ("jsonable_encoder + json.dumps (before)", default_page),
+            ("FastJSONResponse", fast_page),
+            ("JSONArrayStream (after)", lambda: _stream(page)),
+        ]),
+        (f"GET /analytics/overview ({agents} agents)", [
+            ("response_model + json.dumps (before)", default_overview),
+            ("FastJSONResponse (after)", fast_overview),
+        ]),
+    ]
+    for label, variants in cases:
+        print(label)
+        baseline = None
+        for name, fn in variants:
+            ms, size = await _timed(fn, repeat)
+            baseline = baseline or ms
+            print(f"  {name:40} {ms:8.2f} ms  {size / 1024:8.1f} KiB  x{baseline / ms:5.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=60, help="transcript entries per call")
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.turns, args.agents, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
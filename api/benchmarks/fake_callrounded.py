@@ -0,0 +1,305 @@
+"""
+Local CallRounded API simulator, for benchmarks and offline development.
+
+Serves the read endpoints the app uses, under ``/v1`` like the real API:
+``/agents``, ``/agents/{id}``, ``/calls`` (paged), ``/calls/{id}``,
+``/phone-numbers``, ``/phone-numbers/{id}``, ``/knowledge-bases`` and
+``/knowledge-bases/{id}``. Point the app at it with::
+
+    cd api && python -m benchmarks.fake_callrounded --calls 100000 --latency-ms 80 --error-rate 0.01
+    CALLROUNDED_API_URL=http://localhost:8100/v1 CALLROUNDED_AGENT_ID=<printed agent id> ...
+
+The dataset is synthetic and deterministic: call ``i`` (0 = newest) is
+generated from ``(seed, i)`` on demand, so 1M calls cost no memory and the
+same seed always gives the same calls, spread over ``--days`` days up to
+``--end``. Transcripts are French conversations (bookings, questions,
+cancellations, voicemail), with the system and knowledge base entries the
+app filters out.
+
+Every request waits ``--latency-ms`` ± ``--jitter-ms`` and fails with a 503
+with probability ``--error-rate``; the API key header is required but any
+value is accepted.
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+
+from app.responses import FastJSONResponse
+
+# Id namespaces: the kind and the index are encoded in the UUID, so lookups need no table
+_CALL, _AGENT, _PHONE, _KB = 1, 2, 3, 4
+
+AGENT_NAMES = [
+    "Accueil Salon Élodie", "Cabinet Dr Martin", "Pizzeria Bella Napoli", "Garage Dupuis",
+    "Boutique Lina", "Institut Zen", "Plomberie Leroy", "Restaurant Le Comptoir",
+]
+FIRST_NAMES = ["Camille", "Julien", "Sophie", "Thomas", "Léa", "Nicolas", "Chloé", "Antoine", "Manon", "Hugo"]
+DAYS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi"]
+SERVICES = ["une coupe", "une couleur", "une consultation", "une table pour quatre", "un devis", "un rendez-vous"]
+
+SCENARIOS = [
+    [
+        ("agent", "Bonjour, {agent}, je vous écoute."),
+        ("user", "Bonjour, je voudrais prendre rendez-vous pour {service}, si possible {day}."),
+        ("agent", "Bien sûr. {day_cap}, j'ai des disponibilités à {hour}h ou à {hour2}h. Qu'est-ce qui vous arrange ?"),
+        ("user", "{hour}h, c'est parfait."),
+        ("agent", "C'est noté pour {day} à {hour}h. À quel nom dois-je enregistrer le rendez-vous ?"),
+        ("user", "{name}, s'il vous plaît."),
+        ("agent", "Merci {name}. Vous recevrez un SMS de confirmation. Puis-je vous aider pour autre chose ?"),
+        ("user", "Non, c'est tout, merci beaucoup."),
+        ("agent", "Avec plaisir, bonne journée et à {day} !"),
+    ],
+    [
+        ("agent", "Bonjour, {agent}, que puis-je faire pour vous ?"),
+        ("user", "Bonjour, vous êtes ouverts le {day} après-midi ?"),
+        ("agent", "Oui, nous sommes ouverts le {day} de 9h à 19h sans interruption."),
+        ("user", "Et est-ce qu'il faut réserver pour {service} ?"),
+        ("agent", "C'est conseillé, surtout en fin de semaine. Souhaitez-vous que je vous réserve un créneau ?"),
+        ("user", "Non merci, je rappellerai quand je connaîtrai mes disponibilités."),
+        ("agent", "Très bien, n'hésitez pas. Bonne journée !"),
+    ],
+    [
+        ("agent", "Bonjour, {agent}, je vous écoute."),
+        ("user", "Bonjour, c'est {name}, je dois annuler mon rendez-vous de {day}."),
+        ("agent", "Je m'en occupe. Votre rendez-vous de {day} à {hour}h est bien annulé. Voulez-vous le reporter ?"),
+        ("user", "Oui, plutôt la semaine prochaine, même heure si possible."),
+        ("agent", "J'ai de la place {day} prochain à {hour}h. Je vous l'enregistre ?"),
+        ("user", "Parfait, merci."),
+        ("agent", "C'est fait, {name}. À bientôt !"),
+    ],
+    [
+        ("agent", "Bonjour, {agent}. Nous ne pouvons pas répondre pour le moment, laissez-nous un message."),
+        ("user", "Oui bonjour, c'est {name}, rappelez-moi pour {service}, merci."),
+    ],
+]
+
+
+def _id(kind: int, seed: int, index: int) -> str:
+    return str(uuid.UUID(int=(kind << 120) | ((seed & 0xFFFFFFFF) << 64) | index))
+
+
+def _index(value: str, kind: int, seed: int, count: int) -> int | None:
+    try:
+        n = uuid.UUID(value).int
+    except ValueError:
+        return None
+    index = n & 0xFFFFFFFFFFFFFFFF
+    if n >> 120 != kind or (n >> 64) & 0xFFFFFFFF != seed & 0xFFFFFFFF or index >= count:
+        return None
+    return index
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class Dataset:
+    """Deterministic synthetic CallRounded data; calls are generated on demand."""
+
+    def __init__(self, calls: int, agents: int, seed: int, days: int, end: datetime):
+        self.calls = calls
+        self.agent_count = agents
+        self.seed = seed
+        self.end = end
+        self.spacing = timedelta(days=days) / max(calls, 1)
+        self.agents = [self._agent(a) for a in range(agents)]
+        self.phone_numbers = [self._phone_number(a) for a in range(agents)]
+        self.knowledge_bases = [self._knowledge_base(k) for k in range(max(agents // 2, 1))]
+
+    def _agent(self, a: int) -> dict[str, Any]:
+        name = AGENT_NAMES[a % len(AGENT_NAMES)] + (f" {a // len(AGENT_NAMES) + 1}" if a >= len(AGENT_NAMES) else "")
+        return {
+            "id": _id(_AGENT, self.seed, a),
+            "name": name,
+            "description": f"Assistant téléphonique de {name}",
+            "status": "active",
+            "language": "fr-FR",
+            "voice": "emma",
+            "greeting_message": f"Bonjour, {name}, je vous écoute.",
+            "knowledge_base_id": _id(_KB, self.seed, a // 2),
+        }
+
+    def _phone_number(self, a: int) -> dict[str, Any]:
+        return {
+            "id": _id(_PHONE, self.seed, a),
+            "name": self.agents[a]["name"],
+            "number": f"+3318{random.Random(self.seed * 7919 + a).randint(1_000_000, 9_999_999)}",
+            "inbound_agent_id": self.agents[a]["id"],
+            "inbound_flow_id": None,
+            "is_redirect_enabled": False,
+            "redirect_phone_number": None,
+        }
+
+    def _knowledge_base(self, k: int) -> dict[str, Any]:
+        return {
+            "id": _id(_KB, self.seed, k),
+            "name": f"FAQ {AGENT_NAMES[k % len(AGENT_NAMES)]}",
+            "description": "Horaires, tarifs et prestations",
+            "source_count": 3 + k % 5,
+        }
+
+    def call(self, i: int) -> dict[str, Any]:
+        rng = random.Random(self.seed * 1_000_003 + i)
+        a = rng.randrange(self.agent_count)
+        agent = self.agents[a]
+        started = self.end - self.spacing * (i + rng.random())
+
+        roll = rng.random()
+        status = "completed" if roll < 0.8 else "missed" if roll < 0.92 else "failed"
+        if status == "completed":
+            scenario = rng.choice(SCENARIOS)
+            duration = rng.randint(25, 60) * len(scenario)
+        else:
+            scenario = SCENARIOS[-1] if status == "missed" and rng.random() < 0.5 else []
+            duration = rng.randint(0, 20)
+
+        hour = rng.randint(9, 17)
+        day = rng.choice(DAYS)
+        values = {
+            "agent": agent["name"],
+            "name": rng.choice(FIRST_NAMES),
+            "service": rng.choice(SERVICES),
+            "day": day,
+            "day_cap": day.capitalize(),
+            "hour": hour,
+            "hour2": hour + 1,
+        }
+        transcript = []
+        if scenario:
+            transcript.append({"role": "system", "content": "Tu es l'assistant téléphonique de " + agent["name"] + "."})
+        for n, (role, text) in enumerate(scenario):
+            if n == 2 and rng.random() < 0.3:
+                transcript.append({"role": "tool", "content": "[Knowledge Base] Horaires : lundi-samedi 9h-19h."})
+            transcript.append({"role": role, "content": text.format(**values)})
+
+        call_id = _id(_CALL, self.seed, i)
+        return {
+            "id": call_id,
+            "agent_id": agent["id"],
+            "from_number": f"+336{rng.randint(10_000_000, 99_999_999)}",
+            "to_number": self.phone_numbers[a]["number"],
+            "direction": "inbound",
+            "status": status,
+            "duration_seconds": duration,
+            "cost": round(duration * 0.0025, 4),
+            "start_time": _iso(started),
+            "end_time": _iso(started + timedelta(seconds=duration)),
+            "transcript": transcript,
+            "transcript_string": "\n".join(
+                f"{t['role']}: {t['content']}" for t in transcript if t["role"] in ("agent", "user")
+            ),
+            "recording_url": f"https://recordings.example.com/{call_id}.mp3" if status == "completed" else None,
+            "variable_values": {"customer_name": values["name"]} if status == "completed" else {},
+            "post_call_answers": {"appointment_booked": scenario is SCENARIOS[0]} if status == "completed" else {},
+        }
+
+
+def create_app(dataset: Dataset, latency_ms: float, jitter_ms: float, error_rate: float, seed: int) -> FastAPI:
+    app = FastAPI(title="Fake CallRounded API", docs_url=None, redoc_url=None)
+    chaos = random.Random(seed)
+    stats = {"requests": 0, "errors": 0}
+
+    @app.middleware("http")
+    async def latency_and_errors(request: Request, call_next):
+        stats["requests"] += 1
+        if not request.headers.get("x-api-key"):
+            return JSONResponse({"error": "Missing API key"}, status_code=401)
+        delay = max(0.0, chaos.gauss(latency_ms, jitter_ms)) / 1000 if latency_ms or jitter_ms else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+        if chaos.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": "Service temporarily unavailable"}, status_code=503)
+        return await call_next(request)
+
+    def lookup(items: list[dict[str, Any]], kind: int, item_id: str) -> dict[str, Any]:
+        index = _index(item_id, kind, dataset.seed, len(items))
+        if index is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        return items[index]
+
+    @app.get("/v1/agents")
+    async def list_agents():
+        return FastJSONResponse({"data": dataset.agents})
+
+    @app.get("/v1/agents/{agent_id}")
+    async def get_agent(agent_id: str):
+        return FastJSONResponse({"data": lookup(dataset.agents, _AGENT, agent_id)})
+
+    @app.get("/v1/calls")
+    async def list_calls(limit: int = Query(50, ge=1, le=1000), page: int = Query(1, ge=1)):
+        start = (page - 1) * limit
+        data = [dataset.call(i) for i in range(start, min(start + limit, dataset.calls))]
+        return FastJSONResponse({
+            "data": data,
+            "total_items": dataset.calls,
+            "current_page": page,
+            "total_pages": max(1, (dataset.calls + limit - 1) // limit),
+        })
+
+    @app.get("/v1/calls/{call_id}")
+    async def get_call(call_id: str):
+        index = _index(call_id, _CALL, dataset.seed, dataset.calls)
+        if index is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        return FastJSONResponse({"data": dataset.call(index)})
+
+    @app.get("/v1/phone-numbers")
+    async def list_phone_numbers(limit: int = Query(50, ge=1, le=1000)):
+        return FastJSONResponse({"data": dataset.phone_numbers[:limit]})
+
+    @app.get("/v1/phone-numbers/{phone_id}")
+    async def get_phone_number(phone_id: str):
+        return FastJSONResponse({"data": lookup(dataset.phone_numbers, _PHONE, phone_id)})
+
+    @app.get("/v1/knowledge-bases")
+    async def list_knowledge_bases():
+        return FastJSONResponse({"data": dataset.knowledge_bases})
+
+    @app.get("/v1/knowledge-bases/{kb_id}")
+    async def get_knowledge_base(kb_id: str):
+        return FastJSONResponse({"data": lookup(dataset.knowledge_bases, _KB, kb_id)})
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--calls", type=int, default=10_000, help="calls in the dataset (1k to 1M)")
+    parser.add_argument("--agents", type=int, default=8)
+    parser.add_argument("--days", type=int, default=90, help="calls are spread over this many days")
+    parser.add_argument("--end", help="timestamp of the newest call (ISO 8601, default: now, to the hour)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    end = (
+        datetime.fromisoformat(args.end).astimezone(timezone.utc) if args.end
+        else datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    )
+    dataset = Dataset(args.calls, args.agents, args.seed, args.days, end)
+    print(f"{args.calls:,} calls over {args.days} days up to {end.isoformat()}, agents:")
+    for agent in dataset.agents:
+        print(f"  {agent['id']}  {agent['name']}")
+    app = create_app(dataset, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Load test of the hot read routes: throughput and p50/p95/p99 latency per route,
+at a fixed concurrency, against a running API.
+
+Run the API against the CallRounded simulator (benchmarks/fake_callrounded.py)
+so that results do not depend on the real API, let the call sync fill the
+local store, and turn the rate limiter off (it would answer 429s)::
+
+    cd api && python -m benchmarks.fake_callrounded --calls 100000 --latency-ms 80 &
+    CALLROUNDED_API_URL=http://localhost:8100/v1 RATE_LIMIT_ENABLED=false gunicorn ... &
+    python -m benchmarks.load_test --base-url http://localhost:8200 --concurrency 16 --requests 500 \\
+        --output baseline.json
+
+With ``--baseline baseline.json`` each figure is compared with the saved run,
+which makes it a regression check.
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import Any
+
+import httpx
+
+ROUTES = [
+    ("dashboard stats", "/api/dashboard/stats"),
+    ("calls rich", "/api/calls/rich?limit=50"),
+    ("analytics overview", "/api/analytics/overview?period=month"),
+    ("analytics trends", "/api/analytics/trends?days=30"),
+    ("analytics peak hours", "/api/analytics/peak-hours?days=30"),
+    ("phone numbers", "/api/phone-numbers"),
+]
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return 0.0
+    rank = max(1, min(len(values), math.ceil(p / 100 * len(values))))
+    return values[rank - 1]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> None:
+    resp = await client.post("/api/auth/login", json={"email": email, "password": password})
+    resp.raise_for_status()
+    # The cookie is Secure: send it by hand, the test usually runs over plain HTTP
+    client.headers["Cookie"] = f"access_token={resp.cookies['access_token']}"
+
+
+async def drive(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> dict[str, Any]:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                resp = await client.get(path)
+                await resp.aread()
+                code = resp.status_code
+            except httpx.HTTPError:
+                code = 0
+            elapsed = (time.perf_counter() - started) * 1000
+            statuses[code] = statuses.get(code, 0) + 1
+            if code == 200:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": requests - len(latencies),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "rps": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def _delta(value: float, before: float | None, lower_is_better: bool = True) -> str:
+    if not before:
+        return ""
+    change = (value - before) / before * 100
+    worse = change > 0 if lower_is_better else change < 0
+    return f" ({change:+.0f}%{'!' if worse and abs(change) >= 10 else ''})"
+
+
+async def run(args: argparse.Namespace) -> None:
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["routes"]
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        results = {}
+        for label, path in ROUTES:
+            if args.only and not any(name in label for name in args.only):
+                continue
+            await login(client, args.email, args.password)  # a fresh token for each route (15 min lifetime)
+            await drive(client, path, args.warmup, args.concurrency)
+            results[label] = {"path": path, **await drive(client, path, args.requests, args.concurrency)}
+
+    print(f"{args.requests} requests per route, concurrency {args.concurrency}\n")
+    print(f"{'route':22} {'req/s':>14} {'p50 ms':>15} {'p95 ms':>15} {'p99 ms':>15}  errors")
+    for label, r in results.items():
+        before = baseline.get(label, {})
+        print(
+            f"{label:22} {r['rps']:8.1f}{_delta(r['rps'], before.get('rps'), lower_is_better=False):>6} "
+            f"{r['p50_ms']:8.1f}{_delta(r['p50_ms'], before.get('p50_ms')):>7} "
+            f"{r['p95_ms']:8.1f}{_delta(r['p95_ms'], before.get('p95_ms')):>7} "
+            f"{r['p99_ms']:8.1f}{_delta(r['p99_ms'], before.get('p99_ms')):>7}  "
+            f"{r['errors']} {r['statuses'] if r['errors'] else ''}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"concurrency": args.concurrency, "requests": args.requests, "routes": results}, f, indent=2
+            )
+        print(f"\nSaved to {args.output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8200")
+    parser.add_argument("--email", default="admin@wi-agency.fr")
+    parser.add_argument("--password", default="Admin2026!")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per route first")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--only", nargs="*", help="run the routes whose label contains one of these words")
+    parser.add_argument("--output", help="save the results (JSON) as a baseline")
+    parser.add_argument("--baseline", help="compare with a saved run")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
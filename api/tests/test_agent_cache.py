@@ -0,0 +1,111 @@
+"""
+Tests for the agent metadata cache refresh (app/services/agent_cache.py)
+
+No database and no CallRounded: the shared backend is a second in-memory
+LRU and ``fetch_agent`` is replaced by an in-test stand-in.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import agent_cache
+from app.services.agent_cache import AgentCacheService, CacheEntry, MemoryBackend
+
+AGENT = {"id": "agent-1", "name": "Accueil"}
+
+
+class _Upstream:
+    """Stands for ``callrounded.fetch_agent``: answers ``result`` (raised if an exception)."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    async def __call__(self, agent_id):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    upstream = _Upstream(AGENT)
+    monkeypatch.setattr(agent_cache.cr, "fetch_agent", upstream)
+    return upstream
+
+
+async def _service(entry: CacheEntry | None = None) -> tuple[AgentCacheService, MemoryBackend]:
+    shared = MemoryBackend(10)
+    service = AgentCacheService(backend=shared, ttl=60, stale_ttl=3600)
+    if entry is not None:
+        await service._local.set("agent-1", entry)
+        await shared.set("agent-1", entry)
+    return service, shared
+
+
+async def _settle(service: AgentCacheService) -> None:
+    """Wait for the background refreshes started so far."""
+    await asyncio.gather(*list(service._inflight.values()))
+
+
+class TestRefresh:
+    """Stale-while-revalidate against upstream errors and 404s"""
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_refreshed(self, upstream):
+        service, shared = await _service(CacheEntry({"id": "agent-1", "name": "Ancien"}, time.time() - 120))
+        assert (await service.get("agent-1"))["name"] == "Ancien"
+        await _settle(service)
+        assert (await service._local.get("agent-1")).value == AGENT
+        assert (await shared.get("agent-1")).value == AGENT
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_the_stale_value(self, upstream):
+        stale = CacheEntry(AGENT, time.time() - 120)
+        service, shared = await _service(stale)
+        upstream.result = httpx.ConnectError("connection refused")
+
+        assert await service.get("agent-1") == AGENT
+        await _settle(service)
+        assert await service._local.get("agent-1") is stale
+        assert await shared.get("agent-1") is stale
+        assert await service.get("agent-1") == AGENT
+        assert service.errors == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_is_retried_later_not_on_every_request(self, upstream):
+        service, _ = await _service(CacheEntry(AGENT, time.time() - 120))
+        upstream.result = httpx.ConnectError("connection refused")
+        await service.get("agent-1")
+        await _settle(service)
+        await service.get("agent-1")
+        await _settle(service)
+        assert upstream.calls == 1
+
+        service._retry_at["agent-1"] = time.time() - 1  # _RETRY_AFTER elapsed
+        upstream.result = AGENT
+        await service.get("agent-1")
+        await _settle(service)
+        assert upstream.calls == 2
+        assert service._retry_at == {}
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached_as_a_miss(self, upstream):
+        service, shared = await _service(CacheEntry(AGENT, time.time() - 120))
+        upstream.result = None
+        await service.get("agent-1")
+        await _settle(service)
+        assert (await shared.get("agent-1")).value is None
+        assert await service.get("agent-1") is None
+        assert upstream.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_error_without_entry_caches_nothing(self, upstream):
+        service, shared = await _service()
+        upstream.result = httpx.ConnectError("connection refused")
+        assert await service.get("agent-1") is None
+        assert await service._local.get("agent-1") is None
+        assert await shared.get("agent-1") is None
@@ -0,0 +1,67 @@
+"""
+Tests for AgentScope (app/services/principals.py)
+
+Pure logic, no database: membership, filtering and the SQL condition,
+compiled for PostgreSQL.
+"""
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.models import CallCache
+from app.services.principals import ALL_AGENTS, AgentScope
+
+
+def _compiled(clause):
+    return clause.compile(dialect=postgresql.dialect())
+
+
+class TestMembership:
+    """``in`` and filter()"""
+
+    def test_unrestricted_scope_contains_every_agent(self):
+        assert ALL_AGENTS.unrestricted
+        assert "any-agent" in ALL_AGENTS
+        assert None in ALL_AGENTS
+
+    def test_fixed_scope_contains_its_agents_only(self):
+        scope = AgentScope(["agent-a", "agent-b"])
+        assert not scope.unrestricted
+        assert "agent-a" in scope
+        assert "agent-c" not in scope
+        assert None not in scope
+
+    def test_empty_scope_contains_nothing(self):
+        scope = AgentScope([])
+        assert not scope.unrestricted
+        assert "agent-a" not in scope
+
+    def test_filter(self):
+        items = [SimpleNamespace(agent="agent-a"), SimpleNamespace(agent="agent-c"), SimpleNamespace(agent=None)]
+        assert AgentScope(["agent-a"]).filter(items, key=lambda i: i.agent) == items[:1]
+        assert ALL_AGENTS.filter(iter(items), key=lambda i: i.agent) == items
+
+    def test_repr_does_not_list_the_agents(self):
+        assert repr(ALL_AGENTS) == "AgentScope(all)"
+        assert repr(AgentScope(["agent-a", "agent-b"])) == "AgentScope(2 agents)"
+
+
+class TestClause:
+    """clause() — the scope as a WHERE condition"""
+
+    def test_unrestricted_scope_is_true(self):
+        assert str(_compiled(ALL_AGENTS.clause(CallCache.agent_external_id))) == "true"
+
+    def test_empty_scope_is_false(self):
+        assert str(_compiled(AgentScope([]).clause(CallCache.agent_external_id))) == "false"
+
+    def test_fixed_scope_is_one_sorted_array_parameter(self):
+        compiled = _compiled(AgentScope(["agent-b", "agent-a"]).clause(CallCache.agent_external_id))
+        sql = str(compiled)
+        assert "calls_cache.agent_external_id = ANY (" in sql
+        assert list(compiled.params.values()) == [["agent-a", "agent-b"]]
+
+    def test_statement_text_does_not_depend_on_the_number_of_agents(self):
+        small = str(_compiled(AgentScope(["agent-a"]).clause(CallCache.agent_external_id)))
+        large = str(_compiled(AgentScope([f"agent-{i}" for i in range(100)]).clause(CallCache.agent_external_id)))
+        assert small == large
@@ -0,0 +1,137 @@
+"""
+Tests for the alert engine windows (app/services/alert_engine.py)
+
+Pure logic, no database: sliding window totals, rule refresh and the
+buffering of call events while a tenant is re-seeded.
+"""
+import json
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import alert_engine
+from app.services.alert_engine import SlidingWindow, _minute
+
+
+TENANT = str(uuid.uuid4())
+
+
+@pytest.fixture(autouse=True)
+def clean_engine_state():
+    """Each test starts with no rules, windows or pending seeds."""
+    yield
+    alert_engine._rules.clear()
+    alert_engine._by_tenant.clear()
+    alert_engine._last_call.clear()
+    alert_engine._dirty.clear()
+    alert_engine._seeding.clear()
+
+
+def _rule_row(rule_id=None, rule_type="missed_calls", conditions=None):
+    return SimpleNamespace(
+        id=rule_id or uuid.uuid4(),
+        tenant_id=uuid.UUID(TENANT),
+        name="Rule",
+        rule_type=rule_type,
+        conditions=json.dumps(conditions or {"period_minutes": 10, "threshold": 2}),
+        cooldown_minutes=30,
+    )
+
+
+def _call_event(started: datetime, **delta):
+    return {
+        "kind": "call",
+        "tenant_id": TENANT,
+        "data": {"id": "call-1", "start_time": started.isoformat(), "delta": delta},
+    }
+
+
+class TestSlidingWindow:
+    """Running totals over the last ``span`` minutes."""
+
+    def test_add_accumulates_per_minute_and_in_totals(self):
+        window = SlidingWindow(10)
+        window.add(100, [1, 1, 0, 0.5], now_minute=105)
+        window.add(100, [1, 0, 1, 0.25], now_minute=105)
+        window.add(103, [1, 0, 1, 0.0], now_minute=105)
+        assert window.totals == [3, 1, 2, 0.75]
+        assert len(window) == 2
+
+    def test_add_outside_window_is_ignored(self):
+        window = SlidingWindow(10)
+        window.add(95, [1, 0, 1, 1.0], now_minute=105)
+        assert window.totals == [0, 0, 0, 0.0]
+        assert len(window) == 0
+
+    def test_out_of_order_minutes_stay_sorted(self):
+        window = SlidingWindow(10)
+        for minute in (104, 98, 101):
+            window.add(minute, [1, 0, 0, 0.0], now_minute=105)
+        window.expire(109)  # cutoff 99: only minute 98 leaves
+        assert window.totals[0] == 2
+        assert len(window) == 2
+
+    def test_expire_drops_old_minutes_from_totals(self):
+        window = SlidingWindow(10)
+        window.add(100, [2, 1, 1, 1.5], now_minute=100)
+        window.add(105, [1, 1, 0, 0.5], now_minute=105)
+        window.expire(110)
+        assert window.totals == [1, 1, 0, 0.5]
+        window.expire(115)
+        assert window.totals == [0, 0, 0, 0.0]
+        assert len(window) == 0
+
+
+class TestRuleRefresh:
+    """Windows survive a refresh unless the rule changed."""
+
+    def test_new_rule_is_seeded(self):
+        assert alert_engine._refresh_rules([_rule_row()]) == {TENANT}
+
+    def test_unchanged_rule_keeps_its_window(self):
+        row = _rule_row()
+        alert_engine._refresh_rules([row])
+        window = alert_engine._rules[row.id].window = SlidingWindow(10)
+        assert alert_engine._refresh_rules([row]) == set()
+        assert alert_engine._rules[row.id].window is window
+
+    def test_modified_rule_is_replaced_and_seeded(self):
+        row = _rule_row()
+        alert_engine._refresh_rules([row])
+        alert_engine._rules[row.id].window = SlidingWindow(10)
+        changed = _rule_row(row.id, conditions={"period_minutes": 30, "threshold": 2})
+        assert alert_engine._refresh_rules([changed]) == {TENANT}
+        assert alert_engine._rules[row.id].window is None
+        assert alert_engine._rules[row.id].span == 30
+
+
+class TestOnEvent:
+    """Call events update the windows; resyncs mark tenants for a seed."""
+
+    def test_call_event_updates_windows_and_last_call(self):
+        row = _rule_row()
+        alert_engine._refresh_rules([row])
+        alert_engine._rules[row.id].window = SlidingWindow(10)
+        now = datetime.now(timezone.utc)
+        alert_engine.on_event(_call_event(now, total_calls=1, missed_calls=1))
+        assert alert_engine._rules[row.id].window.totals == [1, 0, 1, 0.0]
+        assert alert_engine._last_call[TENANT] == now
+
+    def test_event_without_change_is_ignored(self):
+        row = _rule_row()
+        alert_engine._refresh_rules([row])
+        alert_engine._rules[row.id].window = SlidingWindow(10)
+        alert_engine.on_event(_call_event(datetime.now(timezone.utc)))
+        assert len(alert_engine._rules[row.id].window) == 0
+
+    def test_events_during_seed_are_buffered(self):
+        alert_engine._seeding[TENANT] = []
+        now = datetime.now(timezone.utc)
+        alert_engine.on_event(_call_event(now, total_calls=1, completed_calls=1, total_cost=0.4))
+        assert alert_engine._seeding[TENANT] == [(_minute(now), [1, 1, 0, 0.4])]
+
+    def test_resync_marks_tenant_dirty(self):
+        alert_engine.on_event({"kind": "resync", "tenant_id": TENANT, "data": {}})
+        assert TENANT in alert_engine._dirty
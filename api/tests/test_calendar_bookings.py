@@ -0,0 +1,95 @@
+"""
+Tests for the appointments booked during a call (app/routes/calendar.py)
+
+No database and no Google: the integration, the token refresh and the
+Calendar API are in-test stand-ins.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.routes import calendar
+from app.routes.calendar import BOOKING_HORIZON, events_booked_between
+
+TENANT = uuid.uuid4()
+START = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+END = START + timedelta(minutes=10)
+
+
+def _event(event_id: str, created: datetime) -> dict:
+    return {
+        "id": event_id,
+        "summary": "Rendez-vous",
+        "created": created.isoformat().replace("+00:00", "Z"),
+        "start": {"dateTime": (START + timedelta(days=3)).isoformat()},
+        "end": {"dateTime": (START + timedelta(days=3, hours=1)).isoformat()},
+    }
+
+
+class _Result:
+    def scalar_one_or_none(self):
+        return SimpleNamespace(calendar_id="primary")
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        return _Result()
+
+
+@pytest.fixture
+def google(monkeypatch):
+    """Pages answered in order by the Calendar API, and the requests it got."""
+    google = {"responses": [], "requests": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        google["requests"].append(request)
+        return google["responses"].pop(0)
+
+    async def refresh_access_token(integration, db):
+        return "token"
+
+    monkeypatch.setattr(calendar, "async_session", _Session)
+    monkeypatch.setattr(calendar, "refresh_access_token", refresh_access_token)
+    monkeypatch.setattr(calendar.metrics, "transport", lambda name: httpx.MockTransport(handler))
+    return google
+
+
+class TestEventsBookedBetween:
+    """events_booked_between — a bounded time window, filtered on creation"""
+
+    @pytest.mark.asyncio
+    async def test_query_is_a_bounded_window_without_deleted_events(self, google):
+        google["responses"].append(httpx.Response(200, json={"items": []}))
+        await events_booked_between(TENANT, START, END)
+        params = google["requests"][0].url.params
+        assert "updatedMin" not in params
+        assert datetime.fromisoformat(params["timeMin"]) == START
+        assert datetime.fromisoformat(params["timeMax"]) == END + BOOKING_HORIZON
+        assert params["showDeleted"] == "false"
+
+    @pytest.mark.asyncio
+    async def test_only_events_created_during_the_call_are_kept(self, google):
+        google["responses"] += [
+            httpx.Response(200, json={
+                "items": [_event("before", START - timedelta(days=1)), _event("during", START + timedelta(minutes=5))],
+                "nextPageToken": "page-2",
+            }),
+            httpx.Response(200, json={"items": [_event("after", END + timedelta(hours=1))]}),
+        ]
+        events = await events_booked_between(TENANT, START, END)
+        assert [e.id for e in events] == ["during"]
+        assert google["requests"][1].url.params["pageToken"] == "page-2"
+
+    @pytest.mark.asyncio
+    async def test_gone_is_no_data(self, google):
+        google["responses"].append(httpx.Response(410, json={"error": {"message": "Gone"}}))
+        assert await events_booked_between(TENANT, START, END) == []
@@ -0,0 +1,80 @@
+"""
+Tests for the call detail lookup (app/services/call_details.py)
+
+No database and no CallRounded: the stored row and the upstream call are
+in-test stand-ins.
+"""
+import uuid
+
+import pytest
+
+from app.services import call_details
+
+TENANT = uuid.uuid4()
+FINISHED = {"id": "call-1", "status": "completed", "transcript": "Bonjour"}
+IN_PROGRESS = {"id": "call-1", "status": "in-progress"}
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """``{"stored": ..., "upstream": ...}`` answered to get_call, with the upstream requests counted."""
+    sources = {"stored": None, "upstream": None, "requests": 0}
+
+    async def get_stored_call(db, tenant_id, call_id):
+        assert tenant_id == TENANT
+        return sources["stored"]
+
+    async def get_call(call_id):
+        sources["requests"] += 1
+        return sources["upstream"]
+
+    monkeypatch.setattr(call_details, "async_session", _Session)
+    monkeypatch.setattr(call_details.call_store, "get_stored_call", get_stored_call)
+    monkeypatch.setattr(call_details.cr, "get_call", get_call)
+    return sources
+
+
+class TestGetCall:
+    """get_call — the stored row for finished calls, CallRounded otherwise"""
+
+    @pytest.mark.asyncio
+    async def test_finished_call_is_served_from_the_table(self, sources):
+        sources["stored"] = FINISHED
+        assert await call_details.get_call(TENANT, "call-1") == FINISHED
+        assert sources["requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unstored_call_is_fetched(self, sources):
+        sources["upstream"] = FINISHED
+        assert await call_details.get_call(TENANT, "call-1") == FINISHED
+        assert sources["requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unfinished_call_is_fetched(self, sources):
+        sources["stored"] = IN_PROGRESS
+        sources["upstream"] = FINISHED
+        assert await call_details.get_call(TENANT, "call-1") == FINISHED
+        assert sources["requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_completed_without_transcript_is_fetched(self, sources):
+        sources["stored"] = {"id": "call-1", "status": "completed"}
+        sources["upstream"] = FINISHED
+        assert await call_details.get_call(TENANT, "call-1") == FINISHED
+
+    @pytest.mark.asyncio
+    async def test_upstream_failure_falls_back_to_the_stored_state(self, sources):
+        sources["stored"] = IN_PROGRESS
+        assert await call_details.get_call(TENANT, "call-1") == IN_PROGRESS
+
+    @pytest.mark.asyncio
+    async def test_unknown_call(self, sources):
+        assert await call_details.get_call(TENANT, "call-1") is None
@@ -0,0 +1,36 @@
+"""
+Tests for the CSV cells of the call export (app/services/call_export.py)
+
+Pure logic, no database.
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.call_export import _csv_value
+
+
+class TestCsvValue:
+    """_csv_value — dates as ISO strings, formulas neutralised"""
+
+    @pytest.mark.parametrize("value", [
+        "=HYPERLINK(\"http://evil.example\",\"clic\")",
+        "+33612345678",
+        "-1+2",
+        "@SUM(A1:A2)",
+        "\t=1+1",
+        "\r=1+1",
+    ])
+    def test_formula_prefixes_are_quoted(self, value: str):
+        assert _csv_value(value) == "'" + value
+
+    def test_plain_text_is_unchanged(self):
+        assert _csv_value("Bonjour, je voudrais un rendez-vous") == "Bonjour, je voudrais un rendez-vous"
+        assert _csv_value("") == ""
+
+    def test_non_strings_are_unchanged(self):
+        assert _csv_value(-1.5) == -1.5
+        assert _csv_value(None) is None
+
+    def test_datetime(self):
+        assert _csv_value(datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)) == "2026-03-02T09:00:00+00:00"
@@ -0,0 +1,74 @@
+"""
+Tests for the keyset pagination cursors (app/services/call_store.py)
+
+Pure logic, no database: cursor round trip, malformed cursors, and the 400
+they get on the call list before any query runs.
+"""
+import base64
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.routes.calls import _calls_page
+from app.services import call_store
+from app.services.principals import ALL_AGENTS
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _call(started_at: datetime) -> SimpleNamespace:
+    return SimpleNamespace(started_at=started_at, id=uuid.uuid4())
+
+
+class TestCursor:
+    """encode_cursor / decode_cursor"""
+
+    def test_round_trip(self):
+        call = _call(datetime(2026, 10, 17, 9, 30, 15, 123456, tzinfo=timezone.utc))
+        cursor = call_store.encode_cursor(call)
+        assert call_store.decode_cursor(cursor) == (call.started_at, call.id)
+
+    def test_round_trip_keeps_the_offset(self):
+        started_at = datetime.fromisoformat("2026-10-17T11:30:15+02:00")
+        started, _ = call_store.decode_cursor(call_store.encode_cursor(_call(started_at)))
+        assert started == started_at and started.utcoffset() == started_at.utcoffset()
+
+    def test_cursor_is_url_safe(self):
+        for _ in range(20):
+            cursor = call_store.encode_cursor(_call(datetime.now(timezone.utc)))
+            assert not set(cursor) & set("+/=")
+
+    @pytest.mark.parametrize("cursor", [
+        "",
+        "a",
+        "!!!",
+        "not-a-cursor",
+        _b64(b"2026-10-17T09:00:00+00:00"),
+        _b64(b"yesterday|" + str(uuid.uuid4()).encode()),
+        _b64(b"2026-10-17T09:00:00+00:00|not-a-uuid"),
+        _b64(b"\xff\xfe|\xff"),
+    ])
+    def test_malformed_cursor_raises_value_error(self, cursor: str):
+        with pytest.raises(ValueError):
+            call_store.decode_cursor(cursor)
+
+
+class TestInvalidCursorRequests:
+    """A malformed cursor is refused before the database is queried."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_raises_value_error(self):
+        query = call_store.filtered_calls(uuid.uuid4(), ALL_AGENTS)
+        with pytest.raises(ValueError):
+            await call_store.fetch_page(None, query, 20, cursor="not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_call_list_answers_400(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await _calls_page(None, uuid.uuid4(), ALL_AGENTS, 20, 1, "not-a-cursor", None, None, None, None)
+        assert exc_info.value.status_code == 400
@@ -0,0 +1,111 @@
+"""
+Tests for the call reconciliation checkpoint (app/services/call_sync.py)
+
+No database and no CallRounded: the sessions, the checkpoint storage, the
+ingestion and ``fetch_calls`` are replaced by in-test stand-ins, and the
+tests check when the checkpoint moves.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.services import call_sync
+
+CHECKPOINT = datetime(2026, 10, 17, 8, 0, tzinfo=timezone.utc)
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+
+def _call(started: datetime) -> dict:
+    return {"id": str(uuid.uuid4()), "start_time": started.isoformat(), "status": "completed"}
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    """Checkpoints written by the run under test."""
+    saved = []
+
+    async def target_tenant_ids(db):
+        return [uuid.uuid4()]
+
+    async def checkpoint(db):
+        return CHECKPOINT
+
+    async def save_checkpoint(db, synced_at):
+        saved.append(synced_at)
+
+    async def ingest_calls(db, tenant_ids, calls):
+        return len(calls)
+
+    monkeypatch.setattr(call_sync, "async_session", _Session)
+    monkeypatch.setattr(call_sync.call_store, "target_tenant_ids", target_tenant_ids)
+    monkeypatch.setattr(call_sync, "_checkpoint", checkpoint)
+    monkeypatch.setattr(call_sync, "_save_checkpoint", save_checkpoint)
+    monkeypatch.setattr(call_sync.call_ingest, "ingest_calls", ingest_calls)
+    monkeypatch.setattr(call_sync.settings, "CALL_SYNC_PAGE_SIZE", 2)
+    return saved
+
+
+def _pages(monkeypatch, *pages):
+    """``fetch_calls`` answers ``pages`` in turn; an exception in the list is raised."""
+    answers = list(pages)
+
+    async def fetch_calls(limit, page):
+        answer = answers[page - 1]
+        if isinstance(answer, Exception):
+            raise answer
+        return {"data": answer}
+
+    monkeypatch.setattr(call_sync.cr, "fetch_calls", fetch_calls)
+
+
+class TestCheckpoint:
+    """The checkpoint only moves after a run that read every page it needed"""
+
+    @pytest.mark.asyncio
+    async def test_upstream_failure_keeps_the_checkpoint(self, saved, monkeypatch):
+        _pages(monkeypatch, httpx.ConnectError("connection refused"))
+        result = await call_sync._sync_pages(full=False)
+        assert saved == []
+        assert result["status"] == "error"
+        assert "connection refused" in result["reason"]
+
+    @pytest.mark.asyncio
+    async def test_failure_after_some_pages_keeps_the_checkpoint(self, saved, monkeypatch):
+        recent = datetime.now(timezone.utc)
+        _pages(monkeypatch, [_call(recent), _call(recent)], RuntimeError("HTTP 503"))
+        result = await call_sync._sync_pages(full=False)
+        assert saved == []
+        assert result["status"] == "error"
+        assert result["written"] == 2
+
+    @pytest.mark.asyncio
+    async def test_run_reaching_the_cutoff_moves_it(self, saved, monkeypatch):
+        old = CHECKPOINT - timedelta(days=1)
+        _pages(monkeypatch, [_call(datetime.now(timezone.utc)), _call(old)])
+        result = await call_sync._sync_pages(full=False)
+        assert result["status"] == "ok"
+        assert len(saved) == 1 and saved[0] > CHECKPOINT
+
+    @pytest.mark.asyncio
+    async def test_run_reaching_the_last_page_moves_it(self, saved, monkeypatch):
+        _pages(monkeypatch, [_call(datetime.now(timezone.utc))])
+        assert (await call_sync._sync_pages(full=True))["status"] == "ok"
+        assert len(saved) == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_account_moves_it(self, saved, monkeypatch):
+        _pages(monkeypatch, [])
+        assert (await call_sync._sync_pages(full=False))["status"] == "ok"
+        assert len(saved) == 1
@@ -0,0 +1,81 @@
+"""
+Tests for content negotiation in the compression middleware (app/middleware/compression.py)
+
+Pure logic, no database. brotli is optional: the expectations follow
+``ENCODINGS`` (``("br", "gzip")`` with the module, ``("gzip",)`` without).
+"""
+import gzip
+
+import pytest
+
+from app.middleware import compression
+from app.middleware.compression import ENCODINGS, _strip_suffixes, _suffixed, compress, negotiate
+
+BROTLI = "br" in ENCODINGS
+
+
+class TestNegotiate:
+    """negotiate — preferred encoding accepted with q > 0"""
+
+    def test_browser_default(self):
+        assert negotiate("gzip, deflate, br, zstd") == ENCODINGS[0]
+
+    def test_gzip_only(self):
+        assert negotiate("gzip") == "gzip"
+
+    @pytest.mark.skipif(not BROTLI, reason="brotli not installed")
+    def test_brotli_only(self):
+        assert negotiate("br") == "br"
+
+    def test_nothing_we_offer(self):
+        assert negotiate("deflate, zstd") is None
+        assert negotiate("") is None
+        assert negotiate("identity") is None
+
+    def test_q_zero_refuses_an_encoding(self):
+        assert negotiate("br;q=0, gzip") == "gzip"
+        assert negotiate("gzip;q=0") is None
+
+    def test_server_preference_wins_over_q_values(self):
+        assert negotiate("gzip;q=1.0, br;q=0.5") == ENCODINGS[0]
+
+    def test_wildcard(self):
+        assert negotiate("*") == ENCODINGS[0]
+        assert negotiate("*;q=0") is None
+        assert negotiate("gzip;q=0, *") == ("br" if BROTLI else None)
+
+    def test_case_spaces_and_malformed_q(self):
+        assert negotiate(" GZIP ; q=0.8 ") == "gzip"
+        assert negotiate("gzip;q=abc") is None
+
+
+class TestEtagSuffixes:
+    """A compressed body is another representation: its ETag gets a suffix"""
+
+    def test_suffixed(self):
+        assert _suffixed('"abc"', "gzip") == '"abc-gzip"'
+        assert _suffixed('W/"abc"', "br") == 'W/"abc-br"'
+        assert _suffixed("unquoted", "gzip") == "unquoted"
+
+    def test_strip_suffixes(self):
+        assert _strip_suffixes('"abc-gzip"') == ('"abc"', "gzip")
+        assert _strip_suffixes('"abc-br", "xyz"') == ('"abc", "xyz"', "br")
+        assert _strip_suffixes('"abc"') == ('"abc"', None)
+
+    def test_round_trip(self):
+        for encoding in ENCODINGS:
+            assert _strip_suffixes(_suffixed('"abc"', encoding)) == ('"abc"', encoding)
+
+
+class TestCompress:
+    """compress — complete bodies"""
+
+    def test_gzip_is_deterministic_and_readable(self):
+        body = b'{"calls": []}' * 100
+        assert compress(body, "gzip") == compress(body, "gzip")
+        assert gzip.decompress(compress(body, "gzip")) == body
+
+    @pytest.mark.skipif(not BROTLI, reason="brotli not installed")
+    def test_brotli_is_readable(self):
+        body = b'{"calls": []}' * 100
+        assert compression.brotli.decompress(compress(body, "br")) == body
@@ -0,0 +1,178 @@
+"""
+Tests for the authenticated principal cache (app/services/principals.py)
+
+Pure logic, no database: ``load`` is replaced by a counting loader, and
+``bump`` runs against a session that records its statements.
+"""
+import json
+import time
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.services import principals
+from app.services.principals import Principal
+
+
+TENANT = uuid.uuid4()
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    """Each test starts with an empty cache and no known versions."""
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 60)
+    principals._cache.clear()
+    principals._versions.clear()
+    yield
+    principals._cache.clear()
+    principals._versions.clear()
+
+
+def _principal(version: int = 0, user_id: uuid.UUID | None = None, tenant_id: uuid.UUID = TENANT) -> Principal:
+    return Principal(
+        id=user_id or uuid.uuid4(),
+        tenant_id=tenant_id,
+        email="user@test.callrounded.com",
+        role="USER",
+        agent_ids=frozenset({"agent-1"}),
+        tenant_name="Test",
+        tenant_display_name=None,
+        agent_enabled=True,
+        auth_version=version,
+    )
+
+
+class _Loader:
+    """Stands for ``principals.load``: returns ``principal`` and counts the calls."""
+
+    def __init__(self, principal: Principal | None):
+        self.principal = principal
+        self.calls = 0
+
+    async def __call__(self, db, user_id):
+        self.calls += 1
+        return self.principal
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    loader = _Loader(_principal())
+    monkeypatch.setattr(principals, "load", loader)
+    return loader
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one(self):
+        return self.value
+
+
+class _RecordingSession:
+    """Answers every statement with ``value`` and keeps ``(statement, params)``."""
+
+    def __init__(self, value):
+        self.value = value
+        self.executed = []
+
+    async def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+        return _Result(self.value)
+
+
+class TestCacheKey:
+    """Entries are keyed by (user_id, jti)."""
+
+    @pytest.mark.asyncio
+    async def test_same_token_is_served_from_cache(self, loader):
+        user_id = loader.principal.id
+        first = await principals.get(None, user_id, "jti-1")
+        second = await principals.get(None, user_id, "jti-1")
+        assert first is second is loader.principal
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_another_token_of_the_same_user_is_loaded(self, loader):
+        user_id = loader.principal.id
+        await principals.get(None, user_id, "jti-1")
+        await principals.get(None, user_id, "jti-2")
+        assert loader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_entry_never_outlives_the_token(self, loader):
+        user_id = loader.principal.id
+        await principals.get(None, user_id, "jti-1", expires_at=time.time() - 1)
+        await principals.get(None, user_id, "jti-1", expires_at=time.time() - 1)
+        assert loader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_zero_disables_the_cache(self, loader, monkeypatch):
+        monkeypatch.setattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 0)
+        user_id = loader.principal.id
+        await principals.get(None, user_id, "jti-1")
+        await principals.get(None, user_id, "jti-1")
+        assert loader.calls == 2
+        assert principals._cache == {}
+
+    @pytest.mark.asyncio
+    async def test_unknown_or_inactive_user_is_not_cached(self, monkeypatch):
+        loader = _Loader(None)
+        monkeypatch.setattr(principals, "load", loader)
+        assert await principals.get(None, uuid.uuid4(), "jti-1") is None
+        assert principals._cache == {}
+
+
+class TestVersions:
+    """A change of the tenant (auth_version) refuses older principals."""
+
+    @pytest.mark.asyncio
+    async def test_newer_version_evicts_cached_principals(self, loader):
+        user_id = loader.principal.id
+        await principals.get(None, user_id, "jti-1")
+        principals.invalidate(TENANT, version=1)
+        loader.principal = _principal(version=1, user_id=user_id)
+        assert (await principals.get(None, user_id, "jti-1")).auth_version == 1
+        assert loader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_principal_read_before_the_change_is_not_cached(self, loader):
+        principals.invalidate(TENANT, version=3)
+        await principals.get(None, loader.principal.id, "jti-1")
+        assert principals._cache == {}
+
+    @pytest.mark.asyncio
+    async def test_other_tenants_keep_their_entries(self, loader):
+        await principals.get(None, loader.principal.id, "jti-1")
+        principals.invalidate(uuid.uuid4(), version=5)
+        await principals.get(None, loader.principal.id, "jti-1")
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_bump_increments_invalidates_and_broadcasts(self, loader):
+        await principals.get(None, loader.principal.id, "jti-1")
+        session = _RecordingSession(4)
+        assert await principals.bump(session, TENANT) == 4
+        assert principals._versions[str(TENANT)] == 4
+        assert principals._cache == {}
+
+        statement, params = session.executed[-1]
+        assert "pg_notify" in str(statement)
+        message = json.loads(params["payload"])
+        assert message["kind"] == "auth"
+        assert message["tenant_id"] == str(TENANT)
+        assert message["data"] == {"version": 4}
+
+    @pytest.mark.asyncio
+    async def test_auth_event_from_another_worker(self, loader):
+        await principals.get(None, loader.principal.id, "jti-1")
+        principals._on_event({"kind": "auth", "tenant_id": str(TENANT), "data": {"version": 2}})
+        assert principals._versions[str(TENANT)] == 2
+        assert principals._cache == {}
+
+    @pytest.mark.asyncio
+    async def test_global_resync_clears_every_tenant(self, loader):
+        await principals.get(None, loader.principal.id, "jti-1")
+        principals._on_event({"kind": "resync", "tenant_id": None, "data": {}})
+        assert principals._cache == {}
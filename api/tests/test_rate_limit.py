@@ -0,0 +1,101 @@
+"""
+Tests for the rate limiter's pure logic (app/middleware/rate_limit.py)
+
+No database: route costs, client address behind trusted proxies and the
+bucket key of a request.
+"""
+import ipaddress
+
+import pytest
+
+from app.auth import create_access_token, create_refresh_token
+from app.middleware.rate_limit import ROUTE_COSTS, RateLimitMiddleware, client_ip, route_cost
+
+PROXIES = [ipaddress.ip_network("10.0.0.0/8"), ipaddress.ip_network("fd00::/8")]
+
+
+def _scope(peer: str | None, forwarded: str | None = None, cookie: str | None = None) -> dict:
+    headers = []
+    if forwarded is not None:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    if cookie is not None:
+        headers.append((b"cookie", cookie.encode()))
+    return {"type": "http", "client": (peer, 50000) if peer else None, "headers": headers}
+
+
+class TestRouteCost:
+    """route_cost — the longest matching prefix wins"""
+
+    @pytest.mark.parametrize("path, cost", [
+        ("/api/auth/login", 5),
+        ("/api/calls/search", 5),
+        ("/api/calls/export", 10),
+        ("/api/calls/0f1e2d3c", 2),
+        ("/api/analytics/overview", 5),
+        ("/api/dashboard/stats", 2),
+        ("/api/admin/llm/generate", 10),
+        ("/api/agents", 1),
+        ("/api/calls", 1),
+    ])
+    def test_costs(self, path: str, cost: float):
+        assert route_cost(path) == cost
+
+    def test_longest_prefix_wins_whatever_the_order(self):
+        assert "/api/calls/" in ROUTE_COSTS and "/api/calls/export" in ROUTE_COSTS
+        assert route_cost("/api/calls/export") == ROUTE_COSTS["/api/calls/export"]
+
+
+class TestClientIp:
+    """client_ip — the last X-Forwarded-For hop that is not one of our proxies"""
+
+    def test_direct_client(self):
+        assert client_ip(_scope("203.0.113.7"), PROXIES) == "203.0.113.7"
+
+    def test_forwarded_for_from_an_untrusted_peer_is_ignored(self):
+        assert client_ip(_scope("203.0.113.7", "198.51.100.1"), PROXIES) == "203.0.113.7"
+
+    def test_trusted_proxy(self):
+        assert client_ip(_scope("10.0.0.2", "198.51.100.1"), PROXIES) == "198.51.100.1"
+
+    def test_spoofed_hops_before_the_real_client_are_ignored(self):
+        scope = _scope("10.0.0.2", "1.2.3.4, 198.51.100.1, 10.0.0.3")
+        assert client_ip(scope, PROXIES) == "198.51.100.1"
+
+    def test_ipv6_proxy(self):
+        assert client_ip(_scope("fd00::2", "2001:db8::1"), PROXIES) == "2001:db8::1"
+
+    def test_only_proxies_in_the_chain(self):
+        assert client_ip(_scope("10.0.0.2", "10.0.0.3"), PROXIES) == "10.0.0.2"
+        assert client_ip(_scope("10.0.0.2"), PROXIES) == "10.0.0.2"
+
+    def test_no_trusted_proxy_configured(self):
+        assert client_ip(_scope("10.0.0.2", "198.51.100.1"), []) == "10.0.0.2"
+
+    def test_no_client(self):
+        assert client_ip(_scope(None), PROXIES) == ""
+
+
+class TestBucketKey:
+    """RateLimitMiddleware.key — per user when authenticated, else per address"""
+
+    def _middleware(self) -> RateLimitMiddleware:
+        middleware = RateLimitMiddleware(app=None)
+        middleware.networks = PROXIES
+        return middleware
+
+    def test_authenticated_user(self):
+        token = create_access_token("user-1", "tenant-1", "USER")
+        scope = _scope("203.0.113.7", cookie=f"theme=dark; access_token={token}")
+        assert self._middleware().key(scope) == "user:tenant-1:user-1"
+
+    def test_invalid_token_falls_back_to_the_address(self):
+        scope = _scope("203.0.113.7", cookie="access_token=not-a-jwt")
+        assert self._middleware().key(scope) == "ip:203.0.113.7"
+
+    def test_refresh_token_is_not_an_identity(self):
+        token = create_refresh_token("user-1", "tenant-1", "USER")
+        scope = _scope("203.0.113.7", cookie=f"access_token={token}")
+        assert self._middleware().key(scope) == "ip:203.0.113.7"
+
+    def test_anonymous_behind_proxy(self):
+        assert self._middleware().key(_scope("10.0.0.2", "198.51.100.1")) == "ip:198.51.100.1"
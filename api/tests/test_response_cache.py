@@ -0,0 +1,140 @@
+"""
+Tests for the response cache ETags and 304s (app/services/response_cache.py)
+
+No database: a small app with one cached route, called in-process.
+"""
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.services import response_cache
+from app.services.response_cache import CachedRoute, cached, matches
+
+
+calls = {"items": 0}
+
+
+def build_app() -> FastAPI:
+    router = APIRouter(route_class=CachedRoute)
+
+    @router.get("/items")
+    @cached(ttl=60, tags=("templates",))
+    async def list_items(kind: str = "all"):
+        calls["items"] += 1
+        return {"kind": kind, "version": calls["items"]}
+
+    @router.get("/unavailable")
+    @cached(ttl=60)
+    async def unavailable():
+        return JSONResponse({"detail": "later"}, status_code=503)
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    response_cache._cache.clear()
+    calls["items"] = 0
+    yield
+    response_cache._cache.clear()
+
+
+@pytest_asyncio.fixture
+async def app_client() -> AsyncGenerator[AsyncClient, None]:
+    transport = ASGITransport(app=build_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+class TestMatches:
+    """If-None-Match comparison"""
+
+    def test_exact_and_weak_forms(self):
+        assert matches('"abc"', '"abc"')
+        assert matches('W/"abc"', '"abc"')
+
+    def test_list_and_wildcard(self):
+        assert matches('"xyz", W/"abc"', '"abc"')
+        assert matches("*", '"abc"')
+
+    def test_no_match(self):
+        assert not matches(None, '"abc"')
+        assert not matches("", '"abc"')
+        assert not matches('"abd"', '"abc"')
+
+
+class TestCachedRoute:
+    """ETag, 304 and invalidation through CachedRoute"""
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit_with_the_same_etag(self, app_client: AsyncClient):
+        first = await app_client.get("/items")
+        second = await app_client.get("/items")
+        assert first.status_code == second.status_code == 200
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.headers["etag"].startswith('"')
+        assert first.headers["cache-control"] == response_cache.CACHE_CONTROL
+        assert second.json() == {"kind": "all", "version": 1}
+        assert calls["items"] == 1
+
+    @pytest.mark.asyncio
+    async def test_matching_if_none_match_gets_an_empty_304(self, app_client: AsyncClient):
+        etag = (await app_client.get("/items")).headers["etag"]
+        for header in (etag, f"W/{etag}", f'"other", {etag}'):
+            response = await app_client.get("/items", headers={"If-None-Match": header})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_first_request_can_already_be_a_304(self, app_client: AsyncClient):
+        etag = response_cache.etag_for(b'{"kind":"all","version":1}')
+        response = await app_client.get("/items", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["x-cache"] == "MISS"
+
+    @pytest.mark.asyncio
+    async def test_stale_etag_gets_the_body(self, app_client: AsyncClient):
+        await app_client.get("/items")
+        response = await app_client.get("/items", headers={"If-None-Match": '"outdated"'})
+        assert response.status_code == 200
+        assert response.json()["version"] == 1
+
+    @pytest.mark.asyncio
+    async def test_query_parameters_are_part_of_the_key(self, app_client: AsyncClient):
+        await app_client.get("/items")
+        response = await app_client.get("/items", params={"kind": "presets"})
+        assert response.headers["x-cache"] == "MISS"
+        assert response.json() == {"kind": "presets", "version": 2}
+
+    @pytest.mark.asyncio
+    async def test_invalidation_changes_the_etag(self, app_client: AsyncClient):
+        etag = (await app_client.get("/items")).headers["etag"]
+        response_cache.drop(None, ("templates",))
+        response = await app_client.get("/items", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["x-cache"] == "MISS"
+        assert response.headers["etag"] != etag
+
+    @pytest.mark.asyncio
+    async def test_other_tags_are_kept(self, app_client: AsyncClient):
+        await app_client.get("/items")
+        response_cache.drop(None, ("calls",))
+        assert (await app_client.get("/items")).headers["x-cache"] == "HIT"
+
+    @pytest.mark.asyncio
+    async def test_error_responses_are_not_cached(self, app_client: AsyncClient):
+        response = await app_client.get("/unavailable")
+        assert response.status_code == 503
+        assert "etag" not in response.headers
+        assert response_cache._cache == {}
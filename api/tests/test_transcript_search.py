@@ -0,0 +1,81 @@
+"""
+Tests for the transcript search query (app/services/call_store.py)
+
+Pure logic, no database: the statements of search_transcripts are captured
+and compiled for PostgreSQL, and the snippets are checked for escaping.
+"""
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import call_store
+from app.services.principals import ALL_AGENTS, AgentScope
+
+
+class _CountingSession:
+    """Answers the count query with ``total`` and keeps the statement."""
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.statements = []
+
+    async def scalar(self, statement):
+        self.statements.append(statement)
+        return self.total
+
+
+def _compiled(statement):
+    return statement.compile(dialect=postgresql.dialect())
+
+
+class TestSearchQuery:
+    """websearch_to_tsquery against the generated tsvector"""
+
+    @pytest.mark.asyncio
+    async def test_query_uses_french_websearch_syntax_on_the_tsvector(self):
+        session = _CountingSession()
+        await call_store.search_transcripts(session, uuid.uuid4(), ALL_AGENTS, '"rendez-vous" -annulé', 20)
+        sql = str(_compiled(session.statements[0]))
+        assert "websearch_to_tsquery" in sql
+        assert "calls_cache.transcription_tsv @@ websearch_to_tsquery" in sql
+
+    @pytest.mark.asyncio
+    async def test_search_text_is_bound_not_inlined(self):
+        text = "rendez-vous'); DROP TABLE calls_cache; --"
+        session = _CountingSession()
+        await call_store.search_transcripts(session, uuid.uuid4(), ALL_AGENTS, text, 20)
+        compiled = _compiled(session.statements[0])
+        assert "DROP TABLE" not in str(compiled)
+        assert text in compiled.params.values()
+        assert "french" in compiled.params.values()
+
+    @pytest.mark.asyncio
+    async def test_query_is_restricted_to_tenant_and_agents(self):
+        tenant_id = uuid.uuid4()
+        session = _CountingSession()
+        await call_store.search_transcripts(session, tenant_id, AgentScope({"agent-b", "agent-a"}), "devis", 20)
+        compiled = _compiled(session.statements[0])
+        assert tenant_id in compiled.params.values()
+        assert ["agent-a", "agent-b"] in compiled.params.values()
+
+    @pytest.mark.asyncio
+    async def test_no_match_skips_the_page_query(self):
+        session = _CountingSession(total=0)
+        assert await call_store.search_transcripts(session, uuid.uuid4(), ALL_AGENTS, "devis", 20) == ([], 0)
+        assert len(session.statements) == 1
+
+
+class TestSnippet:
+    """ts_headline output → HTML snippet"""
+
+    def test_markers_become_mark_tags(self):
+        headline = f"Je voudrais un {call_store._HL_START}devis{call_store._HL_STOP} pour demain"
+        assert call_store._snippet(headline) == "Je voudrais un <mark>devis</mark> pour demain"
+
+    def test_transcript_html_is_escaped(self):
+        headline = f"<script>alert(1)</script> {call_store._HL_START}devis{call_store._HL_STOP} & co"
+        assert call_store._snippet(headline) == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>devis</mark> &amp; co"
+
+    def test_missing_headline_is_empty(self):
+        assert call_store._snippet(None) == ""
@@ -0,0 +1,74 @@
+"""
+Tests for the CallRounded webhook signature (app/routes/webhooks.py)
+
+Pure logic, no database: ``X-CallRounded-Signature: t=<timestamp>,v1=<hex>``
+is an HMAC-SHA256 of ``"<t>.<raw body>"`` with the webhook secret.
+"""
+import hashlib
+import hmac
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.routes.webhooks import _verify_signature
+
+SECRET = "whsec_test"
+BODY = b'{"type":"call.ended","data":{"id":"call-1","status":"completed"}}'
+
+
+@pytest.fixture(autouse=True)
+def webhook_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CALLROUNDED_WEBHOOK_SECRET", SECRET)
+    monkeypatch.setattr(settings, "CALLROUNDED_WEBHOOK_TOLERANCE_SECONDS", 300)
+
+
+def _signature(body: bytes, timestamp: int, secret: str = SECRET) -> str:
+    digest = hmac.new(secret.encode(), str(timestamp).encode() + b"." + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def _rejected(body: bytes, header: str | None) -> str:
+    with pytest.raises(HTTPException) as exc_info:
+        _verify_signature(body, header)
+    assert exc_info.value.status_code == 401
+    return exc_info.value.detail
+
+
+class TestVerifySignature:
+    """_verify_signature"""
+
+    def test_valid_signature_is_accepted(self):
+        _verify_signature(BODY, _signature(BODY, int(time.time())))
+
+    def test_field_order_does_not_matter(self):
+        timestamp = int(time.time())
+        t, v1 = _signature(BODY, timestamp).split(",")
+        _verify_signature(BODY, f"{v1},{t}")
+
+    def test_missing_header(self):
+        assert _rejected(BODY, None) == "Signature manquante"
+        assert _rejected(BODY, "") == "Signature manquante"
+
+    def test_expired_timestamp(self):
+        assert _rejected(BODY, _signature(BODY, int(time.time()) - 301)) == "Signature expirée"
+
+    def test_timestamp_from_the_future(self):
+        assert _rejected(BODY, _signature(BODY, int(time.time()) + 301)) == "Signature expirée"
+
+    def test_malformed_timestamp(self):
+        assert _rejected(BODY, "t=abc,v1=00") == "Signature expirée"
+        assert _rejected(BODY, "v1=00") == "Signature expirée"
+
+    def test_tampered_body(self):
+        header = _signature(BODY, int(time.time()))
+        assert _rejected(BODY.replace(b"completed", b"missed"), header) == "Signature invalide"
+
+    def test_wrong_secret(self):
+        assert _rejected(BODY, _signature(BODY, int(time.time()), secret="other")) == "Signature invalide"
+
+    def test_signature_bound_to_its_timestamp(self):
+        timestamp = int(time.time())
+        _, v1 = _signature(BODY, timestamp).split(",")
+        assert _rejected(BODY, f"t={timestamp - 1},{v1}") == "Signature invalide"
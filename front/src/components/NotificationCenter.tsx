@@ -1,10 +1,11 @@
-import { useState, useEffect, useCallback } from "react";
+import { useState } from "react";
 import { 
   Bell, BellRing, X, Phone, PhoneMissed, AlertTriangle, 
   TrendingUp, Check, ChevronRight, Volume2, VolumeX
 } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
+import { useLiveEvents } from "@/hooks/useLiveEvents";
 
 interface Notification {
   id: string;
@@ -27,91 +28,47 @@ export function NotificationCenter() {
   const [notifications, setNotifications] = useState<Notification[]>([]);
   const [isOpen, setIsOpen] = useState(false);
   const [soundEnabled, setSoundEnabled] = useState(true);
-  const [ws, setWs] = useState<WebSocket | null>(null);
 
   const unreadCount = notifications.filter(n => !n.read).length;
 
-  // WebSocket connection
-  useEffect(() => {
-    const wsUrl = `${window.location.protocol === 'https:' ? 'wss:' : 'ws:'}//${window.location.host}/api/ws/notifications`;
-    
-    
-    // For now, simulate with mock data since WS might not be ready
-    const mockNotifications: Notification[] = [
-      {
-        id: "1",
-        type: "call_incoming",
-        title: "Appel entrant",
-        message: "+33 6 12 34 56 78 - Marie Dupont",
-        timestamp: new Date(),
-        read: false,
-      },
-      {
-        id: "2",
-        type: "alert",
-        title: "Alerte: Appels manqués",
-        message: "3 appels manqués dans la dernière heure",
-        timestamp: new Date(Date.now() - 1000 * 60 * 15),
-        read: false,
-      },
-      {
-        id: "3",
-        type: "info",
-        title: "Rapport généré",
-        message: "Votre rapport hebdomadaire est prêt",
-        timestamp: new Date(Date.now() - 1000 * 60 * 60),
-        read: true,
-      },
-    ];
-    
-    setNotifications(mockNotifications);
-
-    // Try to connect to real WebSocket
-    try {
-      const socket = new WebSocket(wsUrl);
-      
-      socket.onopen = () => {
-      };
-      
-      socket.onmessage = (event) => {
-        try {
-          const data = JSON.parse(event.data);
-          
-          const notification: Notification = {
-            id: crypto.randomUUID(),
-            type: data.type || "info",
-            title: data.title || "Notification",
-            message: data.message || "",
-            timestamp: new Date(),
-            read: false,
-            data: data.data,
-          };
-          
-          setNotifications(prev => [notification, ...prev]);
-          
-          // Play sound
-          if (soundEnabled && data.type !== "info") {
-            playNotificationSound();
-          }
-        } catch (e) {
-          console.error("[NotificationCenter] Parse error:", e);
-        }
-      };
-      
-      socket.onerror = (error) => {
-      };
-      
-      socket.onclose = () => {
-      };
-      
-      setWs(socket);
-      
-      return () => {
-        socket.close();
-      };
-    } catch (error) {
+  function notify(notification: Omit<Notification, "id" | "timestamp" | "read">) {
+    setNotifications(prev => [
+      { ...notification, id: crypto.randomUUID(), timestamp: new Date(), read: false },
+      ...prev,
+    ].slice(0, 50));
+    if (soundEnabled) {
+      playNotificationSound();
     }
-  }, [soundEnabled]);
+  }
+
+  // Live events (server-sent events)
+  useLiveEvents({
+    call: (call) => {
+      if (call.status === "missed" && call.previous_status !== "missed") {
+        notify({
+          type: "call_missed",
+          title: "Appel manqué",
+          message: call.from_number || "Numéro masqué",
+          data: { call_id: call.id },
+        });
+      } else if (call.new) {
+        notify({
+          type: "call_incoming",
+          title: "Nouvel appel",
+          message: call.from_number || "Numéro masqué",
+          data: { call_id: call.id },
+        });
+      }
+    },
+    alert: (alert) => {
+      notify({
+        type: "alert",
+        title: `Alerte: ${alert.title}`,
+        message: alert.message,
+        data: { alert_id: alert.id, severity: alert.severity },
+      });
+    },
+  });
 
   function playNotificationSound() {
     try {
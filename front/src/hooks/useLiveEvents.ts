@@ -0,0 +1,86 @@
+import { useEffect, useRef } from "react";
+import { API_URL } from "@/lib/api";
+
+export interface LiveCall {
+  id: string;
+  agent_id: string | null;
+  from_number: string | null;
+  to_number: string | null;
+  status: string;
+  duration_seconds: number | null;
+  cost: number | null;
+  start_time: string | null;
+  end_time: string | null;
+  new: boolean;
+  previous_status: string | null;
+}
+
+export interface LiveStatsDelta {
+  total_calls: number;
+  total_calls_today: number;
+  completed_calls: number;
+  missed_calls: number;
+  failed_calls: number;
+  duration_sum: number;
+  duration_count: number;
+  total_cost: number;
+  start_time: string | null;
+}
+
+export interface LiveAlert {
+  id: string;
+  severity: string;
+  title: string;
+  message: string;
+  created_at: string;
+}
+
+export interface LiveEventHandlers {
+  call?: (call: LiveCall) => void;
+  stats?: (delta: LiveStatsDelta) => void;
+  alert?: (alert: LiveAlert) => void;
+  resync?: () => void;
+}
+
+const RECONNECT_DELAY_MS = 5000;
+
+/** Subscribe to the server-sent event stream (`/events/stream`) while mounted. */
+export function useLiveEvents(handlers: LiveEventHandlers) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let stopped = false;
+
+    function connect() {
+      source = new EventSource(`${API_URL}/events/stream`, { withCredentials: true });
+      for (const name of ["call", "stats", "alert"] as const) {
+        source.addEventListener(name, (e) => {
+          try {
+            handlersRef.current[name]?.(JSON.parse((e as MessageEvent).data));
+          } catch (err) {
+            console.error("[useLiveEvents] Parse error:", err);
+          }
+        });
+      }
+      source.addEventListener("resync", () => handlersRef.current.resync?.());
+      source.onerror = () => {
+        // The browser retries by itself unless the server refused the stream (e.g. expired token)
+        if (source?.readyState !== EventSource.CLOSED || stopped) return;
+        retryTimer = setTimeout(async () => {
+          await fetch(`${API_URL}/auth/refresh`, { method: "POST", credentials: "include" }).catch(() => {});
+          if (!stopped) connect();
+        }, RECONNECT_DELAY_MS);
+      };
+    }
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, []);
+}
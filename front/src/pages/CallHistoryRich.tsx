@@ -1,10 +1,10 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { 
   Phone, Clock, Calendar, User, MessageSquare, Download, Filter,
   ChevronDown, ChevronUp, Play, Pause, Search, X, TrendingUp,
   FileText, ExternalLink
 } from "lucide-react";
-import { api } from "@/lib/api";
+import { api, API_URL } from "@/lib/api";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
@@ -86,6 +86,8 @@ export function CallHistoryRich() {
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
   const [totalItems, setTotalItems] = useState(0);
+  // Keyset cursors of the pages already reached (page number -> cursor)
+  const pageCursors = useRef<Record<number, string>>({});
   const perPage = 20;
   const [filters, setFilters] = useState<Filters>({
     search: "",
@@ -102,11 +104,15 @@ export function CallHistoryRich() {
   async function fetchCalls(page = 1) {
     try {
       setLoading(true);
+      if (page === 1) pageCursors.current = {};
       const params = new URLSearchParams({ page: String(page), limit: String(perPage) });
+      const cursor = pageCursors.current[page];
+      if (cursor) params.set("cursor", cursor);
       if (filters.status) params.set("status", filters.status);
       if (filters.dateFrom) params.set("from_date", filters.dateFrom);
       if (filters.dateTo) params.set("to_date", filters.dateTo);
-      const data = await api.get<{ calls: CallRecord[]; total_items: number; total_pages: number; current_page: number }>(`/calls/rich?${params}`);
+      const data = await api.get<{ calls: CallRecord[]; total_items: number; total_pages: number; current_page: number; next_cursor: string | null }>(`/calls/rich?${params}`);
+      if (data.next_cursor) pageCursors.current[page + 1] = data.next_cursor;
       setCalls(data.calls || []);
       setTotalPages(data.total_pages || 1);
       setTotalItems(data.total_items || 0);
@@ -133,26 +139,12 @@ export function CallHistoryRich() {
   }
 
   function exportCalls() {
-    const csv = [
-      ["Date", "Numéro", "Nom", "Durée", "Statut", "Résultat", "Résumé"].join(","),
-      ...calls.map(c => [
-        formatDate(c.started_at),
-        c.caller_number,
-        c.caller_name || "",
-        formatDuration(c.duration_seconds),
-        c.status,
-        c.outcome || "",
-        c.sentiment || "",
-        `"${c.summary || ""}"`,
-      ].join(",")),
-    ].join("\n");
-    
-    const blob = new Blob([csv], { type: "text/csv" });
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement("a");
-    a.href = url;
-    a.download = `historique-appels-${new Date().toISOString().split("T")[0]}.csv`;
-    a.click();
+    // Streamed by the API: every call matching the filters, not just this page
+    const params = new URLSearchParams({ format: "csv" });
+    if (filters.status) params.set("status", filters.status);
+    if (filters.dateFrom) params.set("from_date", filters.dateFrom);
+    if (filters.dateTo) params.set("to_date", filters.dateTo);
+    window.location.href = `${API_URL}/calls/export?${params}`;
   }
 
   const filteredCalls = calls.filter(call => {
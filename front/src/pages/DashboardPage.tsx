@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import { api } from "@/lib/api";
 import { useAuth } from "@/hooks/useAuth";
+import { useLiveEvents, type LiveStatsDelta } from "@/hooks/useLiveEvents";
 import { PhoneCall, Clock, Phone, Euro, TrendingUp, CheckCircle2, XCircle, Sparkles } from "lucide-react";
 import { useLocation } from "wouter";
 import { formatDateParis, formatDuration } from "@/lib/dates";
@@ -15,6 +16,7 @@ interface DashboardStats {
   missed_calls: number;
   failed_calls: number;
   avg_duration: number;
+  duration_count: number;
   total_cost: number;
   response_rate: number;
 }
@@ -53,6 +55,25 @@ const statusColor: Record<string, string> = {
   unknown: "bg-gray-100 text-gray-500",
 };
 
+function applyStatsDelta(stats: DashboardStats, d: LiveStatsDelta): DashboardStats {
+  const total = stats.total_calls + d.total_calls;
+  const completed = stats.completed_calls + d.completed_calls;
+  const durationCount = stats.duration_count + d.duration_count;
+  const durationSum = stats.avg_duration * stats.duration_count + d.duration_sum;
+  return {
+    ...stats,
+    total_calls: total,
+    total_calls_today: stats.total_calls_today + d.total_calls_today,
+    completed_calls: completed,
+    missed_calls: stats.missed_calls + d.missed_calls,
+    failed_calls: stats.failed_calls + d.failed_calls,
+    duration_count: durationCount,
+    avg_duration: durationCount > 0 ? Math.round((durationSum / durationCount) * 10) / 10 : 0,
+    total_cost: Math.round((stats.total_cost + d.total_cost) * 100) / 100,
+    response_rate: total > 0 ? Math.round((completed / total) * 1000) / 10 : 0,
+  };
+}
+
 function formatCost(cost: number | null): string {
   if (cost == null) return "—";
   return cost.toFixed(2) + " €";
@@ -133,6 +154,33 @@ export function DashboardPage() {
     fetchCalls();
   }, [fromDate, toDate]);
 
+  // Live updates: only calls inside the selected date range (UTC days) count
+  const inRange = (startTime: string | null) => {
+    const day = (startTime || "").slice(0, 10);
+    return (!fromDate || day >= fromDate) && (!toDate || day <= toDate);
+  };
+
+  useLiveEvents({
+    stats: (delta) => {
+      if (inRange(delta.start_time)) {
+        setStats((prev) => (prev ? applyStatsDelta(prev, delta) : prev));
+      }
+    },
+    call: (call) => {
+      if (!inRange(call.start_time)) return;
+      setCalls((prev) => {
+        if (prev.some((c) => c.id === call.id)) {
+          return prev.map((c) => (c.id === call.id ? { ...c, ...call } : c));
+        }
+        return call.new ? [call, ...prev].slice(0, 5) : prev;
+      });
+    },
+    resync: () => {
+      fetchStats();
+      fetchCalls();
+    },
+  });
+
   const statCards = [
     {
       label: "Appels total",